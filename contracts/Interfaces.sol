@@ -4,6 +4,14 @@ pragma solidity ^0.8.20;
 
 import "@openzeppelin/contracts/token/ERC721/extensions/IERC721Enumerable.sol";
 
+// the phases of a wedding as defined by the time windows of the wedding contract's modifiers
+enum WeddingPhase {
+    BeforeWeddingDay,
+    Voting,
+    Ceremony,
+    AfterWeddingDay
+}
+
 interface IWeddingContract {
     function initialize(
         address[] memory _fiances,
@@ -19,6 +27,8 @@ interface IWeddingContract {
     function confirmWedding() external;
 
     function divorce() external;
+
+    function getPhase() external view returns (WeddingPhase);
 }
 
 // this interface does NOT list all the functions of the contract, only the ones that are needed for enabling a basic functionality
@@ -32,5 +42,21 @@ interface IWeddingRegistry is IERC721Enumerable {
 
     function issueWeddingCertificate(address[] memory _fiances) external;
 
+    function releaseReservations(address[] memory _fiances) external;
+
     function burnWeddingCertificate() external;
 }
+
+// the married index of a router that spreads weddings over several registry shards
+interface IWeddingRouter {
+    function isShard(address _address) external view returns (bool);
+
+    function isMarried(address _address) external view returns (bool);
+
+    function certificateIssued(
+        address _weddingContract,
+        address[] memory _fiances
+    ) external;
+
+    function certificateBurned(address _weddingContract) external;
+}
@@ -7,13 +7,24 @@ import "@openzeppelin/contracts/token/ERC721/extensions/ERC721Enumerable.sol";
 import "@openzeppelin/contracts/proxy/ERC1967/ERC1967Proxy.sol";
 
 contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
+    struct Reservation {
+        address wedding; // the pending wedding the fiance is reserved for
+        uint64 expiresAt; // end of the wedding day, the wedding can not be confirmed afterwards
+    }
+
     address[] public authorities;
+    uint64 public authorityEpoch; // incremented with every update of the authorities, the first authorities are epoch 1
+    mapping(uint64 => mapping(address => bool)) internal authorityInEpoch; // {epoch : {address : true/false}} O(1) authority lookup, older epochs are intentionally never cleared (deleting them costs gas per old authority) and never read again
     address internal weddingContractImplementationAddress;
 
     mapping(address => address) internal fianceAddressToWeddingContract; // for checking whether a address is married
     mapping(address => bool) internal deployedContracts; // for checking whether a calling address belongs to a deployed contract, using a hashmap for O(1) lookup instead of looping through an array
     mapping(uint256 => string) internal tokenURIs; // for storing the tokenURI (ERC721 requires uint256) of a wedding token
     uint256 internal weddingCounter; // we need to use uint256 here because ERC721Enumerable uses uint256 for the token ids
+    IWeddingRouter public router; // optional, set once: the married index over all registry shards of a router
+    mapping(address => Reservation) internal reservations; // {fiance : reservation} of the pending wedding of a fiance, so issuing a certificate does not have to check the marriages again
+
+    uint24 internal constant dayInSeconds = 86400; // 24 hours in seconds, used to convert timestamps to start of the day
 
     //// events
     event AuthoritiesUpdated(address[] authorities);
@@ -24,6 +35,7 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
     );
     event WeddingCertificateIssued(address[] fiances);
     event WeddingCertificateBurned(address weddingContractAddress);
+    event RouterSet(address router);
 
     //// modifiers
     modifier onlyAuthorities() {
@@ -52,12 +64,22 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
 
     //// internal functions
     function _isAuthority(address _address) internal view returns (bool) {
-        for (uint32 i = 0; i < authorities.length; i++) {
-            if (authorities[i] == _address) {
-                return true;
-            }
+        return authorityInEpoch[authorityEpoch][_address];
+    }
+
+    function setAuthorities(address[] memory _authorities) internal {
+        /* Starts a new authority epoch with the given authorities. Instead of deleting the lookup
+        entries of the previous authorities one by one, the lookup of the new epoch starts empty.
+        The entries of older epochs stay in storage on purpose, only the current epoch is read.
+        The list of authorities must be non-empty.
+        */
+        require(_authorities.length > 0, "Authorities cannot be empty");
+        authorities = _authorities;
+        uint64 epoch = authorityEpoch + 1;
+        for (uint32 i = 0; i < _authorities.length; i++) {
+            authorityInEpoch[epoch][_authorities[i]] = true;
         }
-        return false;
+        authorityEpoch = epoch;
     }
 
     function isMarried(address _address) internal view returns (bool) {
@@ -76,11 +98,35 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
         return balanceOf(fianceAddressToWeddingContract[_address]) > 0;
     }
 
+    function isMarriedInAnyShard(
+        address _address
+    ) internal view returns (bool) {
+        /* With a router, someone married in another shard of the router can not marry in this one either.
+        Without a router this registry is the only one.
+        */
+        if (address(router) != address(0)) {
+            return router.isMarried(_address);
+        }
+        return isMarried(_address);
+    }
+
     function noOneMarried(
         address[] memory _fiances
     ) internal view returns (bool) {
         for (uint32 i = 0; i < _fiances.length; i++) {
-            if (isMarried(_fiances[i])) {
+            if (isMarriedInAnyShard(_fiances[i])) {
+                return false;
+            }
+        }
+        return true;
+    }
+
+    function noOneReserved(
+        address[] memory _fiances
+    ) internal view returns (bool) {
+        /* A reservation is active until the end of the wedding day of its wedding, released ones are deleted. */
+        for (uint32 i = 0; i < _fiances.length; i++) {
+            if (reservations[_fiances[i]].expiresAt > block.timestamp) {
                 return false;
             }
         }
@@ -99,8 +145,7 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
         The list of authorities must be non-empty.
         */
 
-        require(_authorities.length > 0, "Authorities cannot be empty");
-        authorities = _authorities;
+        setAuthorities(_authorities);
 
         weddingContractImplementationAddress = _weddingContractImplementationAddress;
     }
@@ -127,11 +172,10 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
     function updateAuthorities(
         address[] memory _authorities
     ) external onlyAuthorities {
-        /* Updates the list of authorities. The list of authorities must be non-empty. 
+        /* Updates the list of authorities and starts a new authority epoch. The list of authorities must be non-empty. 
         Can only be called by an authority. Emit an event when the authorities are updated.
         */
-        require(_authorities.length > 0, "Authorities cannot be empty");
-        authorities = _authorities;
+        setAuthorities(_authorities);
 
         emit AuthoritiesUpdated(_authorities);
     }
@@ -148,6 +192,28 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
         weddingContractImplementationAddress = _weddingContractImplementationAddress;
     }
 
+    function setRouter(address _router) external onlyAuthorities {
+        /* Makes this registry a shard of the router at the given address. From then on the router
+        is notified about every issued and burned wedding certificate and its married index
+        is used to check that none of the fiances is married in any shard.
+        The router can only be set once and only before the first wedding certificate is issued,
+        so the married index contains every marriage of this registry.
+        Can only be called by an authority. Emit an event when the router is set.
+        */
+        require(address(router) == address(0), "Router already set");
+        require(
+            weddingCounter == 0,
+            "Router must be set before the first wedding certificate"
+        );
+        require(
+            IWeddingRouter(_router).isShard(address(this)),
+            "Registry is not a shard of the router"
+        );
+        router = IWeddingRouter(_router);
+
+        emit RouterSet(_router);
+    }
+
     function initiateWedding(
         address[] memory _fiances,
         uint32 _weddingDate
@@ -161,6 +227,8 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
         The list of fiances must be non-empty and there must be no duplicate addresses.
         The wedding date must be in the future.
         This requirements are checked by the wedding contract implementation.
+        None of the fiances may be reserved for another pending wedding of this registry. The fiances
+        are reserved for the new wedding until the end of its wedding day or until it gets canceled.
         */
 
         // ceck that all fiances are not married by calling the registry
@@ -168,6 +236,10 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
             noOneMarried(_fiances),
             "One of the fiances is already married"
         );
+        require(
+            noOneReserved(_fiances),
+            "One of the fiances has a pending wedding"
+        );
 
         // deploy a new wedding contract proxy (and directly call initialize)
         bytes memory initParams = abi.encodeWithSignature(
@@ -188,6 +260,12 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
         // registry gets called by a wedding contract which was deployed by the registry
         deployedContracts[newWeddingProxyAddress] = true;
 
+        // reserve the fiances for the new wedding
+        uint64 expiresAt = uint64(_weddingDate - (_weddingDate % dayInSeconds)) + dayInSeconds;
+        for (uint32 i = 0; i < _fiances.length; i++) {
+            reservations[_fiances[i]] = Reservation(newWeddingProxyAddress, expiresAt);
+        }
+
         emit WeddingInitiated(newWeddingProxyAddress, _fiances, _weddingDate);
 
         return newWeddingProxyAddress;
@@ -205,17 +283,26 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
         The wedding contract address of a married person as well as the wedding token of
         this contract address can be retrieved by calling getMyWeddingContractAddress and
         getMyWeddingTokenId.
+        The fiances are reserved for the calling wedding since its initiation, so none of them can have
+        married in this registry in the meantime. Only the router is asked about the other shards.
         */
-        require(
-            noOneMarried(_fiances),
-            "One of the fiances is already married"
-        );
-
-        // associate the wedding contract address with the fiances
+        // associate the wedding contract address with the fiances and release their reservations
         // if a fianec got divorced earlier, the address of the canceled contract will be overwritten
         for (uint32 i = 0; i < _fiances.length; i++) {
+            // the reservations are gone once the certificate is issued, e.g. on a second confirmation
+            require(
+                reservations[_fiances[i]].wedding == msg.sender,
+                "One of the fiances is already married"
+            );
+            delete reservations[_fiances[i]];
             fianceAddressToWeddingContract[_fiances[i]] = msg.sender;
         }
+        if (address(router) != address(0)) {
+            require(
+                noOneMarried(_fiances),
+                "One of the fiances is already married"
+            );
+        }
 
         _mint(msg.sender, weddingCounter);
         // since the task description does not specify what data should be stored in the token, we just added this dummy data to show that we know how to do it
@@ -225,9 +312,28 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
         // ] = "Here we can add arbitrary data to the token. For example a link to some off chain data.";
         weddingCounter++;
 
+        if (address(router) != address(0)) {
+            router.certificateIssued(msg.sender, _fiances);
+        }
+
         emit WeddingCertificateIssued(_fiances);
     }
 
+    function releaseReservations(
+        address[] memory _fiances
+    ) external onlyDeployedContracts {
+        /* Releases the reservations of the fiances for the calling wedding contract when the wedding
+        got canceled, so the fiances can initiate another wedding right away.
+        Reservations of other weddings are kept.
+        This function can only be called by a deployed wedding contract.
+        */
+        for (uint32 i = 0; i < _fiances.length; i++) {
+            if (reservations[_fiances[i]].wedding == msg.sender) {
+                delete reservations[_fiances[i]];
+            }
+        }
+    }
+
     function burnWeddingCertificate() external onlyDeployedContracts {
         /* Burns the wedding certificate of the calling wedding contract.
         This function can only be called by a deployed wedding contract. This ensures that
@@ -239,6 +345,10 @@ contract WeddingRegistry is IWeddingRegistry, ERC721Enumerable {
         */
         _burn(tokenOfOwnerByIndex(msg.sender, 0));
 
+        if (address(router) != address(0)) {
+            router.certificateBurned(msg.sender);
+        }
+
         emit WeddingCertificateBurned(msg.sender);
     }
 
@@ -0,0 +1,109 @@
+// SPDX-License-Identifier: MIT
+
+pragma solidity ^0.8.20;
+
+import "./Interfaces.sol";
+
+contract WeddingRouter is IWeddingRouter {
+    address[] public shards;
+
+    mapping(address => bool) internal shardAddresses; // for checking whether a calling address is one of the shards in O(1)
+    // the global married index: the wedding contract a fiance got married in last, over all shards
+    mapping(address => address) internal fianceAddressToWeddingContract;
+    mapping(address => bool) internal burnedWeddingContracts; // wedding contracts whose certificate got burned
+
+    //// events
+    event WeddingRouted(address weddingContractAddress, address shard);
+
+    //// modifiers
+    modifier onlyShards() {
+        require(
+            shardAddresses[msg.sender],
+            "Only registry shards can call this function"
+        );
+        _;
+    }
+
+    //// constructor
+    constructor(address[] memory _shards) {
+        /* Initialize the registry shards. Every shard has to set this router with setRouter
+        before its first wedding certificate is issued, so the married index covers all marriages.
+        The list of shards must be non-empty and there must be no duplicate addresses.
+        */
+        require(_shards.length > 0, "Shards cannot be empty");
+        for (uint32 i = 0; i < _shards.length; i++) {
+            require(!shardAddresses[_shards[i]], "Duplicate shard");
+            shardAddresses[_shards[i]] = true;
+        }
+        shards = _shards;
+    }
+
+    //// external functions
+    function isShard(address _address) external view returns (bool) {
+        return shardAddresses[_address];
+    }
+
+    function shardOf(address[] memory _fiances) public view returns (address) {
+        /* Returns the shard of a wedding, chosen by the hash of the sorted fiances.
+        Sorting makes the shard independent of the order in which the fiances are passed.
+        The insertion sort is cheap for the few fiances of a wedding.
+        */
+        address[] memory sortedFiances = new address[](_fiances.length);
+        for (uint32 i = 0; i < _fiances.length; i++) {
+            uint32 j = i;
+            while (j > 0 && sortedFiances[j - 1] > _fiances[i]) {
+                sortedFiances[j] = sortedFiances[j - 1];
+                j--;
+            }
+            sortedFiances[j] = _fiances[i];
+        }
+        return shards[uint256(keccak256(abi.encodePacked(sortedFiances))) % shards.length];
+    }
+
+    function initiateWedding(
+        address[] memory _fiances,
+        uint32 _weddingDate
+    ) external returns (address) {
+        /* Initiates the wedding in the shard of the fiances, see shardOf.
+        All checks are done by the shard, which checks the fiances against the married index of this router.
+        */
+        address shard = shardOf(_fiances);
+        address weddingContractAddress = IWeddingRegistry(shard).initiateWedding(
+            _fiances,
+            _weddingDate
+        );
+
+        emit WeddingRouted(weddingContractAddress, shard);
+
+        return weddingContractAddress;
+    }
+
+    function isMarried(address _address) external view returns (bool) {
+        /* Whether someone is married in any of the shards, in O(1) regardless of the number of shards:
+        the address is married if the wedding contract it got married in last was not divorced.
+        */
+        address weddingContract = fianceAddressToWeddingContract[_address];
+        return
+            weddingContract != address(0) &&
+            !burnedWeddingContracts[weddingContract];
+    }
+
+    function certificateIssued(
+        address _weddingContract,
+        address[] memory _fiances
+    ) external onlyShards {
+        /* Adds the fiances of a wedding to the married index.
+        Can only be called by a shard when it issues a wedding certificate.
+        */
+        for (uint32 i = 0; i < _fiances.length; i++) {
+            fianceAddressToWeddingContract[_fiances[i]] = _weddingContract;
+        }
+    }
+
+    function certificateBurned(address _weddingContract) external onlyShards {
+        /* Removes the fiances of a divorced wedding from the married index.
+        Can only be called by a shard when it burns a wedding certificate.
+        */
+        burnedWeddingContracts[_weddingContract] = true;
+    }
+}
@@ -215,9 +215,10 @@ contract WeddingContract is IWeddingContract, Initializable {
     {
         /* Allows the fiances to revoke the engagement before the wedding day.
         Can only be called by fiances and only before the wedding day and only if the wedding is not canceled.
-        Emits an event and cancels the wedding.
+        Emits an event, cancels the wedding and releases the reservations of the fiances in the registry.
         */
         isCanceled = true;
+        wedReg.releaseReservations(fiances);
 
         emit weddingCanceled(msg.sender);
     }
@@ -241,6 +242,7 @@ contract WeddingContract is IWeddingContract, Initializable {
         // cancel the wedding if more than half of the guests voted against it
         if (votedAgainstWeddingCounter * 2 > approvedGuestsCounter) {
             isCanceled = true;
+            wedReg.releaseReservations(fiances);
             emit weddingCanceled(msg.sender);
         }
     }
@@ -281,9 +283,11 @@ contract WeddingContract is IWeddingContract, Initializable {
         Can only be called after the wedding day and only if the wedding is not canceled.
         To burn either 2 fiances or 1 fiance and 1 authority must call this function.
         The registry is called to burn the wedding certificate and mark the fiances as divorced.
+        Fiances are checked locally first, only other callers are looked up in the registry
+        (a fiance who is an authority as well counts as fiance).
         */
         bool isFiance_ = isFiance(msg.sender);
-        bool isAuthority_ = wedReg.isAuthority(msg.sender);
+        bool isAuthority_ = !isFiance_ && wedReg.isAuthority(msg.sender);
 
         require(
             isFiance_ || isAuthority_,
@@ -316,6 +320,25 @@ contract WeddingContract is IWeddingContract, Initializable {
         isCanceled = true;
     }
 
+    function getPhase() external view returns (WeddingPhase) {
+        /* Returns the phase of the wedding at the current block timestamp.
+        Uses the same time windows as the modifiers: before the wedding day, the voting period
+        on the wedding day, the ceremony (rest of the wedding day) and after the wedding day.
+        The phase only depends on the time, a canceled wedding still moves through the phases.
+        */
+        uint32 startOfDay = weddingDate - (weddingDate % dayInSeconds); // Convert to start of the day
+        if (block.timestamp < startOfDay) {
+            return WeddingPhase.BeforeWeddingDay;
+        }
+        if (block.timestamp < startOfDay + timeToVote) {
+            return WeddingPhase.Voting;
+        }
+        if (block.timestamp < startOfDay + dayInSeconds) {
+            return WeddingPhase.Ceremony;
+        }
+        return WeddingPhase.AfterWeddingDay;
+    }
+
     function getMyPartnersAddresses()
         external
         view
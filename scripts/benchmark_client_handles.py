@@ -0,0 +1,37 @@
+import timeit
+
+from brownie import WeddingRegistry, WeddingContract, accounts, chain, web3
+
+from wedding_client import WeddingClient
+
+
+def main(repetitions=200):
+    """Compares the time it takes to get a handle of a wedding contract with brownie's
+    `WeddingContract.at`, with a plain web3 contract object and with the cached client handle.
+    Usage: brownie run scripts/benchmark_client_handles.py main [<repetitions>]
+    """
+    repetitions = int(repetitions)
+    authorities = accounts[0:1]
+    fiances = accounts[1:3]
+
+    wedding_implementation_contract = WeddingContract.deploy({"from": authorities[0]})
+    registry_contract = WeddingRegistry.deploy(
+        authorities, wedding_implementation_contract.address, {"from": authorities[0]}
+    )
+    tx = registry_contract.initiateWedding(fiances, chain.time() + 86400, {"from": fiances[0]})
+    wedding_address = tx.events["WeddingInitiated"]["weddingContractAddress"]
+
+    client = WeddingClient(web3.provider.endpoint_uri, registry_contract.address)
+    client.wedding(wedding_address)  # warm up the cache
+
+    candidates = {
+        "brownie WeddingContract.at": lambda: WeddingContract.at(wedding_address),
+        "web3 eth.contract (uncached)": lambda: client.web3.eth.contract(
+            address=wedding_address, abi=WeddingContract.abi
+        ),
+        "wedding_client cached handle": lambda: client.wedding(wedding_address),
+    }
+    print(f"\n{'handle creation':<32}{'us per handle':>16}")
+    for name, fn in candidates.items():
+        seconds = min(timeit.repeat(fn, number=repetitions, repeat=3)) / repetitions
+        print(f"{name:<32}{seconds * 1e6:>16.1f}")
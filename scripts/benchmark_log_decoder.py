@@ -0,0 +1,77 @@
+import time
+
+from brownie import WeddingContract, WeddingRegistry, accounts, chain, web3
+from brownie.network.event import decode_logs
+from eth_utils import event_abi_to_log_topic
+
+from scripts.scheduler import ScenarioScheduler
+from wedding_client.logs import LogDecoder
+
+DAY_IN_SECONDS = 86400
+
+
+def throughput(decode, logs, min_seconds=1.0):
+    """Decodes `logs` repeatedly for at least `min_seconds` and returns the logs per second."""
+    decoded = 0
+    started = time.perf_counter()
+    while time.perf_counter() - started < min_seconds:
+        decode(logs)
+        decoded += len(logs)
+    return decoded / (time.perf_counter() - started)
+
+
+def web3_decoder(abis):
+    events = {}  # {topic0: web3 contract event}
+    for abi in abis:
+        contract = web3.eth.contract(abi=abi)
+        for item in abi:
+            if item["type"] == "event":
+                events[event_abi_to_log_topic(item)] = contract.events[item["name"]]()
+
+    def decode(logs):
+        # skips the events of the proxy itself (Upgraded), like the other decoders
+        return [events[topic].process_log(log) for log in logs if (topic := bytes(log["topics"][0])) in events]
+
+    return decode
+
+
+def main(weddings=20):
+    """Compares the log decoding throughput of brownie, web3 and wedding_client's LogDecoder on the
+    logs of `weddings` complete wedding lifecycles (guest approvals, a vote, confirmations, a divorce).
+    Usage: brownie run scripts/benchmark_log_decoder.py main [<weddings>]
+    """
+    weddings = int(weddings)
+    authorities = accounts[0:1]
+    guests = accounts[5:9]
+    wedding_implementation_contract = WeddingContract.deploy({"from": authorities[0]})
+    registry_contract = WeddingRegistry.deploy(
+        authorities, wedding_implementation_contract.address, {"from": authorities[0]}
+    )
+    from_block = web3.eth.block_number + 1
+
+    scheduler = ScenarioScheduler(chain)
+    wedding_date = chain.time() + DAY_IN_SECONDS
+    for i in range(weddings):
+        # two couples take turns, each couple is divorced before its next wedding day
+        fiances = accounts[1:3] if i % 2 else accounts[3:5]
+        scheduler.add_wedding(
+            registry_contract,
+            fiances,
+            wedding_date + i * DAY_IN_SECONDS,
+            guests=guests,
+            voters=guests[:1],
+            divorcers=[fiances[0], authorities[0]],
+        )
+    scheduler.run()
+
+    logs = web3.eth.get_logs({"fromBlock": from_block, "toBlock": "latest"})
+    decoder = LogDecoder()
+    candidates = {
+        "brownie decode_logs": decode_logs,
+        "web3 process_log": web3_decoder([WeddingRegistry.abi, WeddingContract.abi]),
+        "wedding_client LogDecoder": lambda logs: [decoder.decode(log) for log in logs],
+    }
+    print(f"\n{len(logs)} logs")
+    print(f"{'decoder':<28}{'logs/s':>14}")
+    for name, decode in candidates.items():
+        print(f"{name:<28}{throughput(decode, logs):>14,.0f}")
@@ -0,0 +1,72 @@
+"""Measures how many simulated contract calls per second the pure-Python model executes.
+
+Every simulated wedding goes through a random lifecycle: guest approvals, votes against the wedding,
+confirmations and for some weddings a divorce. Rejected calls (e.g. votes after the wedding got
+canceled) count as steps as well.
+Usage: python -m scripts.benchmark_model [<weddings>] [<seed>]
+"""
+import random
+import sys
+import time
+
+from wedding_client.model import DAY_IN_SECONDS, START_TO_VOTE_SECONDS, ModelRevert, RegistryModel
+
+AUTHORITIES = [0, 1, 2]
+ACCOUNT_SPACE = 10**9  # accounts are plain integers, the model accepts any hashable value
+
+
+def simulate(weddings, seed=0):
+    """Returns the number of executed steps and the outcome counts."""
+    rng = random.Random(seed)
+    registry = RegistryModel(AUTHORITIES)
+    outcomes = {"married": 0, "canceled": 0, "unconfirmed": 0, "divorced": 0, "reverted": 0}
+    steps = 0
+    now = 0
+    for _ in range(weddings):
+        now += DAY_IN_SECONDS
+        fiances = rng.sample(range(len(AUTHORITIES), ACCOUNT_SPACE), 2)
+        guests = rng.sample(range(len(AUTHORITIES), ACCOUNT_SPACE), rng.randrange(0, 20))
+        steps += 1
+        try:
+            wedding = registry.weddings[registry.initiate_wedding(fiances[0], fiances, now + DAY_IN_SECONDS, now)]
+        except ModelRevert:
+            outcomes["reverted"] += 1
+            continue
+
+        calls = [(wedding.approve_guest, fiance, (guest,), now) for fiance in fiances for guest in guests]
+        start_of_day = wedding.start_of_day
+        voters = rng.sample(guests, rng.randrange(0, len(guests) + 1)) if guests else []
+        calls += [(wedding.vote_against_wedding, voter, (), start_of_day + 60) for voter in voters]
+        confirming = fiances if rng.random() < 0.9 else fiances[:1]
+        calls += [(wedding.confirm_wedding, fiance, (), start_of_day + START_TO_VOTE_SECONDS) for fiance in confirming]
+        if rng.random() < 0.3:
+            calls += [(wedding.divorce, divorcer, (), start_of_day + DAY_IN_SECONDS) for divorcer in fiances]
+
+        for fn, sender, args, timestamp in calls:
+            steps += 1
+            try:
+                fn(sender, *args, timestamp)
+            except ModelRevert:
+                outcomes["reverted"] += 1
+
+        if wedding.address in registry.token_of:
+            outcomes["married"] += 1
+        elif wedding.divorce_initiator is not None and wedding.is_canceled:
+            outcomes["divorced"] += 1
+        elif wedding.is_canceled:
+            outcomes["canceled"] += 1
+        else:
+            outcomes["unconfirmed"] += 1
+    return steps, outcomes
+
+
+def main(weddings=100_000, seed=0):
+    started = time.perf_counter()
+    steps, outcomes = simulate(int(weddings), int(seed))
+    duration = time.perf_counter() - started
+    print(f"{steps} steps in {duration:.2f} s: {steps / duration:,.0f} steps/s, {steps / duration * 60:,.0f} steps/min")
+    print(", ".join(f"{outcome} {count}" for outcome, count in outcomes.items()))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,146 @@
+"""Compiles the registry and the wedding contract and reports per contract:
+- the storage slot map and the bytes left unused in partially filled slots (packing waste),
+- the init and deployed bytecode sizes against the EIP-3860 and EIP-170 limits,
+- the function selectors.
+Everything is diffed against a stored baseline, so refactors of the state variables get an
+immediate before/after view. Storage in ERC-7201 namespaces (OpenZeppelin's Initializable) is
+not part of solc's storage layout and therefore not listed.
+Usage: python -m scripts.contract_report [--baseline <path>] [--save-baseline]
+"""
+import argparse
+import json
+from pathlib import Path
+
+from wedding_client.compiler import compile_contracts
+
+DEPLOYED_SIZE_LIMIT = 24576  # EIP-170
+INIT_SIZE_LIMIT = 2 * DEPLOYED_SIZE_LIMIT  # EIP-3860
+DEFAULT_BASELINE = "reports/contract_baseline.json"
+
+
+def storage_slots(storage_layout):
+    """Returns the state variables as [{slot, offset, bytes, label, type}] ordered by their position."""
+    types = storage_layout["types"] or {}
+    rows = [
+        {
+            "slot": int(item["slot"]),
+            "offset": item["offset"],
+            "bytes": int(types[item["type"]]["numberOfBytes"]),
+            "label": item["label"],
+            "type": types[item["type"]]["label"],
+        }
+        for item in storage_layout["storage"]
+    ]
+    return sorted(rows, key=lambda row: (row["slot"], row["offset"]))
+
+
+def packing_waste(slots):
+    """Returns {slot: unused bytes} for every slot holding variables smaller than a slot.
+    Variables of 32 bytes or more (including mappings and dynamic arrays) fill their slots."""
+    used = {}
+    for row in slots:
+        if row["bytes"] < 32:
+            used[row["slot"]] = used.get(row["slot"], 0) + row["bytes"]
+    return {slot: 32 - size for slot, size in used.items() if size < 32}
+
+
+def contract_report(output):
+    slots = storage_slots(output["storageLayout"])
+    waste = packing_waste(slots)
+    return {
+        "storage": slots,
+        "slots_used": max((row["slot"] + max(row["bytes"] // 32, 1) for row in slots), default=0),
+        "packing_waste": sum(waste.values()),
+        "waste_per_slot": {str(slot): size for slot, size in waste.items()},
+        "init_size": len(output["evm"]["bytecode"]["object"]) // 2,
+        "deployed_size": len(output["evm"]["deployedBytecode"]["object"]) // 2,
+        "selectors": output["evm"]["methodIdentifiers"],
+    }
+
+
+def print_report(name, report):
+    print(f"== {name}")
+    print(f"{'slot':>6}{'offset':>8}{'bytes':>7}  {'variable':<32}type")
+    for row in report["storage"]:
+        print(f"{row['slot']:>6}{row['offset']:>8}{row['bytes']:>7}  {row['label']:<32}{row['type']}")
+    waste = ", ".join(f"slot {slot}: {size}" for slot, size in report["waste_per_slot"].items())
+    print(f"{report['slots_used']} slots, {report['packing_waste']} bytes packing waste ({waste or 'none'})")
+    print(
+        f"init size {report['init_size']} / {INIT_SIZE_LIMIT} bytes, "
+        f"deployed size {report['deployed_size']} / {DEPLOYED_SIZE_LIMIT} bytes "
+        f"({DEPLOYED_SIZE_LIMIT - report['deployed_size']} left)"
+    )
+    for signature, selector in sorted(report["selectors"].items(), key=lambda item: item[1]):
+        print(f"  0x{selector}  {signature}")
+
+
+def _changed(label, before, after):
+    if before == after:
+        return []
+    if isinstance(before, int) and isinstance(after, int):
+        return [f"{label}: {before} -> {after} ({after - before:+})"]
+    return [f"{label}: {before} -> {after}"]
+
+
+def _position(row):
+    return f"slot {row['slot']}+{row['offset']} {row['type']}" if row else "-"
+
+
+def diff_reports(baseline, current):
+    """Returns the differences between two sets of reports as readable lines."""
+    lines = []
+    for name in sorted(set(baseline) | set(current)):
+        if name not in baseline or name not in current:
+            lines.append(f"{name}: {'added' if name in current else 'removed'}")
+            continue
+        before, after = baseline[name], current[name]
+        changes = []
+        for key in ["init_size", "deployed_size", "slots_used", "packing_waste"]:
+            changes += _changed(key, before[key], after[key])
+
+        before_vars = {row["label"]: row for row in before["storage"]}
+        after_vars = {row["label"]: row for row in after["storage"]}
+        for label in sorted(set(before_vars) | set(after_vars)):
+            old, new = before_vars.get(label), after_vars.get(label)
+            if old is None or new is None or _position(old) != _position(new):
+                changes.append(f"{label}: {_position(old)} -> {_position(new)}")
+
+        before_selectors, after_selectors = before["selectors"], after["selectors"]
+        for signature in sorted(set(before_selectors) - set(after_selectors)):
+            changes.append(f"removed {signature}")
+        for signature in sorted(set(after_selectors) - set(before_selectors)):
+            changes.append(f"added {signature} (0x{after_selectors[signature]})")
+
+        lines += [f"{name}: {change}" for change in changes]
+    return lines
+
+
+def main(baseline=DEFAULT_BASELINE, save_baseline=False):
+    reports = {name: contract_report(output) for name, output in compile_contracts().items()}
+    for name, report in reports.items():
+        print_report(name, report)
+        print()
+
+    baseline_path = Path(baseline)
+    if baseline_path.exists():
+        with baseline_path.open() as fp:
+            differences = diff_reports(json.load(fp), reports)
+        print(f"== changes against {baseline_path}")
+        print("\n".join(differences) if differences else "none")
+    else:
+        print(f"no baseline at {baseline_path}")
+
+    if save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        with baseline_path.open("w") as fp:
+            json.dump(reports, fp, indent=2, sort_keys=True)
+        print(f"baseline saved to {baseline_path}")
+    return reports
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args()
+    main(args.baseline, args.save_baseline)
@@ -0,0 +1,52 @@
+from brownie import WeddingRegistry, WeddingContract, accounts, chain
+
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+AUTHORITY_COUNTS = [1, 10, 100]
+
+
+def divorce_gas(authority_count, second_is_authority):
+    """Runs a wedding up to the day after the wedding and divorces it by a fiance and either the
+    other fiance or the last of `authority_count` authorities. Returns the gas of both divorce calls."""
+    fiances = accounts[1:3]
+    # only the first authority has to be an unlocked account, the rest fill up the list
+    authorities = [accounts[0]] + [accounts.add() for _ in range(authority_count - 1)]
+    wedding_implementation_contract = WeddingContract.deploy({"from": accounts[0]})
+    registry_contract = WeddingRegistry.deploy(
+        authorities, wedding_implementation_contract.address, {"from": accounts[0]}
+    )
+
+    wedding_date = chain.time() + DAY_IN_SECONDS
+    wedding_date_begin = (wedding_date // DAY_IN_SECONDS) * DAY_IN_SECONDS
+    tx = registry_contract.initiateWedding(fiances, wedding_date, {"from": fiances[0]})
+    wedding_contract = WeddingContract.at(tx.events["WeddingInitiated"]["weddingContractAddress"])
+    chain.mine(timestamp=wedding_date_begin + START_TO_VOTE_SECONDS)
+    for fiance in fiances:
+        wedding_contract.confirmWedding({"from": fiance})
+
+    chain.mine(timestamp=wedding_date_begin + DAY_IN_SECONDS)
+    second = accounts[0] if second_is_authority else fiances[1]
+    if second_is_authority and authority_count > 1:
+        # the slowest case of the former linear scan: the approving authority is the last one
+        registry_contract.updateAuthorities(authorities[1:] + [accounts[0]], {"from": accounts[0]})
+    initiated = wedding_contract.divorce({"from": fiances[0]})
+    approved = wedding_contract.divorce({"from": second})
+    return initiated.gas_used, approved.gas_used
+
+
+def main(*authority_counts):
+    """Measures the gas of both divorce calls for the fiance-fiance and the fiance-authority path
+    with a growing number of authorities. Every run starts from the same snapshot.
+    Usage: brownie run scripts/divorce_gas.py main [<authorities> ...]
+    """
+    authority_counts = [int(count) for count in authority_counts] or AUTHORITY_COUNTS
+    print(f"\n{'authorities':>12}{'path':>20}{'initiate':>12}{'approve':>12}")
+    for authority_count in authority_counts:
+        for second_is_authority in (False, True):
+            chain.snapshot()
+            try:
+                initiated, approved = divorce_gas(authority_count, second_is_authority)
+            finally:
+                chain.revert()
+            path = "fiance-authority" if second_is_authority else "fiance-fiance"
+            print(f"{authority_count:>12}{path:>20}{initiated:>12,}{approved:>12,}")
@@ -0,0 +1,10 @@
+from wedding_client.artifacts import export_artifacts, source_hash
+
+
+def main():
+    """Exports abi and bytecode of the freshly compiled contracts as prebuilt artifacts keyed by the
+    source hash. Scripts using wedding_client then start without loading the brownie project.
+    Usage: brownie run scripts/export_artifacts.py
+    """
+    path = export_artifacts()
+    print(f"Prebuilt artifacts for source hash {source_hash()} written to {path}")
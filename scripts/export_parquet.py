@@ -0,0 +1,37 @@
+"""Indexes the events of a registry and its weddings into sqlite and exports one row per wedding
+(initiation, wedding date, guests, votes, outcome, confirmation and divorce times) as a Parquet
+dataset partitioned by wedding day. Indexing resumes where the previous run stopped and the export
+streams the rows in chunks, so neither step holds all weddings in memory.
+Usage: python -m scripts.export_parquet <registry address> [--rpc <url>] [--database <path>] [--output <dir>]
+"""
+import argparse
+
+DEFAULT_RPC_URL = "http://127.0.0.1:8545"
+DEFAULT_DATABASE = "reports/weddings.sqlite"
+DEFAULT_OUTPUT = "reports/weddings.parquet"
+
+
+def main(registry_address, rpc_url=DEFAULT_RPC_URL, database=DEFAULT_DATABASE, output=DEFAULT_OUTPUT, chunk_size=100_000):
+    from pathlib import Path
+
+    from wedding_client import WeddingIndexer, connect, export_parquet
+
+    Path(database).parent.mkdir(parents=True, exist_ok=True)
+    indexer = WeddingIndexer(connect(rpc_url), registry_address, database)
+    logs = indexer.sync()
+    print(f"indexed {logs} logs up to block {indexer.last_block}")
+    indexer.close()
+
+    rows = export_parquet(database, output, int(chunk_size))
+    print(f"exported {rows} weddings to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("registry_address")
+    parser.add_argument("--rpc", default=DEFAULT_RPC_URL)
+    parser.add_argument("--database", default=DEFAULT_DATABASE)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.registry_address, args.rpc, args.database, args.output, args.chunk_size)
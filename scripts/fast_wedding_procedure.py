@@ -0,0 +1,47 @@
+"""The wedding procedure of wedding_procedure_example.py without brownie.
+
+Uses the prebuilt artifacts (see export_artifacts.py) and the wedding_client package, so neither the
+brownie project nor the compiler is loaded. Requires a local development node, e.g. `ganache`.
+Usage: python -m scripts.fast_wedding_procedure [<rpc url>]
+"""
+import sys
+
+DEFAULT_RPC_URL = "http://127.0.0.1:8545"
+
+
+def main(rpc_url=DEFAULT_RPC_URL):
+    from wedding_client import RpcChain, WeddingClient, connect, deploy_registry
+
+    web3 = connect(rpc_url)
+    chain = RpcChain(web3)
+    accounts = web3.eth.accounts
+    authorities = accounts[0:3]
+    fiances = accounts[3:5]
+    guests = accounts[5:9]
+
+    client = WeddingClient(web3=web3, registry_address=deploy_registry(web3, authorities))
+
+    wedding_date = chain.time() + 86400
+    wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+    for fiance in fiances:
+        client.approve_guests(wedding_address, guests, fiance)
+
+    # fast forward to begining of wedding date
+    wedding_date_begin = (wedding_date // 86400) * 86400
+    chain.mine(timestamp=wedding_date_begin)
+
+    # one guest votes against the wedding
+    client.vote(wedding_address, guests[0])
+
+    # fast forward to ceremony
+    chain.mine(timestamp=wedding_date_begin + 36000)
+    for fiance in fiances:
+        client.confirm(wedding_address, fiance)
+
+    # show wedding certificate
+    for fiance in fiances:
+        print(client.token_id_of(fiance))
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
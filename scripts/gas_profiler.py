@@ -0,0 +1,172 @@
+import re
+from collections import defaultdict
+from pathlib import Path
+
+from brownie import WeddingRegistry, WeddingContract, accounts, chain
+
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+
+CALL_OPCODES = ("CALL", "CALLCODE", "DELEGATECALL", "STATICCALL", "CREATE", "CREATE2")
+MODIFIER_REGEX = re.compile(rb"\bmodifier\s+(\w+)\s*\([^)]*\)[^{]*\{")
+
+
+class ModifierMap:
+    """Maps source offsets to the modifier whose body contains them.
+    Modifiers are inlined by the compiler, the trace only tells us the source offset of each step."""
+
+    def __init__(self):
+        self._spans = {}  # {filename: [(start, end, modifier name)]}
+
+    def _parse(self, filename):
+        source = Path(filename).read_bytes()
+        spans = []
+        for match in MODIFIER_REGEX.finditer(source):
+            # find the closing brace of the modifier body
+            depth, end = 1, match.end()
+            while depth and end < len(source):
+                depth += {ord("{"): 1, ord("}"): -1}.get(source[end], 0)
+                end += 1
+            spans.append((match.start(), end, match.group(1).decode()))
+        return spans
+
+    def lookup(self, source):
+        if not source:
+            return None
+        filename, (start, end) = source["filename"], source["offset"]
+        if filename not in self._spans:
+            try:
+                self._spans[filename] = self._parse(filename)
+            except OSError:
+                self._spans[filename] = []
+        for span_start, span_end, name in self._spans[filename]:
+            if span_start <= start and end <= span_end:
+                return name
+        return None
+
+
+class GasProfile:
+    """Aggregates the gas of transaction traces per call stack, contract, function and modifier."""
+
+    def __init__(self):
+        self.stacks = defaultdict(int)  # {"frame;frame;...": gas}
+        self.by_contract = defaultdict(int)
+        self.by_function = defaultdict(int)
+        self.by_modifier = defaultdict(int)
+        self.overhead = 0  # intrinsic gas minus refunds, not visible in the trace
+        self.transactions = 0
+        self._modifiers = ModifierMap()
+
+    def add_transaction(self, tx):
+        trace = tx.trace
+        if not trace:
+            return
+        self.transactions += 1
+
+        internal_calls = []  # [[fn at jumpDepth 0, fn at jumpDepth 1, ...] per call depth]
+        traced_gas = 0
+        for i, step in enumerate(trace):
+            depth, jump_depth = step["depth"], step.get("jumpDepth", 0)
+            del internal_calls[depth + 1:]
+            if len(internal_calls) <= depth:
+                internal_calls.append([])
+            frames = internal_calls[depth]
+            del frames[jump_depth + 1:]
+            if len(frames) <= jump_depth:
+                frames.extend([step["fn"]] * (jump_depth + 1 - len(frames)))
+            frames[jump_depth] = step["fn"]
+
+            gas = step["gasCost"]
+            if step["op"] in CALL_OPCODES and i + 1 < len(trace) and trace[i + 1]["depth"] > depth:
+                # the reported cost of a call includes the gas forwarded to the callee,
+                # which is accounted for by the steps of the callee
+                gas = step["gas"] - trace[i + 1]["gas"]
+            traced_gas += gas
+
+            stack = [fn for calls in internal_calls for fn in calls]
+            modifier = self._modifiers.lookup(step.get("source"))
+            if modifier is not None:
+                modifier = f"{step['contractName']}.{modifier}[modifier]"
+                stack.append(modifier)
+                self.by_modifier[modifier] += gas
+
+            self.stacks[";".join(stack)] += gas
+            self.by_contract[step["contractName"]] += gas
+            self.by_function[step["fn"]] += gas
+
+        overhead = tx.gas_used - traced_gas
+        self.overhead += overhead
+        if overhead > 0:
+            self.stacks[f"{trace[0]['fn']};[intrinsic gas and refunds]"] += overhead
+
+    def write_collapsed(self, path):
+        """Writes the stacks in the collapsed format understood by flamegraph.pl and speedscope."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as fp:
+            for stack, gas in sorted(self.stacks.items()):
+                if gas > 0:
+                    fp.write(f"{stack} {gas}\n")
+        return path
+
+    def print(self, top=15):
+        print(f"\nGas profile of {self.transactions} transactions "
+              f"(intrinsic gas minus refunds: {self.overhead:,})")
+        for title, values in (
+            ("contract", self.by_contract),
+            ("function", self.by_function),
+            ("modifier", self.by_modifier),
+        ):
+            print(f"\n{title:<60}{'gas':>12}")
+            for name, gas in sorted(values.items(), key=lambda item: -item[1])[:top]:
+                print(f"{name:<60}{gas:>12,}")
+
+
+def run_lifecycle():
+    """Runs one wedding through the whole lifecycle. The divorce is initiated by a fiance and
+    approved by an authority, so that the wedReg.isAuthority callback shows up in the profile."""
+    authorities = accounts[0:2]
+    fiances = accounts[2:4]
+    guests = accounts[4:8]
+
+    wedding_implementation_contract = WeddingContract.deploy({"from": authorities[0]})
+    registry_contract = WeddingRegistry.deploy(
+        authorities, wedding_implementation_contract.address, {"from": authorities[0]}
+    )
+
+    txs = []
+    wedding_date = chain.time() + DAY_IN_SECONDS
+    wedding_date_begin = (wedding_date // DAY_IN_SECONDS) * DAY_IN_SECONDS
+    tx = registry_contract.initiateWedding(fiances, wedding_date, {"from": fiances[0]})
+    txs.append(tx)
+    wedding_contract = WeddingContract.at(tx.events["WeddingInitiated"]["weddingContractAddress"])
+
+    for fiance in fiances:
+        for guest in guests:
+            txs.append(wedding_contract.approveGuest(guest, {"from": fiance}))
+
+    chain.mine(timestamp=wedding_date_begin)
+    txs.append(wedding_contract.voteAgainstWedding({"from": guests[0]}))
+
+    chain.mine(timestamp=wedding_date_begin + START_TO_VOTE_SECONDS)
+    for fiance in fiances:
+        txs.append(wedding_contract.confirmWedding({"from": fiance}))
+
+    chain.mine(timestamp=wedding_date_begin + DAY_IN_SECONDS)
+    txs.append(wedding_contract.divorce({"from": fiances[0]}))
+    txs.append(wedding_contract.divorce({"from": authorities[0]}))
+    return txs
+
+
+def main(output="reports/gas_profile.folded"):
+    """Profiles the gas of a full wedding lifecycle and writes a collapsed-stack file, which can be
+    turned into a flamegraph with e.g. `flamegraph.pl --countname gas <output> > gas.svg`.
+    Usage: brownie run scripts/gas_profiler.py main [<output>]
+    """
+    profile = GasProfile()
+    for tx in run_lifecycle():
+        profile.add_transaction(tx)
+    profile.print()
+    path = profile.write_collapsed(output)
+    print(f"\nCollapsed stacks written to {path}")
+    return profile
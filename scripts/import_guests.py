@@ -0,0 +1,43 @@
+"""Approves the guests of a CSV guest list for every fiance of a wedding (see wedding_client/guest_import.py).
+
+The file is streamed and deduplicated, the approvals are sent in chunks that fit into a block and
+progress is checkpointed next to the file, running the same command again resumes an interrupted import.
+Approvals that would revert are dropped by the preflight, which simulates every approval on its own
+against the latest block; the approvals of one chunk are independent of each other, so this is exact here.
+Usage: python -m scripts.import_guests <registry address> <wedding address> <csv file> <fiance>
+    [--rpc <url>] [--column <name>] [--checkpoint <path>]
+"""
+import argparse
+
+DEFAULT_RPC_URL = "http://127.0.0.1:8545"
+
+
+def main(
+    registry_address, wedding_address, csv_path, fiance, rpc_url=DEFAULT_RPC_URL, column="address", checkpoint=None
+):
+    from wedding_client import GuestImport, WeddingClient
+
+    client = WeddingClient(rpc_url, registry_address)
+    guest_import = GuestImport(client, wedding_address, csv_path, checkpoint, column)
+    guests = guest_import.run(fiance)
+    print(f"imported {guests} unique guests, checkpoint {guest_import.checkpoint_path}")
+    if guest_import.invalid_lines:
+        invalid = guest_import.invalid_lines
+        print(f"skipped {len(invalid)} rows without a valid address, e.g. line {invalid[0]}")
+    for reason, count in guest_import.dropped.items():
+        print(f"not sent ({reason}): {count}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("registry_address")
+    parser.add_argument("wedding_address")
+    parser.add_argument("csv_path")
+    parser.add_argument("fiance", help="one of the fiances, all fiances must be unlocked on the node")
+    parser.add_argument("--rpc", default=DEFAULT_RPC_URL)
+    parser.add_argument("--column", default="address")
+    parser.add_argument("--checkpoint")
+    args = parser.parse_args()
+    main(
+        args.registry_address, args.wedding_address, args.csv_path, args.fiance, args.rpc, args.column, args.checkpoint
+    )
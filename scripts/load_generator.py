@@ -0,0 +1,185 @@
+import statistics
+import time
+from collections import defaultdict
+
+from brownie import WeddingRegistry, WeddingContract, WeddingRouter, accounts, chain
+
+from scripts.tx_sender import PipelinedSender
+
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+
+PHASES = ["initiate", "approve", "vote", "confirm", "divorce"]
+
+
+def percentile(sorted_samples, p):
+    # nearest-rank percentile, also well defined for a single sample
+    rank = max(1, -(-len(sorted_samples) * p // 100))
+    return sorted_samples[rank - 1]
+
+
+class LoadReport:
+    """Collects submit-to-receipt latencies and gas usage of all transactions of a load run."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)  # {phase: [seconds]}
+        self.gas_per_wedding = defaultdict(int)  # {wedding index: gas used until the wedding got registered}
+        self.divorce_gas_per_wedding = defaultdict(int)
+        self.transactions = 0
+        self.failed = 0
+        self.started = None
+        self.finished = None
+
+    def record(self, phase, pending):
+        self.transactions += 1
+        if pending.error is not None:
+            self.failed += 1
+        if pending.confirmed_at is None:
+            return
+        self.latencies[phase].append(pending.confirmed_at - pending.submitted_at)
+        if phase == "divorce":
+            self.divorce_gas_per_wedding[pending.label] += pending.tx.gas_used
+        else:
+            self.gas_per_wedding[pending.label] += pending.tx.gas_used
+
+    def print(self, completed_weddings):
+        duration = self.finished - self.started
+        print(f"\n{self.transactions} transactions in {duration:.2f}s "
+              f"({self.transactions / duration:.1f} tx/s), {self.failed} failed")
+        print(f"{'phase':<10}{'txs':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+        for phase in PHASES:
+            samples = self.latencies[phase]
+            if not samples:
+                continue
+            samples = sorted(samples)
+            print(f"{phase:<10}{len(samples):>8}{percentile(samples, 50) * 1000:>10.1f}"
+                  f"{percentile(samples, 90) * 1000:>10.1f}{percentile(samples, 99) * 1000:>10.1f}"
+                  f"{samples[-1] * 1000:>10.1f}")
+        if completed_weddings:
+            wedding_gas = [self.gas_per_wedding[i] for i in completed_weddings]
+            divorce_gas = [self.divorce_gas_per_wedding[i] for i in completed_weddings]
+            print(f"gas per completed wedding: {statistics.mean(wedding_gas):,.0f} (mean), "
+                  f"{max(wedding_gas):,} (max), divorce: {statistics.mean(divorce_gas):,.0f} (mean)")
+
+
+def get_funded_accounts(count, funder):
+    # the local node only comes with a few unlocked accounts, generate and fund the missing ones
+    while len(accounts) - 1 < count:
+        new_account = accounts.add()
+        funder.transfer(new_account, "1 ether")
+    return list(accounts[1:count + 1])
+
+
+def run_phase(report, phase, calls):
+    """Fires all transactions of a phase back-to-back without waiting for receipts in between,
+    so the transactions of all weddings are processed concurrently by the node.
+    `calls` is a list of (wedding index, contract function, args, sender) tuples.
+    Returns the PendingTransactions of the phase, failed ones are counted by the report.
+    """
+    sender = PipelinedSender()
+    for wedding_index, fn, args, account in calls:
+        sender.submit(fn, *args, sender=account, label=wedding_index)
+
+    results = sender.collect()
+    for pending in results:
+        report.record(phase, pending)
+
+    return results
+
+
+def deploy_shards(deployer, shards):
+    """Deploys `shards` registries behind a router. Returns the contract to initiate weddings with
+    (a single shard is used directly) and the registries by address."""
+    wedding_implementation_contract = WeddingContract.deploy({"from": deployer})
+    registry_contracts = [
+        WeddingRegistry.deploy([deployer], wedding_implementation_contract.address, {"from": deployer})
+        for _ in range(shards)
+    ]
+    registries = {registry_contract.address: registry_contract for registry_contract in registry_contracts}
+    if shards == 1:
+        return registry_contracts[0], registries
+    router_contract = WeddingRouter.deploy(registry_contracts, {"from": deployer})
+    for registry_contract in registry_contracts:
+        registry_contract.setRouter(router_contract, {"from": deployer})
+    return router_contract, registries
+
+
+def main(weddings=10, fiances=2, guests=4, shards=1):
+    """Drives `weddings` concurrent weddings with `fiances` fiances and `guests` guests each through
+    the whole wedding lifecycle on the local node and reports throughput, latencies and gas usage.
+    With `shards` > 1 the weddings are spread over that many registries by a WeddingRouter.
+    Usage: brownie run scripts/load_generator.py main <weddings> <fiances> <guests> [<shards>]
+    """
+    weddings, fiances, guests, shards = int(weddings), int(fiances), int(guests), int(shards)
+    if fiances < 2:
+        raise ValueError("At least two fiances are required")
+
+    deployer = accounts[0]
+    # every wedding gets its own fiances, the guests are shared between all weddings
+    participants = get_funded_accounts(weddings * fiances + guests, deployer)
+    fiances_list = [participants[i * fiances:(i + 1) * fiances] for i in range(weddings)]
+    guest_list = participants[weddings * fiances:]
+    # less than half of the guests vote against the wedding so that every wedding gets through
+    voters = guest_list[: guests // 2]
+
+    initiating_contract, registries = deploy_shards(deployer, shards)
+
+    report = LoadReport()
+    report.started = time.perf_counter()
+
+    wedding_date = chain.time() + DAY_IN_SECONDS
+    wedding_date_begin = (wedding_date // DAY_IN_SECONDS) * DAY_IN_SECONDS
+
+    initiated = run_phase(report, "initiate", [
+        (i, initiating_contract.initiateWedding, (fiances_list[i], wedding_date), fiances_list[i][0])
+        for i in range(weddings)
+    ])
+    # a failed initiation has no event (or no receipt at all), its wedding is left out of the later phases
+    initiated = [pending for pending in initiated if pending.succeeded]
+    # reading the address from the event avoids tracing the transaction for its return value
+    wedding_contracts = {
+        pending.label: WeddingContract.at(pending.tx.events["WeddingInitiated"]["weddingContractAddress"])
+        for pending in initiated
+    }
+    # the registry (shard) of every wedding is the emitter of its WeddingInitiated event
+    wedding_registries = {
+        pending.label: registries[pending.tx.events["WeddingInitiated"].address] for pending in initiated
+    }
+
+    run_phase(report, "approve", [
+        (i, wedding_contract.approveGuest, (guest,), fiance)
+        for i, wedding_contract in wedding_contracts.items()
+        for fiance in fiances_list[i]
+        for guest in guest_list
+    ])
+
+    chain.mine(timestamp=wedding_date_begin)
+    run_phase(report, "vote", [
+        (i, wedding_contract.voteAgainstWedding, (), voter)
+        for i, wedding_contract in wedding_contracts.items()
+        for voter in voters
+    ])
+
+    chain.mine(timestamp=wedding_date_begin + START_TO_VOTE_SECONDS)
+    run_phase(report, "confirm", [
+        (i, wedding_contract.confirmWedding, (), fiance)
+        for i, wedding_contract in wedding_contracts.items()
+        for fiance in fiances_list[i]
+    ])
+    completed_weddings = [
+        i for i, wedding_contract in wedding_contracts.items()
+        if wedding_registries[i].balanceOf(wedding_contract) > 0
+    ]
+
+    chain.mine(timestamp=wedding_date_begin + DAY_IN_SECONDS)
+    run_phase(report, "divorce", [
+        (i, wedding_contracts[i].divorce, (), fiance)
+        for i in completed_weddings
+        for fiance in fiances_list[i][:2]
+    ])
+
+    report.finished = time.perf_counter()
+    print(f"\n{len(completed_weddings)}/{weddings} weddings completed on {shards} shard(s) "
+          f"({fiances} fiances, {guests} guests, {len(voters)} votes against each)")
+    report.print(completed_weddings)
+    return report
@@ -0,0 +1,94 @@
+"""Sends the three kinds of queries concurrently to a running query service for a while and reports
+requests per second and latency percentiles per kind. The queried addresses and days are sampled
+from the service's database, so the requests hit existing rows.
+Usage: python -m scripts.load_test_query_service [--url <url>] [--database <path>] [--threads N] [--seconds N]
+"""
+import argparse
+import random
+import sqlite3
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+
+DEFAULT_URL = "http://127.0.0.1:8600"
+DEFAULT_DATABASE = "reports/weddings.sqlite"
+SAMPLE_SIZE = 1000
+
+
+def percentile(sorted_samples, p):
+    # nearest-rank percentile, also well defined for a single sample
+    rank = max(1, -(-len(sorted_samples) * p // 100))
+    return sorted_samples[rank - 1]
+
+
+def sample_paths(database):
+    db = sqlite3.connect(f"file:{database}?mode=ro", uri=True)
+    try:
+        fiances = [row[0] for row in db.execute("SELECT fiance FROM fiances LIMIT ?", (SAMPLE_SIZE,))]
+        weddings = [row[0] for row in db.execute("SELECT address FROM weddings LIMIT ?", (SAMPLE_SIZE,))]
+        days = [row[0] for row in db.execute("SELECT DISTINCT wedding_day FROM weddings LIMIT ?", (SAMPLE_SIZE,))]
+    finally:
+        db.close()
+    if not weddings:
+        raise ValueError(f"{database} has no weddings to query")
+    paths = {
+        "married": [f"/married/{fiance}" for fiance in fiances],
+        "guests": [f"/weddings/{wedding}/guests" for wedding in weddings],
+        "day": [f"/days/{time.strftime('%Y-%m-%d', time.gmtime(day))}/weddings" for day in days],
+    }
+    # kinds without sampled rows are not queried, the workers pick from the remaining ones
+    return {kind: kind_paths for kind, kind_paths in paths.items() if kind_paths}
+
+
+def main(url=DEFAULT_URL, database=DEFAULT_DATABASE, threads=8, seconds=10.0):
+    paths = sample_paths(database)
+    latencies = defaultdict(list)  # {kind: [seconds]}
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker(seed):
+        rng = random.Random(seed)
+        samples, failed = defaultdict(list), defaultdict(int)
+        while time.perf_counter() < deadline:
+            kind = rng.choice(list(paths))
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url + rng.choice(paths[kind])) as response:
+                    response.read()
+            except OSError:
+                failed[kind] += 1
+                continue
+            samples[kind].append(time.perf_counter() - started)
+        with lock:
+            for kind, values in samples.items():
+                latencies[kind] += values
+            for kind, count in failed.items():
+                errors[kind] += count
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    total = sum(len(samples) for samples in latencies.values())
+    print(f"\n{total} requests in {seconds:.0f}s with {threads} threads ({total / seconds:.0f} req/s)")
+    print(f"{'query':<10}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p99 ms':>10}")
+    for kind in paths:
+        samples = sorted(latencies[kind])
+        if not samples:
+            continue
+        print(f"{kind:<10}{len(samples):>10}{errors[kind]:>8}{percentile(samples, 50) * 1000:>10.2f}"
+              f"{percentile(samples, 99) * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=DEFAULT_URL)
+    parser.add_argument("--database", default=DEFAULT_DATABASE)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+    main(args.url, args.database, args.threads, args.seconds)
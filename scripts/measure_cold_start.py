@@ -0,0 +1,38 @@
+"""Measures the wall time of the wedding procedure through brownie and through the fast-start path.
+
+Both variants do the same transactions, so the difference is the start-up cost: loading the brownie
+project, resolving the remappings and checking the compilation versus reading the prebuilt artifacts.
+Start a local node on port 8545 first (brownie attaches to it instead of launching its own) and
+export the prebuilt artifacts with `brownie run scripts/export_artifacts.py`.
+Usage: python -m scripts.measure_cold_start [<runs>]
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+COMMANDS = {
+    "brownie run": ["brownie", "run", "scripts/wedding_procedure_example.py"],
+    "fast start": [sys.executable, "-m", "scripts.fast_wedding_procedure"],
+}
+
+
+def measure(command, runs):
+    durations = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        durations.append(time.perf_counter() - started)
+    return durations
+
+
+def main(runs=5):
+    runs = int(runs)
+    print(f"{'path':<16}{'min s':>10}{'median s':>10}")
+    for name, command in COMMANDS.items():
+        durations = measure(command, runs)
+        print(f"{name:<16}{min(durations):>10.2f}{statistics.median(durations):>10.2f}")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,169 @@
+"""Compiles the registry and the wedding contract under a matrix of optimizer runs and via-IR on/off,
+deploys every build on a local node and runs a complete wedding lifecycle with it (initiation, guest
+approvals, a vote, confirmations and a divorce). Prints the deploy gas of the registry and the wedding
+implementation next to the gas of every lifecycle call, and for every build the number of weddings
+after which it pays off against the default build (200 runs, no via-IR): the implementation and the
+registry are deployed once, while every wedding deploys a proxy and runs all calls.
+Every build runs from the same chain snapshot, so the numbers are directly comparable.
+Usage: python -m scripts.optimizer_matrix [--rpc <url>] [--runs 0 1 200 ...] [--guests N] [--output <path>]
+"""
+import argparse
+import json
+from collections import defaultdict
+from pathlib import Path
+
+DEFAULT_RPC_URL = "http://127.0.0.1:8545"
+DEFAULT_RUNS = [0, 1, 200, 1000, 10000, 1000000]  # 0 disables the optimizer
+DEFAULT_GUESTS = 4
+DEFAULT_OUTPUT = "reports/optimizer_matrix.json"
+BASELINE = (200, False)  # brownie's default settings
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+# {function name: column label}
+LIFECYCLE_CALLS = {
+    "initiateWedding": "initiate",
+    "approveGuest": "approve",
+    "voteAgainstWedding": "vote",
+    "confirmWedding": "confirm",
+    "divorce": "divorce",
+}
+
+
+def _receipt(web3, tx_hash):
+    receipt = web3.eth.wait_for_transaction_receipt(tx_hash)
+    if receipt["status"] != 1:
+        raise RuntimeError(f"transaction {tx_hash.hex()} reverted")
+    return receipt
+
+
+def deploy(web3, output, args, sender):
+    factory = web3.eth.contract(abi=output["abi"], bytecode=output["evm"]["bytecode"]["object"])
+    receipt = _receipt(web3, factory.constructor(*args).transact({"from": sender}))
+    return receipt["contractAddress"], receipt["gasUsed"]
+
+
+def run_lifecycle(web3, chain, outputs, guests):
+    """Deploys a build and runs one wedding through its lifecycle.
+    Returns the deploy gas per contract and the gas of every call as {function name: [gas]}."""
+    authority, *fiances = web3.eth.accounts[:3]
+    guest_accounts = web3.eth.accounts[3 : 3 + guests]
+    calls = defaultdict(list)
+
+    def transact(fn_call, sender):
+        receipt = _receipt(web3, fn_call.transact({"from": sender}))
+        calls[fn_call.fn_name].append(receipt["gasUsed"])
+        return receipt
+
+    implementation_address, implementation_gas = deploy(web3, outputs["WeddingContract"], [], authority)
+    registry_address, registry_gas = deploy(
+        web3, outputs["WeddingRegistry"], [[authority], implementation_address], authority
+    )
+    registry = web3.eth.contract(address=registry_address, abi=outputs["WeddingRegistry"]["abi"])
+
+    wedding_date = chain.time() + DAY_IN_SECONDS
+    start_of_wedding_day = wedding_date - wedding_date % DAY_IN_SECONDS
+    receipt = transact(registry.functions.initiateWedding(fiances, wedding_date), fiances[0])
+    wedding_address = registry.events.WeddingInitiated().process_receipt(receipt)[0]["args"]["weddingContractAddress"]
+    wedding = web3.eth.contract(address=wedding_address, abi=outputs["WeddingContract"]["abi"])
+
+    for fiance in fiances:
+        for guest in guest_accounts:
+            transact(wedding.functions.approveGuest(guest), fiance)
+
+    chain.mine(timestamp=start_of_wedding_day)
+    # less than half of the guests vote, the wedding still takes place
+    for guest in guest_accounts[: (guests - 1) // 2]:
+        transact(wedding.functions.voteAgainstWedding(), guest)
+
+    chain.mine(timestamp=start_of_wedding_day + START_TO_VOTE_SECONDS)
+    for fiance in fiances:
+        transact(wedding.functions.confirmWedding(), fiance)
+
+    chain.mine(timestamp=start_of_wedding_day + DAY_IN_SECONDS)
+    transact(wedding.functions.divorce(), fiances[0])
+    transact(wedding.functions.divorce(), authority)
+
+    return {"WeddingContract": implementation_gas, "WeddingRegistry": registry_gas}, dict(calls)
+
+
+def evaluate(web3, runs_list, guests):
+    from wedding_client import RpcChain, compile_contracts
+    from wedding_client.compiler import select_solc_version
+
+    chain = RpcChain(web3)
+    solc_version = select_solc_version()
+    results = []
+    for via_ir in (False, True):
+        for runs in runs_list:
+            row = {"runs": runs, "via_ir": via_ir}
+            try:
+                outputs = compile_contracts(runs or None, via_ir, solc_version)
+            except Exception as e:  # e.g. "stack too deep" without via-IR
+                row["error"] = str(e).splitlines()[0]
+                results.append(row)
+                continue
+            snapshot = chain.snapshot()
+            try:
+                row["deploy"], calls = run_lifecycle(web3, chain, outputs, guests)
+            finally:
+                chain.revert(snapshot)
+            row["calls"] = {name: round(sum(gas) / len(gas)) for name, gas in calls.items()}
+            # everything one wedding costs: the proxy deployment (initiation) and all calls
+            row["per_wedding"] = sum(sum(gas) for gas in calls.values())
+            results.append(row)
+            print(f"runs {runs:>8} via-IR {str(via_ir):<5} done")
+    return results
+
+
+def break_even(row, baseline):
+    """The number of weddings after which `row` is cheaper than `baseline` in total, None if never,
+    0 if it is cheaper from the start."""
+    deploy_difference = sum(row["deploy"].values()) - sum(baseline["deploy"].values())
+    saved_per_wedding = baseline["per_wedding"] - row["per_wedding"]
+    if deploy_difference <= 0:
+        return 0 if saved_per_wedding >= 0 else None
+    if saved_per_wedding <= 0:
+        return None
+    return -(-deploy_difference // saved_per_wedding)
+
+
+def print_table(results):
+    baseline = next(
+        (row for row in results if (row["runs"], row["via_ir"]) == BASELINE and "error" not in row), None
+    )
+    header = f"{'runs':>8} {'via-IR':<7}{'impl':>11}{'registry':>11}"
+    header += "".join(f"{label:>10}" for label in LIFECYCLE_CALLS.values())
+    header += f"{'per wedding':>13}{'break-even':>12}"
+    print("\n" + header)
+    for row in results:
+        prefix = f"{row['runs']:>8} {str(row['via_ir']):<7}"
+        if "error" in row:
+            print(f"{prefix}failed: {row['error']}")
+            continue
+        line = prefix + f"{row['deploy']['WeddingContract']:>11,}{row['deploy']['WeddingRegistry']:>11,}"
+        line += "".join(f"{row['calls'].get(name, 0):>10,}" for name in LIFECYCLE_CALLS)
+        weddings = break_even(row, baseline) if baseline is not None else None
+        line += f"{row['per_wedding']:>13,}{'-' if weddings is None else weddings:>12}"
+        print(line)
+    print("calls: mean gas per call; break-even: weddings until the build is cheaper than 200 runs without via-IR")
+
+
+def main(rpc_url=DEFAULT_RPC_URL, runs_list=DEFAULT_RUNS, guests=DEFAULT_GUESTS, output=DEFAULT_OUTPUT):
+    from wedding_client import connect
+
+    results = evaluate(connect(rpc_url), runs_list, guests)
+    print_table(results)
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w") as fp:
+        json.dump(results, fp, indent=2)
+    print(f"results written to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rpc", default=DEFAULT_RPC_URL)
+    parser.add_argument("--runs", type=int, nargs="+", default=DEFAULT_RUNS, help="0 disables the optimizer")
+    parser.add_argument("--guests", type=int, default=DEFAULT_GUESTS)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args()
+    main(args.rpc, args.runs, args.guests, args.output)
@@ -0,0 +1,29 @@
+"""Serves read-only queries (is X married, guests of a wedding, weddings on a day) from a local index
+of the registry's events, kept in sync in the background (see wedding_client/query_service.py).
+Usage: python -m scripts.query_service <registry address> [--rpc <url>] [--database <path>] [--port <port>]
+"""
+import argparse
+
+DEFAULT_RPC_URL = "http://127.0.0.1:8545"
+DEFAULT_DATABASE = "reports/weddings.sqlite"
+
+
+def main(registry_address, rpc_url=DEFAULT_RPC_URL, database=DEFAULT_DATABASE, port=8600, poll_interval=2.0):
+    from pathlib import Path
+
+    from wedding_client import connect
+    from wedding_client.query_service import serve
+
+    Path(database).parent.mkdir(parents=True, exist_ok=True)
+    serve(connect(rpc_url), registry_address, database, port=int(port), poll_interval=float(poll_interval))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("registry_address")
+    parser.add_argument("--rpc", default=DEFAULT_RPC_URL)
+    parser.add_argument("--database", default=DEFAULT_DATABASE)
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    args = parser.parse_args()
+    main(args.registry_address, args.rpc, args.database, args.port, args.poll_interval)
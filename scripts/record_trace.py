@@ -0,0 +1,25 @@
+"""Records the calls to a registry and its weddings in a range of blocks into a trace file
+(see wedding_client/trace.py), e.g. the production traffic of a day.
+Usage: python -m scripts.record_trace <registry address> <output.jsonl.gz> [--rpc <url>] [--from-block N] [--to-block N]
+"""
+import argparse
+
+DEFAULT_RPC_URL = "http://127.0.0.1:8545"
+
+
+def main(registry_address, output, rpc_url=DEFAULT_RPC_URL, from_block=0, to_block=None):
+    from wedding_client import connect, record_trace
+
+    calls = record_trace(connect(rpc_url), registry_address, output, from_block, to_block)
+    print(f"recorded {calls} calls to {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("registry_address")
+    parser.add_argument("output")
+    parser.add_argument("--rpc", default=DEFAULT_RPC_URL)
+    parser.add_argument("--from-block", type=int, default=0)
+    parser.add_argument("--to-block", type=int)
+    args = parser.parse_args()
+    main(args.registry_address, args.output, args.rpc, args.from_block, args.to_block)
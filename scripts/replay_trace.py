@@ -0,0 +1,51 @@
+"""Replays a trace file against a fresh registry on a local node with time travel and prints the
+gas and latency of every function, compared to the recorded gas or to an earlier replay.
+
+To check a new wedding implementation before switching changeWeddingContractImplementationAddress,
+replay with the current build and save the report, then replay with the build of the new implementation:
+    python -m scripts.replay_trace trace.jsonl.gz --save reports/replay_current.json
+    python -m scripts.replay_trace trace.jsonl.gz --implementation-build <dir> --baseline reports/replay_current.json
+Usage: python -m scripts.replay_trace <trace.jsonl.gz> [--rpc <url>] [--speed X] [--max-wait S]
+    [--implementation-build <dir>] [--baseline <report.json>] [--save <report.json>]
+"""
+import argparse
+import json
+from pathlib import Path
+
+DEFAULT_RPC_URL = "http://127.0.0.1:8545"
+
+
+def main(
+    trace_path,
+    rpc_url=DEFAULT_RPC_URL,
+    speed=None,
+    max_wait=60.0,
+    implementation_build=None,
+    baseline=None,
+    save=None,
+):
+    from wedding_client import connect, replay_trace
+
+    report = replay_trace(connect(rpc_url), trace_path, speed, max_wait, None, implementation_build)
+    if baseline is not None:
+        with open(baseline) as fp:
+            baseline = json.load(fp)
+    report.print(baseline)
+    if save is not None:
+        Path(save).parent.mkdir(parents=True, exist_ok=True)
+        with open(save, "w") as fp:
+            json.dump(report.as_dict(), fp, indent=2)
+        print(f"report written to {save}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("trace_path")
+    parser.add_argument("--rpc", default=DEFAULT_RPC_URL)
+    parser.add_argument("--speed", type=float, help="1.0 replays at the original speed, default: as fast as possible")
+    parser.add_argument("--max-wait", type=float, default=60.0, help="longest wait per gap, the rest is time travel")
+    parser.add_argument("--implementation-build", help="build directory of the wedding implementation to replay with")
+    parser.add_argument("--baseline", help="report of an earlier replay to compare with")
+    parser.add_argument("--save", help="write the report to this file")
+    args = parser.parse_args()
+    main(args.trace_path, args.rpc, args.speed, args.max_wait, args.implementation_build, args.baseline, args.save)
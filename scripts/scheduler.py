@@ -0,0 +1,156 @@
+from brownie import WeddingContract
+
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+
+
+class SchedulingError(Exception):
+    pass
+
+
+class ScheduledAction:
+    """An action that has to run at a chain time within [earliest, deadline)."""
+
+    def __init__(self, fn, earliest, deadline, label, seq):
+        self.fn = fn
+        self.earliest = earliest
+        self.deadline = deadline  # None means the action never expires
+        self.label = label
+        self.seq = seq  # insertion order, used to keep the order of actions with the same earliest time
+
+    def __repr__(self):
+        return f"<ScheduledAction {self.label} [{self.earliest}, {self.deadline})>"
+
+
+def wedding_windows(wedding_date):
+    """Returns the time windows of the wedding phases as defined by the modifiers of the wedding contract.
+    The end of a window is exclusive, None means that the window never ends."""
+    start_of_day = wedding_date - (wedding_date % DAY_IN_SECONDS)
+    return {
+        "before": (0, start_of_day),
+        "voting": (start_of_day, start_of_day + START_TO_VOTE_SECONDS),
+        "ceremony": (start_of_day + START_TO_VOTE_SECONDS, start_of_day + DAY_IN_SECONDS),
+        "after": (start_of_day + DAY_IN_SECONDS, None),
+    }
+
+
+class ScheduledWedding:
+    """Handle to a wedding added with ScenarioScheduler.add_wedding, `contract` is set once it got initiated."""
+
+    def __init__(self, fiances, wedding_date):
+        self.fiances = fiances
+        self.wedding_date = wedding_date
+        self.contract = None
+
+
+class ScenarioScheduler:
+    """Runs the actions of many wedding timelines with as few time jumps as possible.
+
+    Every action is only valid within a time window. All actions are sorted by the start of their
+    window and grouped greedily such that all windows of a group overlap. The chain is then advanced
+    once per group (to the latest window start of the group) and all actions of the group are run.
+    Many weddings on the same day therefore share a single chain.mine per phase.
+    """
+
+    def __init__(self, chain):
+        self.chain = chain
+        self.actions = []
+
+    def add(self, fn, earliest=0, deadline=None, label=None):
+        action = ScheduledAction(fn, earliest, deadline, label or getattr(fn, "__name__", "action"), len(self.actions))
+        self.actions.append(action)
+        return action
+
+    def add_in_phase(self, wedding_date, phase, fn, label=None):
+        earliest, deadline = wedding_windows(wedding_date)[phase]
+        return self.add(fn, earliest, deadline, label)
+
+    def add_wedding(
+        self,
+        registry_contract,
+        fiances,
+        wedding_date,
+        guests=(),
+        voters=(),
+        confirming_fiances=None,
+        divorcers=(),
+    ):
+        """Adds the whole timeline of a wedding: initiation and guest approvals before the wedding day,
+        votes against the wedding during the voting period, confirmations during the ceremony and
+        a divorce after the wedding day. By default all fiances confirm and nobody divorces.
+        """
+        wedding = ScheduledWedding(fiances, wedding_date)
+        confirming_fiances = fiances if confirming_fiances is None else confirming_fiances
+
+        def initiate():
+            tx = registry_contract.initiateWedding(fiances, wedding_date, {"from": fiances[0]})
+            wedding.contract = WeddingContract.at(tx.events["WeddingInitiated"]["weddingContractAddress"])
+
+        self.add_in_phase(wedding_date, "before", initiate, "initiateWedding")
+        for fiance in fiances:
+            for guest in guests:
+                self.add_in_phase(
+                    wedding_date, "before",
+                    lambda guest=guest, fiance=fiance: wedding.contract.approveGuest(guest, {"from": fiance}),
+                    "approveGuest",
+                )
+        for voter in voters:
+            self.add_in_phase(
+                wedding_date, "voting",
+                lambda voter=voter: wedding.contract.voteAgainstWedding({"from": voter}),
+                "voteAgainstWedding",
+            )
+        for fiance in confirming_fiances:
+            self.add_in_phase(
+                wedding_date, "ceremony",
+                lambda fiance=fiance: wedding.contract.confirmWedding({"from": fiance}),
+                "confirmWedding",
+            )
+        for divorcer in divorcers:
+            self.add_in_phase(
+                wedding_date, "after",
+                lambda divorcer=divorcer: wedding.contract.divorce({"from": divorcer}),
+                "divorce",
+            )
+        return wedding
+
+    def plan(self):
+        """Groups the actions into time windows. Returns a list of (timestamp, actions) tuples
+        where timestamp is the chain time the group has to run at (at the earliest).
+        """
+        groups = []
+        group, group_time, group_deadline = [], None, None
+        for action in sorted(self.actions, key=lambda a: (a.earliest, a.seq)):
+            time = action.earliest if group_time is None else max(group_time, action.earliest)
+            deadline = _min_deadline(group_deadline, action.deadline)
+            if group and deadline is not None and time >= deadline:
+                groups.append((group_time, group))
+                group, time, deadline = [], action.earliest, action.deadline
+            group.append(action)
+            group_time, group_deadline = time, deadline
+        if group:
+            groups.append((group_time, group))
+        return groups
+
+    def run(self):
+        """Runs all added actions in their time windows. Returns the number of time jumps."""
+        mines = 0
+        for timestamp, group in self.plan():
+            if self.chain.time() < timestamp:
+                self.chain.mine(timestamp=timestamp)
+                mines += 1
+            now = self.chain.time()
+            for action in group:
+                if action.deadline is not None and now >= action.deadline:
+                    raise SchedulingError(f"{action} is due before the current chain time {now}")
+                action.fn()
+        self.actions = []
+        return mines
+
+
+def _min_deadline(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
@@ -0,0 +1,53 @@
+"""Builds and serves pre-baked chain states (see wedding_client/pools.py).
+
+`build` runs the scenario once on a fresh ganache node and stores its database under
+`pools/<source hash>-<scenario>/`, nothing happens if the pool already exists. `serve` starts a node
+on a copy of the pool and keeps it running, brownie attaches to it instead of launching its own chain:
+    python -m scripts.state_pool serve --married 10000 --pending 1000 --divorced 100
+    brownie run scripts/load_generator.py  # in another terminal, against the populated registry
+Usage: python -m scripts.state_pool {build,serve} [--married N] [--pending N] [--divorced N] [--guests N]
+"""
+import argparse
+import time
+
+
+def main(command, scenario, port, ganache_cmd, rebuild=False):
+    from wedding_client.pools import build_pool, load_pool
+
+    if command == "build":
+        started = time.perf_counter()
+        path = build_pool(scenario, port=port, ganache_cmd=ganache_cmd, rebuild=rebuild)
+        print(f"pool {path} ready after {time.perf_counter() - started:.1f} s")
+        return
+
+    build_pool(scenario, port=port, ganache_cmd=ganache_cmd)
+    started = time.perf_counter()
+    with load_pool(scenario, port=port, ganache_cmd=ganache_cmd) as (node, manifest):
+        print(f"loaded pool {manifest['key']} in {time.perf_counter() - started:.1f} s")
+        print(f"rpc {node.rpc_url}, registry {manifest['registry']}, authority {manifest['authority']}")
+        print(
+            f"{len(manifest['married'])} married, {len(manifest['divorced'])} divorced, "
+            f"{len(manifest['pending'])} pending weddings, press Ctrl+C to stop"
+        )
+        try:
+            while node.process.poll() is None:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    from wedding_client.pools import DEFAULT_GANACHE_CMD, DEFAULT_PORT, PoolScenario
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["build", "serve"])
+    parser.add_argument("--married", type=int, default=10_000)
+    parser.add_argument("--pending", type=int, default=1_000)
+    parser.add_argument("--divorced", type=int, default=100)
+    parser.add_argument("--guests", type=int, default=0)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--ganache", default=DEFAULT_GANACHE_CMD)
+    parser.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+    scenario = PoolScenario(args.married, args.pending, args.divorced, args.guests)
+    main(args.command, scenario, args.port, args.ganache, args.rebuild)
@@ -0,0 +1,129 @@
+import time
+
+from brownie import web3
+from brownie.exceptions import VirtualMachineError
+
+from wedding_client.nonces import NonceTracker
+
+
+class PendingTransaction:
+    """A transaction handed to the PipelinedSender together with its outcome."""
+
+    def __init__(self, fn, args, sender, label, gas_limit):
+        self.fn = fn
+        self.args = args
+        self.sender = sender
+        self.label = label
+        self.gas_limit = gas_limit
+        self.nonce = None
+        self.tx = None  # brownie TransactionReceipt once the transaction was broadcast
+        self.error = None  # reason why the transaction failed, None if it did not fail (yet)
+        self.attempts = 0
+        self.submitted_at = None
+        self.confirmed_at = None
+
+    @property
+    def succeeded(self):
+        return self.tx is not None and self.tx.status == 1
+
+    def __repr__(self):
+        return f"<PendingTransaction {self.label} nonce={self.nonce} error={self.error!r}>"
+
+
+class PipelinedSender:
+    """Sends transactions back-to-back and collects their receipts in bulk.
+
+    Nonces are tracked locally per account (by the NonceTracker of wedding_client), so no transaction
+    has to wait for the confirmation of the previous one and many transactions end up in the same block. Transactions that could not
+    be broadcast or got dropped are retried, transactions that reverted are reported.
+    """
+
+    def __init__(self, max_retries=2):
+        self.max_retries = max_retries
+        self.nonces = NonceTracker(web3)
+        self._queue = []
+
+    def _send(self, pending, nonce=None):
+        if nonce is None:
+            nonce = self.nonces.next(pending.sender.address)
+        pending.attempts += 1
+        tx_params = {"from": pending.sender, "nonce": nonce, "required_confs": 0, "allow_revert": True}
+        if pending.gas_limit is not None:
+            tx_params["gas_limit"] = pending.gas_limit
+
+        pending.submitted_at = time.perf_counter()
+        try:
+            pending.tx = pending.fn(*pending.args, tx_params)
+        except (VirtualMachineError, ValueError) as e:
+            # the transaction never reached the node, so its nonce is still unused, resync it
+            pending.tx = None
+            pending.error = str(e)
+            self.nonces.reset(pending.sender.address)
+            return
+
+        pending.nonce = nonce
+        pending.error = None
+
+    def submit(self, fn, *args, sender, label=None, gas_limit=None):
+        """Broadcasts `fn(*args)` from `sender` without waiting for it to be mined.
+        `fn` is a brownie contract function, e.g. `wedding_contract.approveGuest`.
+        Returns a PendingTransaction which gets updated by `collect`.
+        """
+        pending = PendingTransaction(fn, args, sender, fn._name if label is None else label, gas_limit)
+        self._send(pending)
+        self._queue.append(pending)
+        return pending
+
+    def collect(self):
+        """Waits for the receipts of all transactions submitted since the last call.
+        Transactions that could not be broadcast or were dropped are resent up to `max_retries` times.
+        Returns all PendingTransactions in submission order, `error` is set for every failed one.
+        """
+        submitted, self._queue = self._queue, []
+        unresolved = submitted
+        while unresolved:
+            retry = []
+            for pending in unresolved:
+                if pending.tx is None:
+                    if not _is_revert(pending.error):
+                        retry.append((pending, None))
+                    continue
+                try:
+                    pending.tx.wait(1)
+                except Exception as e:
+                    # dropped from the mempool, resend with the same nonce so later nonces do not get stuck
+                    pending.error = f"dropped: {e}"
+                    retry.append((pending, pending.nonce))
+                    continue
+                pending.confirmed_at = time.perf_counter()
+                if pending.tx.status != 1:
+                    pending.error = f"reverted: {pending.tx.revert_msg}"
+
+            unresolved = []
+            for pending, nonce in retry:
+                if pending.attempts > self.max_retries:
+                    continue
+                self._send(pending, nonce)
+                unresolved.append(pending)
+
+        return submitted
+
+    def send_all(self, calls):
+        """Convenience wrapper that submits all `(fn, args, sender)` tuples and collects them."""
+        for fn, args, sender in calls:
+            self.submit(fn, *args, sender=sender)
+        return self.collect()
+
+
+def _is_revert(error):
+    # reverts are deterministic, resending the same transaction would only revert again
+    return error is not None and "revert" in error.lower()
+
+
+def raise_on_failures(results):
+    failures = [pending for pending in results if pending.error is not None]
+    if failures:
+        raise RuntimeError(
+            f"{len(failures)} of {len(results)} transactions failed: "
+            + ", ".join(f"{pending.label} ({pending.error})" for pending in failures)
+        )
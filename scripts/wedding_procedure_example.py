@@ -1,5 +1,7 @@
 from brownie import WeddingRegistry, WeddingContract, accounts, chain
 
+from scripts.tx_sender import PipelinedSender, raise_on_failures
+
 
 def main():
     authorities = accounts[0:3]
@@ -17,9 +19,12 @@ def main():
     ).return_value
     wedding_contract = WeddingContract.at(wedding_contract_addr)
 
+    # all approvals are sent back-to-back, their receipts are collected at once afterwards
+    sender = PipelinedSender()
     for fiance in fiances:
         for guest in guests:
-            wedding_contract.approveGuest(guest, {"from": fiance}).wait(1)
+            sender.submit(wedding_contract.approveGuest, guest, sender=fiance)
+    raise_on_failures(sender.collect())
 
     # fas forward to begining of wedding date
     wedding_date_begin = (wedding_date // 86400) * 86400
@@ -34,7 +39,8 @@ def main():
     chain.mine(timestamp=ceremony_begin)
 
     for fiance in fiances:
-        wedding_contract.confirmWedding({"from": fiance}).wait(1)
+        sender.submit(wedding_contract.confirmWedding, sender=fiance)
+    raise_on_failures(sender.collect())
 
     # show wedding certificate
     for fiance in fiances:
@@ -0,0 +1,49 @@
+import shutil
+import socket
+
+import pytest
+
+
+@pytest.hookimpl(tryfirst=True, optionalhook=True)
+def pytest_xdist_make_scheduler(config, log):
+    # brownie moves every xdist worker onto its own port (base port + worker number), so each worker
+    # launches its own local chain with the default accounts and no two workers share a node.
+    # brownie distributes whole test files, which caps the speedup at the number of test files.
+    # Every test is isolated (see below), so we can hand out single tests instead.
+    # Only called with pytest-xdist installed, serial runs do not need it.
+    from xdist.scheduler import LoadScheduling
+
+    return LoadScheduling(config, log)
+
+
+# the brownie fixtures of tests that touch the local chain
+CHAIN_FIXTURES = {"chain", "accounts", "web3", "history"}
+
+
+@pytest.fixture(autouse=True)
+def isolation(request):
+    # every test on the chain starts from the same chain state and time, no matter which worker
+    # runs it or which tests ran before. Time travel (chain.mine(timestamp=...)) is reverted
+    # afterwards. Pure Python tests skip the snapshot.
+    if CHAIN_FIXTURES.intersection(request.fixturenames):
+        request.getfixturevalue("fn_isolation")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(scope="session")
+def state_pool(tmp_path_factory):
+    # a small pre-baked chain on its own ganache node next to brownie's chain, see wedding_client/pools.py
+    from wedding_client.pools import DEFAULT_GANACHE_CMD, PoolScenario, build_pool, load_pool
+
+    if shutil.which(DEFAULT_GANACHE_CMD) is None:
+        pytest.skip(f"{DEFAULT_GANACHE_CMD} is not installed")
+    scenario = PoolScenario(married=3, pending=2, divorced=1, guests=2)
+    pools_path = tmp_path_factory.mktemp("pools")
+    build_pool(scenario, pools_path, port=_free_port())
+    with load_pool(scenario, pools_path, port=_free_port()) as (node, manifest):
+        yield node, manifest
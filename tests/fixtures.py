@@ -1,7 +1,7 @@
 from typing import List
 
 import pytest
-from brownie import WeddingRegistry, WeddingContract
+from brownie import WeddingRegistry, WeddingContract, WeddingRouter
 import brownie
 
 DAY_IN_SECONDS = 86400
@@ -15,6 +15,19 @@ def create_registry_contract(authorities):
     return registry_contract
 
 
+def create_sharded_registries(authorities, shards):
+    # all shards share one wedding implementation
+    wedding_implementation_contract = WeddingContract.deploy({"from": authorities[0]})
+    registry_contracts = [
+        WeddingRegistry.deploy(authorities, wedding_implementation_contract.address, {"from": authorities[0]})
+        for _ in range(shards)
+    ]
+    router_contract = WeddingRouter.deploy(registry_contracts, {"from": authorities[0]})
+    for registry_contract in registry_contracts:
+        registry_contract.setRouter(router_contract, {"from": authorities[0]})
+    return router_contract, registry_contracts
+
+
 def add_succesfull_wedding(chain, registry_contract, fiances, wedding_date, guests):
     wedding_contract_addr = registry_contract.initiateWedding(
         fiances, wedding_date, {"from": fiances[0]}
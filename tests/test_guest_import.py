@@ -0,0 +1,94 @@
+import json
+
+import pytest
+from brownie import web3
+
+from fixtures import create_registry_contract
+from wedding_client import GuestImport, WeddingClient, WeddingClientError
+
+DAY_IN_SECONDS = 86400
+
+
+def write_guest_list(path, rows):
+    with open(path, "w") as fp:
+        fp.write("name,address\n")
+        for i, address in enumerate(rows):
+            fp.write(f"guest {i},{address}\n")
+
+
+class TestGuestImport:
+    def test_import_and_resume(self, chain, accounts, tmp_path):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        guests = [account.address for account in accounts[4:9]]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        client = WeddingClient(web3.provider.endpoint_uri, registry_contract.address)
+        wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+        csv_path = tmp_path / "guests.csv"
+        write_guest_list(csv_path, guests[:3] + [guests[0].lower(), "not an address"] + guests[3:])
+
+        # the first fiance already approved the first guests, then the import was interrupted
+        client.approve_guests(wedding_address, guests[:2], fiances[0])
+        with open(f"{csv_path}.checkpoint.json", "w") as fp:
+            json.dump({"wedding": wedding_address, "done": {fiances[0].address: 2}, "pending": {}}, fp)
+
+        guest_import = GuestImport(client, wedding_address, csv_path)
+        assert guest_import.run(fiances[1]) == len(guests)
+        assert guest_import.invalid_lines == [6]
+        assert guest_import.checkpoint["done"] == {fiance.address: len(guests) for fiance in fiances}
+        assert web3.eth.get_transaction_count(fiances[0].address) == 1 + len(guests)
+
+        # importing again sends nothing
+        block = web3.eth.block_number
+        assert GuestImport(client, wedding_address, csv_path).run(fiances[0]) == len(guests)
+        assert web3.eth.block_number == block
+
+    def test_already_approved_guests_are_not_sent(self, chain, accounts, tmp_path):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        client = WeddingClient(web3.provider.endpoint_uri, registry_contract.address)
+        wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+        for fiance in fiances:
+            client.approve_guests(wedding_address, accounts[4:5], fiance)
+
+        csv_path = tmp_path / "guests.csv"
+        write_guest_list(csv_path, [account.address for account in accounts[4:7]])
+        guest_import = GuestImport(client, wedding_address, csv_path)
+        assert guest_import.run(fiances[0]) == 3
+        assert guest_import.dropped == {"Guest is already approved": 2}
+
+    def test_canceled_wedding(self, chain, accounts, tmp_path):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        client = WeddingClient(web3.provider.endpoint_uri, registry_contract.address)
+        wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+        client.revoke(wedding_address, fiances[1])
+
+        csv_path = tmp_path / "guests.csv"
+        write_guest_list(csv_path, [account.address for account in accounts[4:7]])
+        with pytest.raises(WeddingClientError, match="canceled"):
+            GuestImport(client, wedding_address, csv_path).run(fiances[0])
+
+    def test_wedding_past_approval_phase(self, chain, accounts, tmp_path):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        client = WeddingClient(web3.provider.endpoint_uri, registry_contract.address)
+        wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+        # the voting period starts with the wedding day
+        chain.mine(timestamp=wedding_date - wedding_date % DAY_IN_SECONDS)
+
+        csv_path = tmp_path / "guests.csv"
+        write_guest_list(csv_path, [account.address for account in accounts[4:7]])
+        with pytest.raises(WeddingClientError, match="voting phase"):
+            GuestImport(client, wedding_address, csv_path).run(fiances[0])
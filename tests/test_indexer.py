@@ -0,0 +1,114 @@
+import pytest
+from brownie import WeddingContract, web3
+from hexbytes import HexBytes
+
+from fixtures import add_pending_wedding, add_succesfull_wedding, create_registry_contract, divorce_wedding
+from wedding_client import WeddingIndexer, export_parquet
+from wedding_client.logs import LogDecoder
+
+DAY_IN_SECONDS = 86400
+
+
+class TestIndexer:
+    def test_wedding_rows(self, chain, accounts, tmp_path):
+        authorities = accounts[0:2]
+        guests = accounts[6:9]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        married = add_succesfull_wedding(chain, registry_contract, accounts[2:4], wedding_date + DAY_IN_SECONDS, guests)
+        pending = add_pending_wedding(chain, registry_contract, accounts[4:6], wedding_date + 2 * DAY_IN_SECONDS, [])
+        chain.mine(timestamp=chain.time() + 2 * DAY_IN_SECONDS)
+        divorce_wedding(married, [accounts[2], authorities[0]])
+
+        indexer = WeddingIndexer(web3, registry_contract.address, tmp_path / "weddings.sqlite", batch_blocks=3)
+        indexer.sync()
+        rows = {
+            row[0]: row[1:]
+            for row in indexer.db.execute(
+                "SELECT address, guests, confirmations, token_id, confirmed_at IS NOT NULL, divorced_at IS NOT NULL "
+                "FROM weddings"
+            )
+        }
+        assert rows[married.address] == (3, 2, 0, 1, 1)
+        assert rows[pending.address] == (0, 1, None, 0, 0)
+
+        # nothing happened since, syncing again does not change anything
+        assert indexer.sync() == 0
+        indexer.close()
+
+    def test_parquet_export(self, chain, accounts, tmp_path):
+        pq = pytest.importorskip("pyarrow.parquet")
+        authorities = accounts[0:2]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        add_succesfull_wedding(chain, registry_contract, accounts[2:4], wedding_date, accounts[6:8])
+        add_pending_wedding(chain, registry_contract, accounts[4:6], chain.time() + DAY_IN_SECONDS, [])
+        chain.mine(timestamp=chain.time() + 2 * DAY_IN_SECONDS)
+
+        database = tmp_path / "weddings.sqlite"
+        indexer = WeddingIndexer(web3, registry_contract.address, database)
+        indexer.sync()
+        indexer.close()
+
+        assert export_parquet(database, tmp_path / "weddings", chunk_size=1) == 2
+        table = pq.read_table(tmp_path / "weddings")
+        assert sorted(table.column("outcome").to_pylist()) == ["married", "unconfirmed"]
+        assert len(list((tmp_path / "weddings").iterdir())) == 2  # one partition per wedding day
+
+        # exporting again with other chunks replaces the earlier export, including a partition it no longer has
+        stale = tmp_path / "weddings" / "wedding_day=2000-01-01"
+        stale.mkdir()
+        next((tmp_path / "weddings").glob("*/part-0-0.parquet")).replace(stale / "part-0-0.parquet")
+        assert export_parquet(database, tmp_path / "weddings", chunk_size=100) == 2
+        assert pq.read_table(tmp_path / "weddings").num_rows == 2
+        assert not stale.exists()
+        assert [path.name for path in tmp_path.iterdir() if path.name.startswith(".")] == []
+
+
+class TestLogDecoder:
+    def test_decodes_like_brownie(self, chain, accounts):
+        authorities = accounts[0:2]
+        fiances = accounts[2:5]
+        registry_contract = create_registry_contract(authorities)
+        tx = registry_contract.initiateWedding(fiances, chain.time() + DAY_IN_SECONDS, {"from": fiances[0]})
+        wedding_address = tx.events["WeddingInitiated"]["weddingContractAddress"]
+
+        decoder = LogDecoder()
+        decoded = [decoder.decode(log) for log in tx.logs]
+        expected_args = {
+            "weddingContractAddress": wedding_address,
+            "fiances": [fiance.address for fiance in fiances],
+            "weddingDate": tx.events["WeddingInitiated"]["weddingDate"],
+        }
+        assert ("WeddingInitiated", expected_args) in decoded
+
+        wedding_contract = WeddingContract.at(wedding_address)
+        tx = wedding_contract.approveGuest(accounts[6], {"from": fiances[0]})
+        assert [decoder.decode(log) for log in tx.logs] == []
+        for fiance in fiances[1:]:
+            tx = wedding_contract.approveGuest(accounts[6], {"from": fiance})
+        assert [decoder.decode(log) for log in tx.logs] == [("inviteSent", {"invitee": accounts[6].address})]
+
+    def test_decodes_hexbytes_receipt_logs(self, chain, accounts):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        registry_contract = create_registry_contract(authorities)
+        tx = registry_contract.initiateWedding(fiances, chain.time() + DAY_IN_SECONDS, {"from": fiances[0]})
+
+        # the logs of a web3 receipt carry HexBytes topics and data
+        logs = web3.eth.get_transaction_receipt(tx.txid)["logs"]
+        logs = [{"topics": [HexBytes(topic) for topic in log["topics"]], "data": HexBytes(log["data"])} for log in logs]
+        decoded = dict(decoded for decoded in map(LogDecoder().decode, logs) if decoded is not None)
+        expected = dict(tx.events["WeddingInitiated"])
+        assert decoded["WeddingInitiated"] == {
+            "weddingContractAddress": expected["weddingContractAddress"],
+            "fiances": list(expected["fiances"]),
+            "weddingDate": expected["weddingDate"],
+        }
+
+    def test_unknown_events(self):
+        decoder = LogDecoder()
+        assert decoder.decode({"topics": ["0x" + "11" * 32], "data": "0x"}) is None
+        assert decoder.decode({"topics": [], "data": "0x"}) is None
@@ -0,0 +1,141 @@
+import random
+
+import pytest
+from brownie import WeddingContract
+from brownie.exceptions import VirtualMachineError
+
+from fixtures import create_registry_contract
+from wedding_client.model import ModelRevert, RegistryModel
+
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+# time travel only targets these offsets into a day, so the model and the chain never disagree
+# about the phase because of the few seconds between chain.time() and the next block
+SAFE_DAY_OFFSETS = [3600, START_TO_VOTE_SECONDS + 3600]
+ACTIONS = ["initiate", "approve", "revoke", "vote", "confirm", "divorce", "travel"]
+ACTION_WEIGHTS = [2, 6, 1, 3, 4, 3, 3]
+
+
+def model_outcome(call):
+    """None if the model call succeeds, otherwise ("revert", reason)."""
+    try:
+        call()
+    except ModelRevert as e:
+        return ("revert", e.reason)
+    return None
+
+
+def chain_outcome(fn, *args, sender):
+    try:
+        tx = fn(*args, {"from": sender})
+    except VirtualMachineError as e:
+        return ("revert", e.revert_msg), None
+    return None, tx
+
+
+def assert_same_outcome(expected, actual, action):
+    if expected is not None and expected[1] is None:
+        # the model only knows that the call reverts without a reason string (custom error or panic)
+        assert actual is not None, f"{action}: the model reverts, the chain does not"
+    else:
+        assert expected == actual, f"{action}: model {expected}, chain {actual}"
+
+
+class RandomScenario:
+    """Draws random actions and executes them on the model and on the chain."""
+
+    def __init__(self, rng, chain, accounts, registry_contract, model):
+        self.rng = rng
+        self.chain = chain
+        self.accounts = accounts
+        self.registry_contract = registry_contract
+        self.model = model
+        self.weddings = []  # [(wedding model, wedding contract)]
+
+    def _pick(self, members):
+        # mostly the accounts that are allowed to call, sometimes anyone
+        if members and self.rng.random() < 0.8:
+            return self.rng.choice(sorted(members, key=str))
+        return self.rng.choice(self.accounts)
+
+    def step(self):
+        action = self.rng.choices(ACTIONS, ACTION_WEIGHTS)[0]
+        if action == "travel":
+            now = self.chain.time()
+            target = now - now % DAY_IN_SECONDS + self.rng.randrange(3) * DAY_IN_SECONDS
+            target += self.rng.choice(SAFE_DAY_OFFSETS)
+            if target > now:
+                self.chain.mine(timestamp=target)
+            return
+        if action == "initiate":
+            self.initiate()
+            return
+        if not self.weddings:
+            return
+
+        wedding, contract = self.rng.choice(self.weddings)
+        now = self.chain.time()
+        if action == "approve":
+            sender, guest = self._pick(wedding.fiances), self.rng.choice(self.accounts)
+            expected = model_outcome(lambda: wedding.approve_guest(sender, guest, now))
+            actual, _ = chain_outcome(contract.approveGuest, guest, sender=sender)
+        elif action == "revoke":
+            sender = self._pick(wedding.fiances)
+            expected = model_outcome(lambda: wedding.revoke_engagement(sender, now))
+            actual, _ = chain_outcome(contract.revokeEngagement, sender=sender)
+        elif action == "vote":
+            sender = self._pick(wedding.approved_guests)
+            expected = model_outcome(lambda: wedding.vote_against_wedding(sender, now))
+            actual, _ = chain_outcome(contract.voteAgainstWedding, sender=sender)
+        elif action == "confirm":
+            sender = self._pick(wedding.fiances)
+            expected = model_outcome(lambda: wedding.confirm_wedding(sender, now))
+            actual, _ = chain_outcome(contract.confirmWedding, sender=sender)
+        else:
+            sender = self._pick(wedding.fiances + self.model.authorities)
+            expected = model_outcome(lambda: wedding.divorce(sender, now))
+            actual, _ = chain_outcome(contract.divorce, sender=sender)
+        assert_same_outcome(expected, actual, action)
+
+    def initiate(self):
+        fiances = self.rng.sample(list(self.accounts), self.rng.choice([2, 2, 3]))
+        wedding_date = self.chain.time() + self.rng.randrange(1, 3) * DAY_IN_SECONDS
+        now = self.chain.time()
+
+        actual, tx = chain_outcome(
+            self.registry_contract.initiateWedding, fiances, wedding_date, sender=fiances[0]
+        )
+        address = tx.return_value if tx is not None else None
+        expected = model_outcome(lambda: self.model.initiate_wedding(fiances[0], fiances, wedding_date, now, address))
+        assert_same_outcome(expected, actual, "initiate")
+        if tx is not None:
+            self.weddings.append((self.model.weddings[address], WeddingContract.at(address)))
+
+    def assert_same_state(self):
+        assert self.registry_contract.totalSupply() == self.model.total_supply()
+        for wedding, contract in self.weddings:
+            assert self.registry_contract.balanceOf(contract) == self.model.balance_of(wedding.address)
+        for account in self.accounts:
+            expected = model_outcome(lambda: self.model.get_my_wedding_contract_address(account))
+            try:
+                self.registry_contract.getMyWeddingContractAddress({"from": account})
+                actual = None
+            except VirtualMachineError as e:
+                actual = ("revert", e.revert_msg)
+            assert expected == actual
+
+
+class TestModel:
+    @pytest.mark.parametrize("seed", [1, 2, 3])
+    def test_differential(self, chain, accounts, seed):
+        authorities = accounts[0:1]
+        registry_contract = create_registry_contract(authorities)
+        model = RegistryModel(authorities)
+
+        now = chain.time()
+        chain.mine(timestamp=now - now % DAY_IN_SECONDS + DAY_IN_SECONDS + SAFE_DAY_OFFSETS[0])
+
+        scenario = RandomScenario(random.Random(seed), chain, accounts, registry_contract, model)
+        for _ in range(80):
+            scenario.step()
+        scenario.assert_same_state()
@@ -0,0 +1,79 @@
+import pytest
+
+# the classifier needs numpy, the wedding tests do not
+pytest.importorskip("numpy")
+
+from brownie import WeddingContract
+
+from fixtures import create_registry_contract
+from wedding_client.phase import (
+    AFTER_WEDDING_DAY,
+    BEFORE_WEDDING_DAY,
+    CEREMONY,
+    NO_TRANSITION,
+    VOTING,
+    classify_phases,
+)
+
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+
+
+class TestGetPhase:
+    def test_phases_follow_the_wedding_day(self, chain, accounts):
+        registry_contract = create_registry_contract(accounts[0:2])
+        wedding_date = chain.time() + DAY_IN_SECONDS
+        start_of_wedding_day = wedding_date - (wedding_date % DAY_IN_SECONDS)
+        wedding_contract = WeddingContract.at(
+            registry_contract.initiateWedding(
+                accounts[2:4], wedding_date, {"from": accounts[2]}
+            ).return_value
+        )
+        assert wedding_contract.getPhase() == BEFORE_WEDDING_DAY
+
+        # an hour into each phase, far away from the next transition
+        for offset, phase in [
+            (3600, VOTING),
+            (START_TO_VOTE_SECONDS + 3600, CEREMONY),
+            (DAY_IN_SECONDS + 3600, AFTER_WEDDING_DAY),
+        ]:
+            chain.mine(timestamp=start_of_wedding_day + offset)
+            assert wedding_contract.getPhase() == phase
+            phases, _ = classify_phases([wedding_date], chain.time())
+            assert phases[0] == phase
+
+    def test_canceled_wedding_still_has_phases(self, chain, accounts):
+        registry_contract = create_registry_contract(accounts[0:2])
+        wedding_date = chain.time() + DAY_IN_SECONDS
+        wedding_contract = WeddingContract.at(
+            registry_contract.initiateWedding(
+                accounts[2:4], wedding_date, {"from": accounts[2]}
+            ).return_value
+        )
+        wedding_contract.revokeEngagement({"from": accounts[2]})
+
+        chain.mine(timestamp=wedding_date - (wedding_date % DAY_IN_SECONDS) + DAY_IN_SECONDS)
+        assert wedding_contract.getPhase() == AFTER_WEDDING_DAY
+
+    def test_classifier_transitions(self):
+        start_of_wedding_day = 100 * DAY_IN_SECONDS
+        wedding_dates = [start_of_wedding_day + 5] * 6
+        timestamps = [
+            start_of_wedding_day - 1,
+            start_of_wedding_day,
+            start_of_wedding_day + START_TO_VOTE_SECONDS - 1,
+            start_of_wedding_day + START_TO_VOTE_SECONDS,
+            start_of_wedding_day + DAY_IN_SECONDS - 1,
+            start_of_wedding_day + DAY_IN_SECONDS,
+        ]
+        expected = [
+            (BEFORE_WEDDING_DAY, start_of_wedding_day),
+            (VOTING, start_of_wedding_day + START_TO_VOTE_SECONDS),
+            (VOTING, start_of_wedding_day + START_TO_VOTE_SECONDS),
+            (CEREMONY, start_of_wedding_day + DAY_IN_SECONDS),
+            (CEREMONY, start_of_wedding_day + DAY_IN_SECONDS),
+            (AFTER_WEDDING_DAY, NO_TRANSITION),
+        ]
+        for wedding_date, timestamp, (phase, next_transition) in zip(wedding_dates, timestamps, expected):
+            phases, next_transitions = classify_phases([wedding_date], timestamp)
+            assert (phases[0], next_transitions[0]) == (phase, next_transition)
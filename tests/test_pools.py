@@ -0,0 +1,24 @@
+from wedding_client import WeddingClient
+from wedding_client.pools import pool_accounts
+from wedding_client.phase import BEFORE_WEDDING_DAY
+
+
+class TestStatePool:
+    def test_load_pool(self, state_pool):
+        node, manifest = state_pool
+        client = WeddingClient(web3=node.web3, registry_address=manifest["registry"])
+        assert node.web3.eth.get_block("latest")["timestamp"] >= manifest["final_timestamp"]
+
+        for address in manifest["married"]:
+            fiance = manifest["fiances"][address][0]
+            assert client.wedding_of(fiance) == address
+        for address in manifest["divorced"]:
+            assert client.wedding_of(manifest["fiances"][address][0]) is None
+        for address in manifest["pending"]:
+            assert client.phase(address) == BEFORE_WEDDING_DAY
+
+        # only the accounts which can still act are unlocked, the pending weddings go on
+        assert set(node.web3.eth.accounts) == set(pool_accounts(manifest))
+        address = manifest["pending"][0]
+        client.revoke(address, manifest["fiances"][address][0])
+        assert client.status(address, manifest["fiances"][address][0]).canceled
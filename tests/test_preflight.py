@@ -0,0 +1,58 @@
+from brownie import web3
+
+from fixtures import create_registry_contract
+from wedding_client import WeddingClient, send_preflighted
+from wedding_client.preflight import TX_BASE_GAS, preflight
+
+DAY_IN_SECONDS = 86400
+
+
+class TestPreflight:
+    def test_doomed_calls_are_dropped(self, chain, accounts):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        guests = accounts[5:8]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        client = WeddingClient(web3.provider.endpoint_uri, registry_contract.address)
+        wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+        for fiance in fiances:
+            client.approve_guests(wedding_address, guests[:1], fiance)
+
+        functions = client.wedding(wedding_address).functions
+        # a new wedding of two accounts without a pending wedding
+        initiate = client.registry.functions.initiateWedding([accounts[4].address, accounts[8].address], wedding_date)
+        calls = [
+            (functions.approveGuest(guests[1].address), fiances[0]),
+            (functions.approveGuest(guests[1].address), fiances[0]),  # repeats the first call
+            (functions.approveGuest(guests[0].address), fiances[0]),  # already approved by both
+            (functions.approveGuest(guests[2].address), guests[0]),  # not a fiance
+            (functions.voteAgainstWedding(), guests[0]),  # before the wedding day
+            (initiate, accounts[4]),
+        ]
+        receipts, report = send_preflighted(client, calls)
+
+        assert len(receipts) == 2
+        assert [doomed.reason for doomed in report.doomed] == [
+            "Duplicate of an earlier call in the batch",
+            "Guest is already approved",
+            "Only fiances can call this function",
+            "Not possible in phase before (needs voting)",
+        ]
+        assert report.saved_gas > 4 * TX_BASE_GAS
+
+    def test_phase_model_with_known_dates(self, chain, accounts):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        client = WeddingClient(web3.provider.endpoint_uri, registry_contract.address)
+        wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+
+        functions = client.wedding(wedding_address).functions
+        calls = [(functions.confirmWedding(), fiance) for fiance in fiances] + [(functions.divorce(), fiances[0])]
+        report = preflight(client, calls, wedding_dates={wedding_address: wedding_date})
+        assert report.sendable == []
+        assert len(report.doomed) == 3
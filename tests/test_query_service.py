@@ -0,0 +1,67 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from brownie import web3
+
+from fixtures import add_pending_wedding, add_succesfull_wedding, create_registry_contract
+from wedding_client import WeddingIndexer
+from wedding_client.query_service import make_server
+
+DAY_IN_SECONDS = 86400
+
+
+def get(base_url, path):
+    try:
+        with urllib.request.urlopen(base_url + path) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as e:
+        return e.code, json.load(e)
+
+
+class TestQueryService:
+    def test_queries(self, chain, accounts, tmp_path):
+        authorities = accounts[0:2]
+        guests = accounts[6:9]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        married = add_succesfull_wedding(chain, registry_contract, accounts[2:4], wedding_date, guests)
+        pending = add_pending_wedding(chain, registry_contract, accounts[4:6], chain.time() + DAY_IN_SECONDS, [])
+
+        database = tmp_path / "weddings.sqlite"
+        indexer = WeddingIndexer(web3, registry_contract.address, database)
+        indexer.sync()
+        last_block = indexer.last_block
+        indexer.close()
+
+        server = make_server(database, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            status, body = get(base_url, f"/married/{accounts[2].address.lower()}")
+            assert status == 200
+            assert body["married"] and body["wedding"] == married.address and body["token_id"] == 0
+            assert body["block"] == last_block
+            assert not get(base_url, f"/married/{accounts[4]}")[1]["married"]
+
+            # two pages of guests
+            status, body = get(base_url, f"/weddings/{married.address}/guests?limit=2")
+            assert body["outcome"] == "married" and len(body["guests"]) == 2
+            _, last_page = get(base_url, f"/weddings/{married.address}/guests?limit=2&after={body['next']}")
+            assert last_page["next"] is None
+            assert sorted(body["guests"] + last_page["guests"]) == sorted(guest.address for guest in guests)
+
+            day = time.strftime("%Y-%m-%d", time.gmtime(wedding_date))
+            weddings = get(base_url, f"/days/{day}/weddings")[1]["weddings"]
+            assert [wedding["address"] for wedding in weddings] == [married.address]
+            assert get(base_url, f"/weddings/{pending.address}/guests")[1]["guests"] == []
+
+            assert get(base_url, "/married/not-an-address")[0] == 400
+            assert get(base_url, f"/weddings/{accounts[9]}/guests")[0] == 404
+            assert get(base_url, f"/days/{day}/weddings?limit=0")[0] == 400
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -59,6 +59,22 @@ class TestAuthority:
         emmitted_event = tx.events["AuthoritiesUpdated"]
         assert emmitted_event["authorities"] == new_authorities
 
+    def test_authority_epoch(self, accounts):
+        authorities = accounts[0:3]
+        registry_contract = create_registry_contract(authorities)
+        assert registry_contract.authorityEpoch() == 1
+
+        new_authorities = [accounts[2], accounts[3]]
+        registry_contract.updateAuthorities(new_authorities, {"from": authorities[0]})
+        assert registry_contract.authorityEpoch() == 2
+        # the lookup of the previous epoch is not consulted anymore
+        for acc in accounts[0:5]:
+            assert registry_contract.isAuthority(acc) == (acc in new_authorities)
+
+        # the same authorities again are still a new epoch
+        registry_contract.updateAuthorities(new_authorities, {"from": accounts[3]})
+        assert registry_contract.authorityEpoch() == 3
+
 
 class TestInitiateWedding:
     def test_initiateWedding_no_duplicates(self, chain, accounts):
@@ -152,54 +168,99 @@ class TestParallelWeddingScenarios:
         for acc in accounts[7:9]:
             assert registry_contract.getMyWeddingTokenId({"from": acc}) == 1
 
-    def test_parallel_weddings_same_fiances_slower_confirm_is_invalid(
+    def test_parallel_weddings_same_fiances_are_rejected_at_initiation(
         self, chain, accounts
     ):
         registry_contract = create_registry_contract(accounts[0:3])
-        wedding_contracts = add_parallel_pending_weddings(
-            chain,
-            registry_contract,
-            [accounts[4:6], accounts[4:6]],
-            chain.time() + DAY_IN_SECONDS,
+        wedding_date = chain.time() + DAY_IN_SECONDS
+        registry_contract.initiateWedding(
+            accounts[4:6], wedding_date, {"from": accounts[4]}
         )
 
-        # first wedding is finalized
-        wedding_contracts[0].confirmWedding({"from": accounts[5]})
-
-        # second wedding can not be finalized
-        with brownie.reverts("One of the fiances is already married"):
-            wedding_contracts[1].confirmWedding({"from": accounts[5]})
-
-        assert registry_contract.getMyWeddingTokenId({"from": accounts[4]}) == 0
+        # the fiances are reserved for the first wedding
+        with brownie.reverts("One of the fiances has a pending wedding"):
+            registry_contract.initiateWedding(
+                accounts[4:6], wedding_date, {"from": accounts[4]}
+            )
 
-    def test_parralel_weddings_overlapping_fiances_slower_confirm_is_invalid(
+    def test_parralel_weddings_overlapping_fiances_are_rejected_at_initiation(
         self, chain, accounts
     ):
         registry_contract = create_registry_contract(accounts[0:3])
         wedding_contracts = add_parallel_pending_weddings(
             chain,
             registry_contract,
-            [accounts[4:6], accounts[5:7]],
+            [accounts[4:6]],
             chain.time() + DAY_IN_SECONDS,
         )
 
-        # first wedding is finalized
+        with brownie.reverts("One of the fiances has a pending wedding"):
+            registry_contract.initiateWedding(
+                accounts[5:7], chain.time() + DAY_IN_SECONDS, {"from": accounts[6]}
+            )
+
+        # the first wedding is finalized without any interference
         wedding_contracts[0].confirmWedding({"from": accounts[5]})
         assert registry_contract.getMyWeddingTokenId({"from": accounts[4]}) == 0
         assert registry_contract.getMyWeddingTokenId({"from": accounts[5]}) == 0
-
-        # second wedding can not be finalized
-        with brownie.reverts("One of the fiances is already married"):
-            wedding_contracts[1].confirmWedding({"from": accounts[6]})
-
         with brownie.reverts("Only married accounts can call this function"):
             registry_contract.getMyWeddingTokenId({"from": accounts[6]})
 
+    def test_reservation_released_on_revoke(self, chain, accounts):
+        registry_contract = create_registry_contract(accounts[0:3])
+        wedding_date = chain.time() + DAY_IN_SECONDS
+        wedding_contract = WeddingContract.at(
+            registry_contract.initiateWedding(
+                accounts[4:6], wedding_date, {"from": accounts[4]}
+            ).return_value
+        )
+        wedding_contract.revokeEngagement({"from": accounts[5]})
+
+        registry_contract.initiateWedding(
+            accounts[5:7], wedding_date, {"from": accounts[5]}
+        )
+
+    def test_reservation_released_on_vote_cancel(self, chain, accounts):
+        registry_contract = create_registry_contract(accounts[0:3])
+        wedding_date = chain.time() + DAY_IN_SECONDS
+        wedding_contract = WeddingContract.at(
+            registry_contract.initiateWedding(
+                accounts[4:6], wedding_date, {"from": accounts[4]}
+            ).return_value
+        )
+        for fiance in accounts[4:6]:
+            wedding_contract.approveGuest(accounts[7], {"from": fiance})
+
+        chain.mine(timestamp=wedding_date - (wedding_date % DAY_IN_SECONDS) + 100)
+        wedding_contract.voteAgainstWedding({"from": accounts[7]})
+
+        registry_contract.initiateWedding(
+            accounts[4:6], chain.time() + DAY_IN_SECONDS, {"from": accounts[4]}
+        )
+
+    def test_reservation_expires_after_wedding_day(self, chain, accounts):
+        registry_contract = create_registry_contract(accounts[0:3])
+        wedding_date = chain.time() + DAY_IN_SECONDS
+        wedding_contract = add_pending_wedding(
+            chain, registry_contract, accounts[4:6], wedding_date, []
+        )
+
+        # only one fiance confirmed, the reservation holds until the end of the wedding day
+        with brownie.reverts("One of the fiances has a pending wedding"):
+            registry_contract.initiateWedding(
+                accounts[5:7], chain.time() + DAY_IN_SECONDS, {"from": accounts[5]}
+            )
+
+        chain.mine(timestamp=wedding_date - (wedding_date % DAY_IN_SECONDS) + DAY_IN_SECONDS)
+        registry_contract.initiateWedding(
+            accounts[5:7], chain.time() + DAY_IN_SECONDS, {"from": accounts[5]}
+        )
+        with brownie.reverts("Action can only be performed during the wedding day after the voting happened"):
+            wedding_contract.confirmWedding({"from": accounts[5]})
+
     def test_parallel_weddings_with_divorce(self, chain, accounts):
         registry_contract = create_registry_contract(accounts[0:3])
         wedding_date_1 = chain.time() + DAY_IN_SECONDS
-        wedding_date_2 = chain.time() + 2 * DAY_IN_SECONDS
-        wedding_date_2_start = wedding_date_2 - (wedding_date_2 % DAY_IN_SECONDS)
 
         # add pending wedding for next day
         wedding_contract_1 = WeddingContract.at(
@@ -207,23 +268,28 @@ class TestParallelWeddingScenarios:
                 accounts[4:6], wedding_date_1, {"from": accounts[4]}
             ).return_value
         )
-        # add other pending wedding with overlapping fiances the day after
-        wedding_contract_2 = WeddingContract.at(
-            registry_contract.initiateWedding(
-                accounts[5:7], wedding_date_2, {"from": accounts[5]}
-            ).return_value
-        )
 
         # finalize the first wedding
-        chain.mine(timestamp=wedding_date_1 + 36500)
+        chain.mine(timestamp=wedding_date_1 - (wedding_date_1 % DAY_IN_SECONDS) + 36500)
         wedding_contract_1.confirmWedding({"from": accounts[5]})
         wedding_contract_1.confirmWedding({"from": accounts[4]})
 
-        # divorce the first wedding right after the wedding date
-        chain.mine(timestamp=wedding_date_2_start + 100)
+        # a wedding with overlapping fiances is only possible after the divorce
+        with brownie.reverts("One of the fiances is already married"):
+            registry_contract.initiateWedding(
+                accounts[5:7], chain.time() + DAY_IN_SECONDS, {"from": accounts[5]}
+            )
+        chain.mine(timestamp=chain.time() + DAY_IN_SECONDS)
         divorce_wedding(wedding_contract_1, accounts[4:6])
+        wedding_date_2 = chain.time() + DAY_IN_SECONDS
+        wedding_date_2_start = wedding_date_2 - (wedding_date_2 % DAY_IN_SECONDS)
+        wedding_contract_2 = WeddingContract.at(
+            registry_contract.initiateWedding(
+                accounts[5:7], wedding_date_2, {"from": accounts[5]}
+            ).return_value
+        )
 
-        # finalize the second wedding -> should be possible agsin
+        # finalize the second wedding
         chain.mine(timestamp=wedding_date_2_start + 36500)
         wedding_contract_2.confirmWedding({"from": accounts[5]})
         wedding_contract_2.confirmWedding({"from": accounts[6]})
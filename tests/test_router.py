@@ -0,0 +1,106 @@
+import brownie
+from brownie import WeddingContract, WeddingRouter
+
+from fixtures import add_succesfull_wedding, create_registry_contract, create_sharded_registries, divorce_wedding
+
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+
+
+class TestRouting:
+    def test_shard_is_independent_of_fiance_order(self, chain, accounts):
+        authorities = accounts[0:1]
+        fiances = accounts[2:5]
+        router_contract, registry_contracts = create_sharded_registries(authorities, 4)
+
+        shard = router_contract.shardOf(fiances)
+        assert shard in registry_contracts
+        assert router_contract.shardOf(fiances[::-1]) == shard
+
+        tx = router_contract.initiateWedding(fiances[::-1], chain.time() + DAY_IN_SECONDS, {"from": fiances[0]})
+        assert tx.events["WeddingRouted"]["shard"] == shard
+        assert tx.events["WeddingInitiated"].address == shard
+
+    def test_weddings_are_spread_over_shards(self, accounts):
+        authorities = accounts[0:1]
+        router_contract, registry_contracts = create_sharded_registries(authorities, 2)
+        # fixed addresses, the accounts differ between test workers
+        couples = [[f"0x{2 * i + 1:040x}", f"0x{2 * i + 2:040x}"] for i in range(8)]
+        shards = {router_contract.shardOf(fiances) for fiances in couples}
+        assert shards == {registry_contract.address for registry_contract in registry_contracts}
+
+
+class TestMarriedIndex:
+    def test_married_in_another_shard(self, chain, accounts):
+        authorities = accounts[0:1]
+        fiances = accounts[2:4]
+        router_contract, registry_contracts = create_sharded_registries(authorities, 2)
+
+        wedding_contract = add_succesfull_wedding(
+            chain, registry_contracts[0], fiances, chain.time() + DAY_IN_SECONDS, []
+        )
+        assert router_contract.isMarried(fiances[0])
+        assert not router_contract.isMarried(accounts[4])
+        with brownie.reverts("One of the fiances is already married"):
+            registry_contracts[1].initiateWedding(
+                [fiances[0], accounts[4]], chain.time() + DAY_IN_SECONDS, {"from": accounts[4]}
+            )
+
+        chain.mine(timestamp=chain.time() + DAY_IN_SECONDS)
+        divorce_wedding(wedding_contract, [fiances[0], authorities[0]])
+        assert not router_contract.isMarried(fiances[0])
+        registry_contracts[1].initiateWedding(
+            [fiances[0], accounts[4]], chain.time() + DAY_IN_SECONDS, {"from": accounts[4]}
+        )
+
+    def test_no_certificate_if_married_in_another_shard(self, chain, accounts):
+        authorities = accounts[0:1]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+        _, registry_contracts = create_sharded_registries(authorities, 2)
+
+        # the same fiance in pending weddings of two shards
+        fiances_list = [accounts[2:4], [accounts[2], accounts[4]]]
+        wedding_contracts = [
+            WeddingContract.at(
+                registry_contract.initiateWedding(fiances, wedding_date, {"from": fiances[0]}).return_value
+            )
+            for registry_contract, fiances in zip(registry_contracts, fiances_list)
+        ]
+
+        chain.mine(timestamp=wedding_date - wedding_date % DAY_IN_SECONDS + START_TO_VOTE_SECONDS)
+        for fiance in fiances_list[0]:
+            wedding_contracts[0].confirmWedding({"from": fiance})
+        wedding_contracts[1].confirmWedding({"from": fiances_list[1][0]})
+        with brownie.reverts("One of the fiances is already married"):
+            wedding_contracts[1].confirmWedding({"from": fiances_list[1][1]})
+
+
+class TestSetRouter:
+    def test_router_can_only_be_set_once(self, accounts):
+        authorities = accounts[0:1]
+        router_contract, registry_contracts = create_sharded_registries(authorities, 1)
+        assert registry_contracts[0].router() == router_contract
+
+        with brownie.reverts("Router already set"):
+            registry_contracts[0].setRouter(router_contract, {"from": authorities[0]})
+
+    def test_only_shards(self, accounts):
+        authorities = accounts[0:1]
+        registry_contract = create_registry_contract(authorities)
+        router_contract, _ = create_sharded_registries(authorities, 1)
+
+        with brownie.reverts("Only authorized accounts can call this function"):
+            registry_contract.setRouter(router_contract, {"from": accounts[1]})
+        with brownie.reverts("Registry is not a shard of the router"):
+            registry_contract.setRouter(router_contract, {"from": authorities[0]})
+        with brownie.reverts("Only registry shards can call this function"):
+            router_contract.certificateBurned(accounts[2], {"from": accounts[2]})
+
+    def test_only_before_first_certificate(self, chain, accounts):
+        authorities = accounts[0:1]
+        registry_contract = create_registry_contract(authorities)
+        add_succesfull_wedding(chain, registry_contract, accounts[2:4], chain.time() + DAY_IN_SECONDS, [])
+
+        router_contract = WeddingRouter.deploy([registry_contract], {"from": authorities[0]})
+        with brownie.reverts("Router must be set before the first wedding certificate"):
+            registry_contract.setRouter(router_contract, {"from": authorities[0]})
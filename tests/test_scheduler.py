@@ -0,0 +1,61 @@
+import pytest
+
+from fixtures import create_registry_contract
+from scripts.scheduler import ScenarioScheduler, SchedulingError
+
+DAY_IN_SECONDS = 86400
+
+
+class TestScenarioScheduler:
+    def test_weddings_on_same_day_share_time_jumps(self, chain, accounts):
+        authorities = accounts[0:1]
+        fiances_list = [accounts[1:3], accounts[3:5], accounts[5:7]]
+        guests = accounts[7:10]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        scheduler = ScenarioScheduler(chain)
+        weddings = [
+            scheduler.add_wedding(
+                registry_contract, fiances, wedding_date, guests=guests, voters=guests[:1]
+            )
+            for fiances in fiances_list
+        ]
+
+        # one time jump to the voting period and one to the ceremony, shared by all weddings
+        assert scheduler.run() == 2
+        for wedding in weddings:
+            assert registry_contract.balanceOf(wedding.contract) == 1
+
+    def test_weddings_on_consecutive_days(self, chain, accounts):
+        authorities = accounts[0:1]
+        fiances_list = [accounts[1:3], accounts[3:5]]
+        guests = accounts[5:8]
+        first_wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        scheduler = ScenarioScheduler(chain)
+        weddings = [
+            scheduler.add_wedding(
+                registry_contract,
+                fiances,
+                first_wedding_date + i * DAY_IN_SECONDS,
+                guests=guests,
+                voters=guests[:1],
+                divorcers=fiances,
+            )
+            for i, fiances in enumerate(fiances_list)
+        ]
+
+        # the divorce of the first wedding and the voting of the second wedding share a time jump
+        assert scheduler.run() == 5
+        for wedding in weddings:
+            assert registry_contract.balanceOf(wedding.contract) == 0
+        assert registry_contract.totalSupply() == 0
+
+    def test_expired_action_raises(self, chain, accounts):
+        scheduler = ScenarioScheduler(chain)
+        scheduler.add(lambda: None, earliest=0, deadline=chain.time() - DAY_IN_SECONDS)
+
+        with pytest.raises(SchedulingError):
+            scheduler.run()
@@ -0,0 +1,181 @@
+import brownie
+from brownie import WeddingContract
+from brownie.exceptions import VirtualMachineError
+from brownie.test import strategy
+
+from fixtures import create_registry_contract
+from wedding_client.model import ModelRevert, RegistryModel
+
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+# time travel only targets these offsets into a day, far away from the phase boundaries (0 and 10 am),
+# so the few seconds between chain.time() and the timestamp of the next block never matter
+SAFE_DAY_OFFSETS = [3600, START_TO_VOTE_SECONDS + 3600]
+
+# gas ceiling per operation as (base, per fiance, per approved guest). Guests do not cost anything
+# per operation today, a ceiling of 0 per guest catches any change that starts looping over guests.
+GAS_CEILINGS = {
+    "initiateWedding": (400_000, 65_000, 0),
+    "approveGuest": (150_000, 10_000, 0),
+    "revokeEngagement": (100_000, 15_000, 0),
+    "voteAgainstWedding": (150_000, 15_000, 0),
+    "confirmWedding": (350_000, 50_000, 0),
+    "divorce": (200_000, 10_000, 0),
+}
+
+ANY_REVERT = object()  # the call reverts with a custom error instead of a reason string
+
+
+class StateMachine:
+    st_fiances = strategy("address[]", min_length=2, max_length=4, unique=True)
+    st_days = strategy("uint8", min_value=1, max_value=3)
+    st_wedding = strategy("uint8")
+    st_index = strategy("uint8")
+    st_as_member = strategy("bool")
+    st_account = strategy("address")
+    st_offset = strategy("uint8", max_value=len(SAFE_DAY_OFFSETS) * 3 - 1)
+
+    def __init__(cls, accounts):
+        cls.accounts = accounts
+        cls.authorities = accounts[0:1]
+        cls.registry = create_registry_contract(cls.authorities)
+
+    def setup(self):
+        # the expected state is kept by the same model the client uses (wedding_client.model)
+        self.model = RegistryModel(self.authorities)
+        self.weddings = []  # [(wedding model, wedding contract)]
+        # start at a safe offset into the current day
+        now = brownie.chain.time()
+        start_of_day = now - (now % DAY_IN_SECONDS)
+        brownie.chain.mine(timestamp=start_of_day + DAY_IN_SECONDS + SAFE_DAY_OFFSETS[0])
+
+    #### helpers
+    def _wedding(self, st_wedding):
+        if not self.weddings:
+            return None, None
+        return self.weddings[st_wedding % len(self.weddings)]
+
+    def _sender(self, members, st_index, st_as_member, st_account):
+        if st_as_member and members:
+            return sorted(members, key=str)[st_index % len(members)]
+        return st_account
+
+    def _expected_revert(self, model_call):
+        # applies the call to the model, which stays unchanged if it reverts
+        try:
+            model_call()
+        except ModelRevert as e:
+            return ANY_REVERT if e.reason is None else e.reason
+        return None
+
+    def _transact(self, wedding, fn, expected_revert, sender, *args):
+        if expected_revert is ANY_REVERT:
+            with brownie.reverts():
+                fn(*args, {"from": sender})
+            return None
+        if expected_revert is not None:
+            with brownie.reverts(expected_revert):
+                fn(*args, {"from": sender})
+            return None
+        tx = fn(*args, {"from": sender})
+        self._check_gas(fn.abi["name"], tx, wedding.fiances, wedding.approved_guests)
+        return tx
+
+    def _check_gas(self, fn_name, tx, fiances, approved_guests):
+        base, per_fiance, per_guest = GAS_CEILINGS[fn_name]
+        ceiling = base + per_fiance * len(fiances) + per_guest * len(approved_guests)
+        assert tx.gas_used <= ceiling, f"{fn_name} used {tx.gas_used} gas, ceiling is {ceiling}"
+
+    #### rules
+    def rule_initiate(self, st_fiances, st_days):
+        now = brownie.chain.time()
+        wedding_date = now + st_days * DAY_IN_SECONDS
+        fiances = list(st_fiances)
+        # the address of the new wedding is only known from the chain, the model follows it
+        try:
+            tx = self.registry.initiateWedding(fiances, wedding_date, {"from": fiances[0]})
+        except VirtualMachineError as e:
+            expected_revert = self._expected_revert(
+                lambda: self.model.initiate_wedding(fiances[0], fiances, wedding_date, now)
+            )
+            assert expected_revert is not None, f"initiateWedding reverted with {e.revert_msg}, the model does not"
+            assert expected_revert in (ANY_REVERT, e.revert_msg)
+            return
+        address = tx.events["WeddingInitiated"]["weddingContractAddress"]
+        self.model.initiate_wedding(fiances[0], fiances, wedding_date, now, address)
+        self._check_gas("initiateWedding", tx, fiances, [])
+        self.weddings.append((self.model.weddings[address], WeddingContract.at(address)))
+
+    def rule_approve(self, st_wedding, st_index, st_as_member, st_account):
+        wedding, contract = self._wedding(st_wedding)
+        if wedding is None:
+            return
+        sender = self._sender(wedding.fiances, st_index, st_as_member, st_account)
+        guest = st_account
+        now = brownie.chain.time()
+        expected_revert = self._expected_revert(lambda: wedding.approve_guest(sender, guest, now))
+        self._transact(wedding, contract.approveGuest, expected_revert, sender, guest)
+
+    def rule_revoke(self, st_wedding, st_index, st_as_member, st_account):
+        wedding, contract = self._wedding(st_wedding)
+        if wedding is None:
+            return
+        sender = self._sender(wedding.fiances, st_index, st_as_member, st_account)
+        now = brownie.chain.time()
+        expected_revert = self._expected_revert(lambda: wedding.revoke_engagement(sender, now))
+        self._transact(wedding, contract.revokeEngagement, expected_revert, sender)
+
+    def rule_vote(self, st_wedding, st_index, st_as_member, st_account):
+        wedding, contract = self._wedding(st_wedding)
+        if wedding is None:
+            return
+        sender = self._sender(wedding.approved_guests, st_index, st_as_member, st_account)
+        now = brownie.chain.time()
+        expected_revert = self._expected_revert(lambda: wedding.vote_against_wedding(sender, now))
+        self._transact(wedding, contract.voteAgainstWedding, expected_revert, sender)
+
+    def rule_confirm(self, st_wedding, st_index, st_as_member, st_account):
+        wedding, contract = self._wedding(st_wedding)
+        if wedding is None:
+            return
+        sender = self._sender(wedding.fiances, st_index, st_as_member, st_account)
+        now = brownie.chain.time()
+        expected_revert = self._expected_revert(lambda: wedding.confirm_wedding(sender, now))
+        self._transact(wedding, contract.confirmWedding, expected_revert, sender)
+
+    def rule_divorce(self, st_wedding, st_index, st_as_member, st_account):
+        wedding, contract = self._wedding(st_wedding)
+        if wedding is None:
+            return
+        sender = self._sender(wedding.fiances, st_index, st_as_member, st_account)
+        now = brownie.chain.time()
+        expected_revert = self._expected_revert(lambda: wedding.divorce(sender, now))
+        self._transact(wedding, contract.divorce, expected_revert, sender)
+
+    def rule_time_travel(self, st_offset):
+        # jump forward to a safe offset of today or one of the next two days
+        now = brownie.chain.time()
+        start_of_day = now - (now % DAY_IN_SECONDS)
+        days, offset_index = divmod(st_offset, len(SAFE_DAY_OFFSETS))
+        target = start_of_day + days * DAY_IN_SECONDS + SAFE_DAY_OFFSETS[offset_index]
+        if target > now:
+            brownie.chain.mine(timestamp=target)
+
+    #### invariants
+    def invariant_certificates(self):
+        assert self.registry.totalSupply() == self.model.total_supply()
+        for wedding, contract in self.weddings:
+            assert self.registry.balanceOf(contract) == self.model.balance_of(wedding.address)
+
+    def invariant_married_fiances(self):
+        for wedding, contract in self.weddings:
+            for fiance in wedding.fiances:
+                if not self.model.is_married(fiance) or self.model.wedding_of[fiance] != wedding.address:
+                    continue
+                assert self.registry.getMyWeddingContractAddress({"from": fiance}) == contract
+                partners = contract.getMyPartnersAddresses({"from": fiance})
+                assert [str(partner) for partner in partners] == [str(f) for f in wedding.fiances]
+
+
+def test_stateful(state_machine, accounts):
+    state_machine(StateMachine, accounts, settings={"max_examples": 25, "stateful_step_count": 40})
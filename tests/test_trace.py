@@ -0,0 +1,63 @@
+import gzip
+import json
+
+from brownie import web3
+
+from fixtures import add_succesfull_wedding, create_registry_contract
+from wedding_client.trace import read_trace, record_trace, replay_trace
+
+DAY_IN_SECONDS = 86400
+
+
+class TestTrace:
+    def test_record_and_replay(self, chain, accounts, tmp_path):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        guests = accounts[5:7]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        first_block = registry_contract.tx.block_number + 1
+        add_succesfull_wedding(chain, registry_contract, fiances, wedding_date, guests)
+
+        trace_path = tmp_path / "trace.jsonl.gz"
+        assert record_trace(web3, registry_contract.address, trace_path, first_block) == 7
+        header, calls = read_trace(trace_path)
+        calls = list(calls)
+        assert header["authorities"] == ["a0", "a1"]
+        assert [call["fn"] for call in calls] == ["initiateWedding"] + ["approveGuest"] * 4 + ["confirmWedding"] * 2
+        assert calls[0]["args"][0] == ["a2", "a3"]
+        assert calls[1]["to"] == "w0"
+        assert all(call["ok"] for call in calls)
+
+        report = replay_trace(web3, trace_path)
+        functions = report.by_function()
+        assert len(report.calls) == 7
+        assert all(row["mismatches"] == 0 for row in functions.values())
+        for row in functions.values():
+            # the accounts differ, so does the calldata gas
+            assert abs(row["gas"] - row["trace_gas"]) < 0.05 * row["trace_gas"]
+
+    def test_replay_of_failed_initiation(self, chain, accounts, tmp_path):
+        authorities = accounts[0:2]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        first_block = registry_contract.tx.block_number + 1
+        add_succesfull_wedding(chain, registry_contract, accounts[2:4], wedding_date, accounts[5:7])
+        trace_path = tmp_path / "trace.jsonl.gz"
+        record_trace(web3, registry_contract.address, trace_path, first_block)
+
+        # a wedding date in the past makes the recorded initiation fail in the replay
+        header, calls = read_trace(trace_path)
+        calls = list(calls)
+        calls[0]["args"][1] = -DAY_IN_SECONDS
+        diverged_path = tmp_path / "diverged.jsonl.gz"
+        with gzip.open(diverged_path, "wt") as fp:
+            for line in [header] + calls:
+                fp.write(json.dumps(line) + "\n")
+
+        report = replay_trace(web3, diverged_path)
+        assert len(report.calls) == 7
+        assert all(call["missing"] for call in report.calls[1:])
+        assert sum(row["mismatches"] for row in report.by_function().values()) == 7
@@ -657,6 +657,28 @@ class TestDivorce:
         with brownie.reverts("Only married accounts can call this function"):
             registry_contract.getMyWeddingTokenId({"from": fiances[0]})
 
+    def test_divorce_by_2_spouses_does_not_call_the_registry_for_authorities(self, chain, accounts):
+        _, fiances, wedding_contract, wedding_time, _ = self.create_finished_wedding(chain, accounts)
+        chain.mine(timestamp=wedding_time + DAY_IN_SECONDS)
+        for fiance in fiances:
+            tx = wedding_contract.divorce({"from": fiance})
+            assert not any("isAuthority" in call.get("function", "") for call in tx.subcalls)
+
+    def test_divorce_by_removed_authority_fails(self, chain, accounts):
+        (
+            authorities,
+            fiances,
+            wedding_contract,
+            wedding_time,
+            registry_contract,
+        ) = self.create_finished_wedding(chain, accounts)
+        chain.mine(timestamp=wedding_time + DAY_IN_SECONDS)
+        registry_contract.updateAuthorities([authorities[1]], {"from": authorities[0]})
+        wedding_contract.divorce({"from": fiances[0]})
+        with brownie.reverts("Only fiances or authorities can call this function"):
+            wedding_contract.divorce({"from": authorities[0]})
+        wedding_contract.divorce({"from": authorities[1]})
+
     def test_divorce_fails_if_2_authorities(self, chain, accounts):
         (
             authorities,
@@ -771,3 +793,4 @@ class TestGetMyPartners:
             assert (
                 wedding_contract.getMyPartnersAddresses({"from": acc}) == accounts[2:6]
             )
+
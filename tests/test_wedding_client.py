@@ -0,0 +1,182 @@
+import pytest
+from brownie import web3
+from web3.exceptions import ContractLogicError
+
+from fixtures import create_registry_contract
+from wedding_client import GasEstimator, Metrics, WeddingClient
+
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+
+
+class TestWeddingClient:
+    def test_wedding_lifecycle(self, chain, accounts):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        guests = accounts[4:8]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+        start_of_wedding_day = wedding_date - (wedding_date % DAY_IN_SECONDS)
+
+        registry_contract = create_registry_contract(authorities)
+        client = WeddingClient(web3.provider.endpoint_uri, registry_contract.address)
+
+        wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+        for fiance in fiances:
+            receipts = client.approve_guests(wedding_address, guests, fiance)
+            assert len(receipts) == len(guests)
+
+        chain.mine(timestamp=start_of_wedding_day)
+        client.vote(wedding_address, guests[0])
+
+        chain.mine(timestamp=start_of_wedding_day + START_TO_VOTE_SECONDS)
+        for fiance in fiances:
+            client.confirm(wedding_address, fiance)
+
+        status = client.status(wedding_address, fiances[0])
+        assert status.married and not status.canceled
+        assert status.fiances == [fiance.address for fiance in fiances]
+        assert client.wedding_of(fiances[1]) == wedding_address
+        assert client.token_id_of(fiances[1]) == 0
+        assert client.wedding_of(guests[0]) is None
+
+        chain.mine(timestamp=start_of_wedding_day + DAY_IN_SECONDS)
+        client.divorce(wedding_address, fiances[0])
+        client.divorce(wedding_address, authorities[0])
+
+        status = client.status(wedding_address, fiances[0])
+        assert not status.married and status.canceled
+
+    def test_revert_raises(self, chain, accounts):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        client = WeddingClient(web3.provider.endpoint_uri, registry_contract.address)
+        wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+
+        # guests cannot confirm the wedding, the failed send must not break the nonce tracking
+        with pytest.raises(ContractLogicError):
+            client.confirm(wedding_address, accounts[5])
+        client.revoke(wedding_address, fiances[0])
+        assert client.status(wedding_address, fiances[1]).canceled
+
+    def test_wedding_handles_are_cached(self, chain, accounts):
+        authorities = accounts[0:2]
+        fiances_list = [accounts[2:4], accounts[4:6]]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        client = WeddingClient(
+            web3.provider.endpoint_uri, registry_contract.address, handle_cache_size=2
+        )
+        first, second = [client.initiate(fiances, wedding_date, fiances[0]) for fiances in fiances_list]
+
+        handle = client.wedding(first)
+        assert client.wedding(first.lower()) is handle
+        # the registry and the second wedding push the first wedding out of the cache
+        client.wedding(second)
+        client.wedding(registry_contract.address)
+        assert client.wedding(first) is not handle
+
+    def test_view_cache(self, chain, accounts):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+        start_of_wedding_day = wedding_date - (wedding_date % DAY_IN_SECONDS)
+
+        registry_contract = create_registry_contract(authorities)
+        client = WeddingClient(
+            web3.provider.endpoint_uri,
+            registry_contract.address,
+            view_cache_size=64,
+            block_poll_interval=0,
+        )
+        wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+        chain.mine(timestamp=start_of_wedding_day + START_TO_VOTE_SECONDS)
+        for fiance in fiances:
+            client.confirm(wedding_address, fiance)
+
+        # repeated reads within a block are served from the cache
+        assert client.wedding_of(fiances[0]) == wedding_address
+        assert client.wedding_of(fiances[0]) == wedding_address
+        assert client.view_cache.hits == 1
+
+        # blocks without events of the registry or the wedding keep the cached entries
+        accounts[8].transfer(accounts[9], 1)
+        assert client.wedding_of(fiances[0]) == wedding_address
+        assert client.view_cache.hits == 2
+
+        # the divorce emits registry events which invalidate the cached entries
+        chain.mine(timestamp=start_of_wedding_day + DAY_IN_SECONDS)
+        client.divorce(wedding_address, fiances[0])
+        client.divorce(wedding_address, fiances[1])
+        assert client.wedding_of(fiances[0]) is None
+        assert client.view_cache.hits == 2
+
+    def test_metrics(self, chain, accounts):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        metrics = Metrics()
+        client = WeddingClient(web3.provider.endpoint_uri, registry_contract.address, metrics=metrics)
+        wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+        client.approve_guests(wedding_address, accounts[5:7], fiances[0])
+        with pytest.raises(ContractLogicError):
+            client.confirm(wedding_address, accounts[5])
+
+        assert metrics.latency["initiateWedding"].count == 1
+        assert metrics.gas["approveGuest"].count == 2
+        assert metrics.reverts == {("confirmWedding", "Only fiances can call this function"): 1}
+        assert metrics.rpc_requests["eth_sendTransaction"] == 3
+
+        text = metrics.render()
+        assert 'wedding_tx_gas_used_count{function="approveGuest"} 2' in text
+        assert 'wedding_tx_latency_seconds_bucket{function="initiateWedding",le="+Inf"} 1' in text
+
+    def test_memoized_gas(self, chain, accounts):
+        authorities = accounts[0:2]
+        fiances = accounts[2:4]
+        guests = accounts[4:8]
+        other_fiances = accounts[8:10]
+        wedding_date = chain.time() + DAY_IN_SECONDS
+
+        registry_contract = create_registry_contract(authorities)
+        metrics = Metrics()
+        gas_estimator = GasEstimator(web3)
+        client = WeddingClient(
+            web3.provider.endpoint_uri, registry_contract.address, metrics=metrics, gas_estimator=gas_estimator
+        )
+        wedding_address = client.initiate(fiances, wedding_date, fiances[0])
+        estimates = metrics.rpc_requests["eth_estimateGas"]
+
+        # no approval took the final path yet, every approval is estimated
+        for fiance in fiances:
+            client.approve_guests(wedding_address, guests, fiance)
+        assert metrics.rpc_requests["eth_estimateGas"] == estimates + 2 * len(guests)
+        assert gas_estimator.hits == 0
+
+        # the limit of the final approvals serves both paths of a wedding with as many fiances
+        other_wedding_address = client.initiate(other_fiances, wedding_date, other_fiances[0])
+        estimates = metrics.rpc_requests["eth_estimateGas"]
+        for fiance in other_fiances:
+            receipts = client.approve_guests(other_wedding_address, guests, fiance)
+        assert metrics.rpc_requests["eth_estimateGas"] == estimates
+        assert gas_estimator.hits == 2 * len(guests)
+        assert gas_estimator.out_of_gas == 0
+        wedding = client.wedding(other_wedding_address)
+        assert all(wedding.events.inviteSent().process_receipt(receipt) for receipt in receipts)
+
+        # a wedding with more fiances has its own limits
+        three_fiances = [accounts[1]] + list(accounts[2:4])
+        client.revoke(wedding_address, fiances[0])
+        third_wedding_address = client.initiate(three_fiances, wedding_date, fiances[0])
+        estimates = metrics.rpc_requests["eth_estimateGas"]
+        client.approve_guests(third_wedding_address, guests[:1], fiances[0])
+        assert metrics.rpc_requests["eth_estimateGas"] == estimates + 1
+
+        # the registry is no proxy, it is its own implementation
+        assert gas_estimator.implementation(registry_contract.address) == registry_contract.address
+        assert gas_estimator.implementation(wedding_address) not in (wedding_address, registry_contract.address)
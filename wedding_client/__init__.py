@@ -0,0 +1,52 @@
+"""Python client for the wedding registry and its wedding contracts.
+
+The submodules are imported lazily on first access of one of their names, so scripts only pay
+for importing what they actually use (e.g. web3 is not imported for the cache or the artifacts).
+"""
+
+import importlib
+
+_exports = {
+    "BlockTracker": "view_cache",
+    "GasEstimator": "gas",
+    "GuestImport": "guest_import",
+    "LRUCache": "cache",
+    "Metrics": "metrics",
+    "ModelRevert": "model",
+    "NonceTracker": "nonces",
+    "PreflightReport": "preflight",
+    "RegistryModel": "model",
+    "ReplayReport": "trace",
+    "RpcChain": "chain",
+    "TransactionFailed": "client",
+    "ViewCache": "view_cache",
+    "WeddingClient": "client",
+    "WeddingClientError": "client",
+    "WeddingIndexer": "indexer",
+    "WeddingModel": "model",
+    "WeddingStatus": "client",
+    "classify_phases": "phase",
+    "compile_contracts": "compiler",
+    "connect": "provider",
+    "deploy_registry": "deploy",
+    "deploy_sharded_registries": "deploy",
+    "export_parquet": "parquet_export",
+    "load_artifact": "artifacts",
+    "record_trace": "trace",
+    "replay_trace": "trace",
+    "send_preflighted": "preflight",
+}
+
+__all__ = sorted(_exports)
+
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_exports[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,70 @@
+import functools
+import hashlib
+import json
+from pathlib import Path
+
+PROJECT_PATH = Path(__file__).resolve().parent.parent
+DEFAULT_BUILD_PATH = PROJECT_PATH / "build" / "contracts"
+DEFAULT_ARTIFACTS_PATH = PROJECT_PATH / "artifacts"
+CONTRACT_NAMES = ["WeddingRegistry", "WeddingContract", "WeddingRouter"]
+ARTIFACT_KEYS = ["abi", "bytecode", "deployedBytecode"]
+
+_artifacts = {}  # {(path, contract name): artifact}
+
+
+@functools.lru_cache(maxsize=None)
+def source_hash(project_path=PROJECT_PATH):
+    """Hash over the contract sources and the brownie config (which holds the compiler settings).
+    Prebuilt artifacts are only used if they were built from sources with the same hash."""
+    project_path = Path(project_path)
+    digest = hashlib.sha256()
+    for path in sorted((project_path / "contracts").glob("**/*.sol")) + [project_path / "brownie-config.yaml"]:
+        if path.exists():
+            digest.update(path.relative_to(project_path).as_posix().encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def _read(path):
+    with path.open() as fp:
+        return json.load(fp)
+
+
+def load_artifact(contract_name, build_path=None, artifacts_path=DEFAULT_ARTIFACTS_PATH):
+    """Returns the artifact (abi, bytecode, deployedBytecode) of `contract_name`.
+
+    Without a `build_path`, the prebuilt artifact matching the current source hash is used, so no
+    brownie project has to be loaded and no compiler check is done. If there is no prebuilt artifact,
+    the brownie build artifacts are used. Every file is only read once.
+    """
+    if build_path is None:
+        prebuilt = Path(artifacts_path) / source_hash() / f"{contract_name}.json"
+        path = prebuilt if prebuilt.exists() else DEFAULT_BUILD_PATH / f"{contract_name}.json"
+    else:
+        path = Path(build_path) / f"{contract_name}.json"
+
+    key = (str(path), contract_name)
+    if key not in _artifacts:
+        _artifacts[key] = _read(path)
+    return _artifacts[key]
+
+
+def load_abi(contract_name, build_path=None):
+    return load_artifact(contract_name, build_path)["abi"]
+
+
+def export_artifacts(build_path=DEFAULT_BUILD_PATH, artifacts_path=DEFAULT_ARTIFACTS_PATH):
+    """Stores abi and bytecode of the brownie build artifacts under `artifacts/<source hash>/`.
+    Raises if the build artifacts are outdated, i.e. were not compiled from the current sources."""
+    source_hash.cache_clear()
+    current_hash = source_hash()
+    target = Path(artifacts_path) / current_hash
+    target.mkdir(parents=True, exist_ok=True)
+    for contract_name in CONTRACT_NAMES:
+        build = _read(Path(build_path) / f"{contract_name}.json")
+        source_path = PROJECT_PATH / build["sourcePath"]
+        if build.get("source") != source_path.read_text():
+            raise ValueError(f"The build of {contract_name} is outdated, compile the project first")
+        with (target / f"{contract_name}.json").open("w") as fp:
+            json.dump({key: build[key] for key in ARTIFACT_KEYS}, fp)
+    return target
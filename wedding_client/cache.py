@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """A size bound mapping that evicts the least recently used entry once `maxsize` is exceeded."""
+
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def get(self, key, default=None):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get_or_create(self, key, factory):
+        """Returns the cached value for `key`, or creates, caches and returns `factory()`."""
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.misses += 1
+            value = factory()
+            self.put(key, value)
+            return value
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def pop(self, key, default=None):
+        return self._data.pop(key, default)
+
+    def clear(self):
+        self._data.clear()
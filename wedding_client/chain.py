@@ -0,0 +1,27 @@
+class RpcChain:
+    """Time travel on a local development node (ganache) through its RPC methods.
+    Mirrors the part of brownie's `chain` used by our tooling (`time`, `mine`, `sleep`), so it can be
+    used e.g. with the ScenarioScheduler without loading a brownie project."""
+
+    def __init__(self, web3):
+        self.web3 = web3
+
+    def time(self):
+        """Timestamp of the latest block."""
+        return self.web3.eth.get_block("latest")["timestamp"]
+
+    def mine(self, blocks=1, timestamp=None):
+        if timestamp is not None:
+            self.web3.provider.make_request("evm_mine", [timestamp])
+            blocks -= 1
+        for _ in range(blocks):
+            self.web3.provider.make_request("evm_mine", [])
+
+    def sleep(self, seconds):
+        self.web3.provider.make_request("evm_increaseTime", [seconds])
+
+    def snapshot(self):
+        return self.web3.provider.make_request("evm_snapshot", [])["result"]
+
+    def revert(self, snapshot_id):
+        self.web3.provider.make_request("evm_revert", [snapshot_id])
@@ -0,0 +1,214 @@
+import time
+from typing import List, NamedTuple, Optional
+
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+
+from .artifacts import load_abi
+from .cache import LRUCache
+from .metrics import revert_reason
+from .nonces import NonceTracker
+from .provider import connect
+from .view_cache import ViewCache
+
+
+class WeddingClientError(Exception):
+    pass
+
+
+class TransactionFailed(WeddingClientError):
+    def __init__(self, function_name, receipt):
+        super().__init__(f"{function_name} reverted in transaction {receipt['transactionHash'].hex()}")
+        self.function_name = function_name
+        self.receipt = receipt
+
+
+class WeddingStatus(NamedTuple):
+    address: str
+    married: bool  # the registry issued a wedding certificate which was not burned (yet)
+    canceled: bool  # revoked, voted against or divorced
+    fiances: List[str]
+
+
+def to_address(account) -> str:
+    # accepts address strings as well as account objects (e.g. brownie accounts) whose str() is the address
+    return Web3.to_checksum_address(str(account))
+
+
+class WeddingClient:
+    """Typed access to a wedding registry and its wedding contracts.
+
+    Contract handles are kept in an LRU cache, so looking up the same wedding again neither rebuilds
+    the contract object nor reparses its ABI. The underlying HTTP connections are pooled and shared
+    by all clients of the same RPC url. Nonces are tracked locally, which allows sending many
+    transactions back-to-back (e.g. in `approve_guests`) before waiting for their receipts.
+    The senders must be accounts that are unlocked on the node. The ABIs are taken from the prebuilt
+    artifacts of the current sources if available, otherwise (or with `build_path`) from the build folder.
+    With `view_cache_size` > 0, view calls are served from a ViewCache that is invalidated by the
+    events of new blocks, the latest block number is polled at most every `block_poll_interval` seconds.
+    With `metrics` (a wedding_client.metrics.Metrics), the latency, gas and reverts of all transactions
+    and all RPC requests of the provider are recorded.
+    With `gas_estimator` (a wedding_client.gas.GasEstimator), the gas limits of its functions are memoized
+    instead of estimated before every send. A transaction that fails with a memoized limit but needs
+    more gas than that is sent once more with a raised limit.
+    """
+
+    def __init__(
+        self,
+        rpc_url: Optional[str] = None,
+        registry_address: Optional[str] = None,
+        build_path=None,
+        handle_cache_size: int = 1024,
+        web3: Optional[Web3] = None,
+        view_cache_size: int = 0,
+        block_poll_interval: float = 1.0,
+        metrics=None,
+        gas_estimator=None,
+    ):
+        if web3 is None and rpc_url is None:
+            raise ValueError("Either rpc_url or web3 is required")
+        self.web3 = web3 if web3 is not None else connect(rpc_url)
+        self.build_path = build_path
+        self._handles = LRUCache(handle_cache_size)
+        self.nonces = NonceTracker(self.web3)
+        self.metrics = metrics
+        self._submitted = {}  # {tx hash: time.perf_counter() when it was sent}, only with metrics
+        self.gas_estimator = gas_estimator
+        self._gas_limits = {}  # {tx hash: (contract function call, sender, gas limit, memoized)}, only with gas_estimator
+        if metrics is not None:
+            metrics.instrument(self.web3)
+        self.registry = self._contract("WeddingRegistry", registry_address)
+        self.view_cache = None
+        if view_cache_size > 0:
+            # the phase changes with the block timestamp, without any event
+            self.view_cache = ViewCache(self.web3, view_cache_size, block_poll_interval, block_scoped=["getPhase"])
+            self.view_cache.watch(self.registry.address)
+
+    #### contract handles
+    def _contract(self, contract_name, address):
+        address = to_address(address)
+        return self._handles.get_or_create(
+            (contract_name, address),
+            lambda: self.web3.eth.contract(address=address, abi=load_abi(contract_name, self.build_path)),
+        )
+
+    def wedding(self, address):
+        """Returns the (cached) contract handle of the wedding proxy at `address`."""
+        return self._contract("WeddingContract", address)
+
+    #### transactions
+    def send(self, fn_call, sender):
+        """Sends a contract function call as `sender` without waiting for it and returns the
+        transaction hash, e.g. to send a batch back-to-back before waiting for its receipts.
+        Raises ContractLogicError if the call would revert when estimating its gas."""
+        sender = to_address(sender)
+        nonce = self.nonces.next(sender)
+        submitted_at = time.perf_counter() if self.metrics is not None else None
+        tx = {"from": sender, "nonce": nonce}
+        memoized = False
+        try:
+            if self.gas_estimator is not None:
+                gas_limit, memoized = self.gas_estimator.gas_limit(fn_call, sender)
+                if gas_limit is not None:
+                    tx["gas"] = gas_limit
+            tx_hash = fn_call.transact(tx)
+        except Exception as e:
+            # the transaction was not sent, resync the nonce with the node on the next send
+            self.nonces.reset(sender)
+            if self.metrics is not None and isinstance(e, ContractLogicError):
+                self.metrics.count_revert(fn_call.fn_name, revert_reason(e))
+            raise
+        if submitted_at is not None:
+            self._submitted[tx_hash] = submitted_at
+        if "gas" in tx:
+            self._gas_limits[tx_hash] = (fn_call, sender, tx["gas"], memoized)
+        return tx_hash
+
+    def wait(self, tx_hash, function_name):
+        """Waits for the receipt of a transaction sent with `send` and returns it.
+        Raises TransactionFailed if it reverted."""
+        receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+        if self.metrics is not None:
+            self.metrics.observe_receipt(function_name, self._submitted.pop(tx_hash, None), receipt)
+        fn_call, sender, gas_limit, memoized = self._gas_limits.pop(tx_hash, (None, None, None, False))
+        if receipt["status"] != 1:
+            # a memoized limit may be too low, also for an out of gas inside a subcall that left gas over
+            if memoized and self.gas_estimator.raise_limit(fn_call, sender, gas_limit):
+                # the resend gets the raised limit
+                return self.wait(self.send(fn_call, sender), function_name)
+            raise TransactionFailed(function_name, receipt)
+        if fn_call is not None:
+            self.gas_estimator.observe(fn_call, receipt, gas_limit)
+        return receipt
+
+    def _transact(self, fn_call, sender):
+        return self.wait(self.send(fn_call, sender), fn_call.fn_name)
+
+    def _call(self, fn_call, caller=None):
+        caller = to_address(caller) if caller is not None else None
+        if self.view_cache is not None:
+            return self.view_cache.call(fn_call, caller)
+        return fn_call.call({"from": caller} if caller is not None else {})
+
+    def initiate(self, fiances: List[str], wedding_date: int, sender: str) -> str:
+        """Initiates a wedding and returns the address of the new wedding contract."""
+        receipt = self._transact(
+            self.registry.functions.initiateWedding([to_address(f) for f in fiances], wedding_date),
+            sender,
+        )
+        event = self.registry.events.WeddingInitiated().process_receipt(receipt)[0]
+        return event["args"]["weddingContractAddress"]
+
+    def approve_guests(self, wedding_address: str, guests: List[str], sender: str) -> List[dict]:
+        """Approves all `guests` as `sender`. The transactions are sent back-to-back and
+        their receipts are collected afterwards."""
+        wedding = self.wedding(wedding_address)
+        tx_hashes = [self.send(wedding.functions.approveGuest(to_address(guest)), sender) for guest in guests]
+        return [self.wait(tx_hash, "approveGuest") for tx_hash in tx_hashes]
+
+    def revoke(self, wedding_address: str, sender: str) -> dict:
+        return self._transact(self.wedding(wedding_address).functions.revokeEngagement(), sender)
+
+    def vote(self, wedding_address: str, sender: str) -> dict:
+        """Votes against the wedding as `sender`."""
+        return self._transact(self.wedding(wedding_address).functions.voteAgainstWedding(), sender)
+
+    def confirm(self, wedding_address: str, sender: str) -> dict:
+        return self._transact(self.wedding(wedding_address).functions.confirmWedding(), sender)
+
+    def divorce(self, wedding_address: str, sender: str) -> dict:
+        return self._transact(self.wedding(wedding_address).functions.divorce(), sender)
+
+    #### views
+    def is_authority(self, account: str) -> bool:
+        return self._call(self.registry.functions.isAuthority(to_address(account)))
+
+    def wedding_of(self, account: str) -> Optional[str]:
+        """Returns the address of the wedding contract `account` is married in, None if not married."""
+        try:
+            return self._call(self.registry.functions.getMyWeddingContractAddress(), account)
+        except ContractLogicError:
+            return None
+
+    def token_id_of(self, account: str) -> Optional[int]:
+        """Returns the id of the wedding token of `account`, None if not married."""
+        try:
+            return self._call(self.registry.functions.getMyWeddingTokenId(), account)
+        except ContractLogicError:
+            return None
+
+    def phase(self, wedding_address: str) -> int:
+        """Returns the phase of the wedding in the latest block (a value of wedding_client.phase)."""
+        return self._call(self.wedding(wedding_address).functions.getPhase())
+
+    def status(self, wedding_address: str, fiance: str) -> WeddingStatus:
+        """Returns the status of a wedding as seen by one of its fiances."""
+        wedding = self.wedding(wedding_address)
+        married = self._call(self.registry.functions.balanceOf(wedding.address)) > 0
+        try:
+            fiances = self._call(wedding.functions.getMyPartnersAddresses(), fiance)
+        except ContractLogicError as e:
+            if "canceled" not in str(e):
+                raise
+            return WeddingStatus(wedding.address, married, True, [])
+        return WeddingStatus(wedding.address, married, False, list(fiances))
@@ -0,0 +1,55 @@
+from .artifacts import PROJECT_PATH
+
+CONTRACT_SOURCES = {
+    "WeddingRegistry": "contracts/Registry.sol",
+    "WeddingContract": "contracts/Wedding.sol",
+    "WeddingRouter": "contracts/Router.sol",
+}
+SOLC_PRAGMA = "^0.8.20"
+# the same remapping as in brownie-config.yaml
+REMAPPINGS = ["@openzeppelin/=node_modules/@openzeppelin/"]
+DEFAULT_OUTPUTS = [
+    "abi",
+    "evm.bytecode.object",
+    "evm.deployedBytecode.object",
+    "evm.methodIdentifiers",
+    "storageLayout",
+]
+
+
+def select_solc_version(pragma=SOLC_PRAGMA):
+    """Returns the newest installed solc version matching `pragma` (brownie installs its compilers
+    into the same folder), installs the newest matching version if there is none."""
+    import solcx
+    from solcx.install import select_pragma_version
+
+    version = select_pragma_version(pragma, solcx.get_installed_solc_versions())
+    return version or solcx.install_solc_pragma(pragma)
+
+
+def compile_contracts(optimizer_runs=200, via_ir=False, solc_version=None, outputs=DEFAULT_OUTPUTS):
+    """Compiles the registry and the wedding contract through solc's standard JSON interface.
+
+    `optimizer_runs` None disables the optimizer, the default matches brownie's settings.
+    Returns {contract name: solc output of the contract} with the selected `outputs`.
+    Needs py-solc-x (installed together with eth-brownie), but not a brownie project.
+    """
+    import solcx
+
+    input_data = {
+        "language": "Solidity",
+        "sources": {path: {"urls": [path]} for path in CONTRACT_SOURCES.values()},
+        "settings": {
+            "remappings": REMAPPINGS,
+            "optimizer": {"enabled": optimizer_runs is not None, "runs": optimizer_runs or 200},
+            "viaIR": via_ir,
+            "outputSelection": {"*": {"*": list(outputs)}},
+        },
+    }
+    output = solcx.compile_standard(
+        input_data,
+        base_path=str(PROJECT_PATH),
+        allow_paths=str(PROJECT_PATH),
+        solc_version=solc_version or select_solc_version(),
+    )
+    return {name: output["contracts"][path][name] for name, path in CONTRACT_SOURCES.items()}
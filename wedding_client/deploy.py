@@ -0,0 +1,43 @@
+from .artifacts import load_artifact
+from .client import to_address
+
+
+def deploy(web3, contract_name, args, sender, build_path=None):
+    """Deploys `contract_name` from its (prebuilt) artifact without compiling anything.
+    Returns the address of the deployed contract."""
+    artifact = load_artifact(contract_name, build_path)
+    factory = web3.eth.contract(abi=artifact["abi"], bytecode=artifact["bytecode"])
+    tx_hash = factory.constructor(*args).transact({"from": to_address(sender)})
+    return web3.eth.wait_for_transaction_receipt(tx_hash)["contractAddress"]
+
+
+def deploy_registry(web3, authorities, sender=None, build_path=None):
+    """Deploys the wedding implementation and a registry using it. Returns the registry address."""
+    sender = sender or authorities[0]
+    implementation_address = deploy(web3, "WeddingContract", [], sender, build_path)
+    return deploy(
+        web3,
+        "WeddingRegistry",
+        [[to_address(a) for a in authorities], implementation_address],
+        sender,
+        build_path,
+    )
+
+
+def deploy_sharded_registries(web3, authorities, shards, sender=None, build_path=None):
+    """Deploys `shards` registries sharing one wedding implementation and a router over them,
+    and sets the router in every registry. Returns the router address and the registry addresses."""
+    sender = sender or authorities[0]
+    authorities = [to_address(a) for a in authorities]
+    implementation_address = deploy(web3, "WeddingContract", [], sender, build_path)
+    registry_addresses = [
+        deploy(web3, "WeddingRegistry", [authorities, implementation_address], sender, build_path)
+        for _ in range(shards)
+    ]
+    router_address = deploy(web3, "WeddingRouter", [registry_addresses], sender, build_path)
+    abi = load_artifact("WeddingRegistry", build_path)["abi"]
+    for registry_address in registry_addresses:
+        registry = web3.eth.contract(address=registry_address, abi=abi)
+        tx_hash = registry.functions.setRouter(router_address).transact({"from": to_address(sender)})
+        web3.eth.wait_for_transaction_receipt(tx_hash)
+    return router_address, registry_addresses
@@ -0,0 +1,128 @@
+"""Memoized gas limits, so most transactions are sent without an eth_estimateGas round trip first.
+
+The limits are keyed by the implementation behind the called contract (read once per wedding proxy
+from its ERC1967 slot, the registry is its own implementation), the number of fiances of the wedding
+(read once per proxy from its storage), the function selector and the shape of the arguments. A new
+implementation behind new proxies therefore never uses the limits of the old one.
+
+The memoized functions have a cheap and an expensive path: the final approval of a guest also marks
+the guest as approved, the final confirmation issues the certificate and the final vote cancels the
+wedding. Which path a call takes depends on the state, so a limit is only memoized once a call of its
+key took the final path (recognized by the event of that path in its receipt): the estimate of that
+call times the safety margin then serves both paths. Until then every call is estimated. A memoized
+send that still fails (e.g. the first certificate of a registry costs more than the later ones) is
+estimated again: if it needs more gas than it got, also inside a subcall that left the outer frame gas
+to revert, the limit is raised and WeddingClient sends the transaction once more.
+"""
+import threading
+
+from web3 import Web3
+from web3.exceptions import ContractLogicError
+
+from .cache import LRUCache
+
+# keccak256("eip1967.proxy.implementation") - 1
+IMPLEMENTATION_SLOT = 0x360894A13BA1A3210667C828492DB98DCA3E2076CC3735A920A3CA505D382BBC
+# the length of `fiances` in the storage of WeddingContract, slot 0 packs wedReg and weddingDate
+FIANCES_SLOT = 1
+DEFAULT_MARGIN = 1.2
+# the events of the final (most expensive) path of the memoized functions
+FINAL_EVENTS = {
+    "approveGuest": "inviteSent(address)",
+    "voteAgainstWedding": "weddingCanceled(address)",
+    "confirmWedding": "WeddingCertificateIssued(address[])",
+}
+MEMOIZED_FUNCTIONS = tuple(FINAL_EVENTS)
+
+
+def argument_shape(args):
+    return tuple(len(arg) if isinstance(arg, (list, tuple, bytes)) else type(arg).__name__ for arg in args)
+
+
+class GasEstimator:
+    """Memoized gas limits of the `functions` calls, see the module docstring. Thread-safe."""
+
+    def __init__(self, web3, margin=DEFAULT_MARGIN, functions=MEMOIZED_FUNCTIONS, maxsize=1024):
+        if margin < 1:
+            raise ValueError("margin must be at least 1")
+        unknown = set(functions) - set(FINAL_EVENTS)
+        if unknown:
+            raise ValueError(f"No final path known for {', '.join(sorted(unknown))}")
+        self.web3 = web3
+        self.margin = margin
+        self.functions = frozenset(functions)
+        self._final_topics = {fn: Web3.keccak(text=FINAL_EVENTS[fn]) for fn in self.functions}
+        self.out_of_gas = 0  # memoized sends that needed more gas than their limit
+        self._limits = LRUCache(maxsize)  # {(implementation, fiances, selector, argument shape): gas limit}
+        self._proxies = LRUCache(maxsize)  # {contract address: (implementation address, number of fiances)}
+        self._lock = threading.Lock()
+
+    @property
+    def hits(self):
+        return self._limits.hits
+
+    @property
+    def misses(self):
+        return self._limits.misses
+
+    def _proxy(self, address):
+        with self._lock:
+            proxy = self._proxies.get(address)
+        if proxy is None:
+            # the wedding proxies are not upgradeable and their fiances never change
+            word = bytes(self.web3.eth.get_storage_at(address, IMPLEMENTATION_SLOT))[-20:]
+            if any(word):
+                fiances = int.from_bytes(bytes(self.web3.eth.get_storage_at(address, FIANCES_SLOT)), "big")
+                proxy = (Web3.to_checksum_address(word), fiances)
+            else:
+                proxy = (address, 0)
+            with self._lock:
+                self._proxies.put(address, proxy)
+        return proxy
+
+    def implementation(self, address):
+        """The implementation behind the proxy at `address`, `address` itself if it is no proxy."""
+        return self._proxy(address)[0]
+
+    def key(self, fn_call):
+        implementation, fiances = self._proxy(fn_call.address)
+        return (implementation, fiances, fn_call.selector, argument_shape(fn_call.args))
+
+    def gas_limit(self, fn_call, sender):
+        """Returns (gas limit, whether it was memoized) for sending `fn_call` as `sender`, or (None, False)
+        for functions that are not memoized, which leaves the estimation to web3. Estimating raises
+        ContractLogicError if the call would revert."""
+        if fn_call.fn_name not in self.functions:
+            return None, False
+        key = self.key(fn_call)
+        with self._lock:
+            limit = self._limits.get(key)
+        if limit is not None:
+            return limit, True
+        return int(fn_call.estimate_gas({"from": sender}) * self.margin), False
+
+    def observe(self, fn_call, receipt, gas_limit):
+        """Memoizes `gas_limit` for the key of `fn_call` if its successful `receipt` took the final path."""
+        topic = self._final_topics[fn_call.fn_name]
+        if not any(log["topics"] and log["topics"][0] == topic for log in receipt["logs"]):
+            return
+        key = self.key(fn_call)
+        with self._lock:
+            # pop instead of get, writes do not count as hits or misses
+            self._limits.put(key, max(gas_limit, self._limits.pop(key, 0)))
+
+    def raise_limit(self, fn_call, sender, gas_limit):
+        """Estimates `fn_call` again after it failed with the memoized `gas_limit`. Returns True if it
+        needs more gas than that, the memoized limit is then raised for the resend. Returns False if
+        it reverts anyway or would succeed with `gas_limit` now, i.e. it failed for another reason."""
+        try:
+            estimate = fn_call.estimate_gas({"from": sender})
+        except ContractLogicError:
+            return False
+        if estimate <= gas_limit:
+            return False
+        key = self.key(fn_call)
+        with self._lock:
+            self.out_of_gas += 1
+            self._limits.put(key, max(int(estimate * self.margin), self._limits.pop(key, 0)))
+        return True
@@ -0,0 +1,163 @@
+"""Streaming import of guest lists from CSV files.
+
+The approvals of the guests are sent in chunks of back-to-back transactions for every fiance of
+the wedding. A chunk is sized from the estimated gas of an approval and the block gas limit, so
+it fits into a block. Progress is checkpointed to a JSON file after every chunk (together with the
+hashes of the chunk in flight), so an interrupted import resumes without sending approvals again.
+"""
+import csv
+import json
+import os
+from itertools import islice
+from pathlib import Path
+
+from web3 import Web3
+from web3.exceptions import ContractLogicError, TimeExhausted
+
+from .client import WeddingClientError, to_address
+from .phase import BEFORE_WEDDING_DAY, PHASE_NAMES
+from .preflight import preflight
+
+DEFAULT_COLUMN = "address"
+DEFAULT_BLOCK_FILL = 0.8  # share of the block gas limit a chunk may use
+PENDING_RECEIPT_TIMEOUT = 30
+ZERO_ADDRESS = "0x" + "00" * 20
+
+
+def iter_guests(csv_path, column=DEFAULT_COLUMN, invalid=None):
+    """Streams the unique, checksummed addresses of the `column` column of a CSV file with a header.
+    Rows without a valid address are skipped, their line numbers are appended to `invalid`."""
+    seen = set()
+    with open(csv_path, newline="") as fp:
+        reader = csv.DictReader(fp)
+        if column not in (reader.fieldnames or []):
+            raise ValueError(f"{csv_path} has no column {column!r}")
+        for row in reader:
+            value = (row[column] or "").strip()
+            if not Web3.is_address(value):
+                if invalid is not None:
+                    invalid.append(reader.line_num)
+                continue
+            address = to_address(value)
+            if address not in seen:
+                seen.add(address)
+                yield address
+
+
+class GuestImport:
+    """Approves the guests of `csv_path` for the wedding at `wedding_address` as every fiance,
+    checkpointing to `checkpoint_path` (default: next to the CSV file). After `run`, `invalid_lines`
+    holds the rows without a valid address and `dropped` the approvals the preflight did not send."""
+
+    def __init__(
+        self,
+        client,
+        wedding_address,
+        csv_path,
+        checkpoint_path=None,
+        column=DEFAULT_COLUMN,
+        block_fill=DEFAULT_BLOCK_FILL,
+    ):
+        self.client = client
+        self.wedding = client.wedding(wedding_address)
+        self.csv_path = Path(csv_path)
+        self.checkpoint_path = Path(checkpoint_path or f"{csv_path}.checkpoint.json")
+        self.column = column
+        self.block_fill = block_fill
+        self.invalid_lines = []  # line numbers of rows without a valid address
+        self.dropped = {}  # {reason: number of approvals which would have reverted}
+        self.checkpoint = self._load_checkpoint()
+
+    #### checkpoint
+    def _load_checkpoint(self):
+        if not self.checkpoint_path.exists():
+            return {"wedding": self.wedding.address, "done": {}, "pending": {}}
+        with self.checkpoint_path.open() as fp:
+            checkpoint = json.load(fp)
+        if checkpoint["wedding"] != self.wedding.address:
+            raise ValueError(f"{self.checkpoint_path} belongs to the wedding {checkpoint['wedding']}")
+        return checkpoint
+
+    def _save_checkpoint(self):
+        # written to a temporary file first, an interruption never leaves a truncated checkpoint
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with tmp_path.open("w") as fp:
+            json.dump(self.checkpoint, fp)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    #### import
+    def chunk_size(self, fiance, guest):
+        """The number of approvals of `fiance` that fit into the filled share of a block."""
+        try:
+            estimate = self.wedding.functions.approveGuest(guest).estimate_gas({"from": fiance})
+        except ContractLogicError:
+            # e.g. already approved in an earlier import, the preflight drops it
+            estimate = self.wedding.functions.approveGuest(ZERO_ADDRESS).estimate_gas({"from": fiance})
+        gas_limit = self.client.web3.eth.get_block("latest")["gasLimit"]
+        return max(1, int(gas_limit * self.block_fill) // estimate)
+
+    def _unmined(self, pending):
+        """The guests of the chunk in flight whose approvals were not mined (yet)."""
+        for i, tx_hash in enumerate(pending["tx_hashes"]):
+            try:
+                self.client.web3.eth.wait_for_transaction_receipt(tx_hash, PENDING_RECEIPT_TIMEOUT)
+            except TimeExhausted:
+                # sent in order, everything after the first missing transaction is sent again
+                return pending["guests"][i:]
+        return []
+
+    def _send_chunk(self, fiance, guests, end):
+        """Approves `guests` as `fiance`, `end` is the number of guests in the file up to the end of the chunk.
+        Guests which are already approved are dropped by the preflight, e.g. after an earlier import."""
+        report = preflight(self.client, [(self.wedding.functions.approveGuest(guest), fiance) for guest in guests])
+        for doomed in report.doomed:
+            self.dropped[doomed.reason] = self.dropped.get(doomed.reason, 0) + 1
+        tx_hashes = [self.client.send(fn_call, sender) for fn_call, sender in report.sendable]
+        self.checkpoint["pending"][fiance] = {
+            "end": end,
+            "guests": [fn_call.args[0] for fn_call, _ in report.sendable],
+            "tx_hashes": [Web3.to_hex(tx_hash) for tx_hash in tx_hashes],
+        }
+        self._save_checkpoint()
+        for tx_hash in tx_hashes:
+            self.client.wait(tx_hash, "approveGuest")
+        self.checkpoint["pending"].pop(fiance)
+        self.checkpoint["done"][fiance] = end
+        self._save_checkpoint()
+
+    def run(self, fiance):
+        """Imports the guest list for all fiances of the wedding, `fiance` is one of them.
+        Returns the number of unique guests in the file. Raises WeddingClientError if the wedding
+        is canceled or past the phase in which guests are approved."""
+        status = self.client.status(self.wedding.address, fiance)
+        if status.canceled:
+            raise WeddingClientError(f"The wedding {self.wedding.address} is canceled, no guests can be approved")
+        phase = self.client.phase(self.wedding.address)
+        if phase != BEFORE_WEDDING_DAY:
+            raise WeddingClientError(
+                f"Guests can only be approved before the wedding day, "
+                f"the wedding {self.wedding.address} is in the {PHASE_NAMES[phase]} phase"
+            )
+        fiances = status.fiances
+        self.dropped = {}
+        done = 0
+        for fiance in fiances:
+            pending = self.checkpoint["pending"].get(fiance)
+            if pending is not None:
+                self._send_chunk(fiance, self._unmined(pending), pending["end"])
+            done = self.checkpoint["done"].get(fiance, 0)
+
+            self.invalid_lines = []
+            guests = iter_guests(self.csv_path, self.column, self.invalid_lines)
+            for _ in islice(guests, done):
+                pass  # imported by an earlier run
+            first = next(guests, None)
+            if first is None:
+                continue
+            chunk_size = self.chunk_size(fiance, first)
+            chunk = [first] + list(islice(guests, chunk_size - 1))
+            while chunk:
+                done += len(chunk)
+                self._send_chunk(fiance, chunk, done)
+                chunk = list(islice(guests, chunk_size))
+        return done
@@ -0,0 +1,186 @@
+import sqlite3
+
+from .client import to_address
+from .logs import LogDecoder
+
+DAY_IN_SECONDS = 86400
+ZERO_ADDRESS = "0x" + "00" * 20
+DEFAULT_BATCH_BLOCKS = 2000
+SCHEMA_VERSION = 2  # databases of another version have to be reindexed
+
+REGISTRY_EVENTS = ["WeddingInitiated", "Transfer", "WeddingCertificateBurned"]
+WEDDING_EVENTS = ["inviteSent", "voteAgainstWeddingOccured", "weddingConfirmed", "weddingCanceled", "divorceInitiated"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS weddings (
+    address TEXT PRIMARY KEY,
+    fiances TEXT NOT NULL,             -- comma separated
+    fiance_count INTEGER NOT NULL,
+    wedding_date INTEGER NOT NULL,
+    wedding_day INTEGER NOT NULL,      -- start of the wedding day
+    initiated_block INTEGER NOT NULL,
+    initiated_at INTEGER NOT NULL,
+    guests INTEGER NOT NULL DEFAULT 0, -- approved by all fiances
+    votes INTEGER NOT NULL DEFAULT 0,
+    confirmations INTEGER NOT NULL DEFAULT 0,
+    canceled_at INTEGER,               -- revoked or voted against, divorces are tracked separately
+    token_id INTEGER,
+    confirmed_at INTEGER,              -- the wedding certificate was issued
+    divorce_initiated_at INTEGER,
+    divorced_at INTEGER
+);
+CREATE INDEX IF NOT EXISTS weddings_by_day ON weddings (wedding_day, address);
+CREATE TABLE IF NOT EXISTS fiances (
+    fiance TEXT NOT NULL,
+    wedding TEXT NOT NULL,
+    PRIMARY KEY (fiance, wedding)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS guests (         -- approved by all fiances
+    wedding TEXT NOT NULL,
+    guest TEXT NOT NULL,
+    PRIMARY KEY (wedding, guest)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS progress (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class WeddingIndexer:
+    """Ingests the events of a registry and its wedding contracts into one aggregated row per
+    wedding in a sqlite database.
+
+    Logs are fetched in ranges of `batch_blocks` blocks and every range is committed together
+    with the last indexed block, so `sync` can be interrupted and resumed at any time and memory
+    stays bounded by the size of a range. The certificate is linked to its wedding through the
+    mint Transfer of the registry, whose receiver is the wedding contract.
+    """
+
+    def __init__(self, web3, registry_address, database, build_path=None, batch_blocks=DEFAULT_BATCH_BLOCKS):
+        self.web3 = web3
+        self.registry_address = to_address(registry_address)
+        self.batch_blocks = batch_blocks
+        self.db = sqlite3.connect(str(database))
+        # readers (e.g. the query service) see the last committed range while the next one is ingested
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        version = self._progress("schema_version")
+        if (version is None and self.last_block >= 0) or version not in (None, SCHEMA_VERSION):
+            raise ValueError(f"{database} was created by another version of the indexer, delete it to reindex")
+        with self.db:
+            self._set_progress("schema_version", SCHEMA_VERSION)
+
+        self.decoder = LogDecoder(build_path)
+        self._wedding_topics = self.decoder.topics("WeddingContract", WEDDING_EVENTS)
+
+    #### progress
+    def _progress(self, name, default=None):
+        row = self.db.execute("SELECT value FROM progress WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else default
+
+    def _set_progress(self, name, value):
+        self.db.execute("INSERT OR REPLACE INTO progress (name, value) VALUES (?, ?)", (name, value))
+
+    @property
+    def last_block(self):
+        """The last block that is completely indexed, -1 if nothing is indexed yet."""
+        return self._progress("last_block", -1)
+
+    @property
+    def last_timestamp(self):
+        """The timestamp of the last indexed block."""
+        return self._progress("last_timestamp")
+
+    #### ingestion
+    def sync(self, to_block=None, from_block=0):
+        """Indexes all blocks up to `to_block` (default: the latest block). Returns the number of logs."""
+        to_block = self.web3.eth.block_number if to_block is None else to_block
+        start = max(self.last_block + 1, from_block)
+        ingested = 0
+        while start <= to_block:
+            end = min(start + self.batch_blocks - 1, to_block)
+            ingested += self._ingest_range(start, end)
+            start = end + 1
+        return ingested
+
+    def _fetch_logs(self, from_block, to_block):
+        registry_logs = self.web3.eth.get_logs(
+            {"fromBlock": from_block, "toBlock": to_block, "address": self.registry_address}
+        )
+        # the wedding proxies are not known in advance, their logs are selected by the event signature
+        wedding_logs = self.web3.eth.get_logs(
+            {"fromBlock": from_block, "toBlock": to_block, "topics": [self._wedding_topics]}
+        )
+        return sorted(registry_logs + wedding_logs, key=lambda log: (log["blockNumber"], log["logIndex"]))
+
+    def _ingest_range(self, from_block, to_block):
+        logs = self._fetch_logs(from_block, to_block)
+        timestamps = {}  # {block number: timestamp} of this range
+        with self.db:
+            for log in logs:
+                decoded = self.decoder.decode(log)
+                if decoded is None:
+                    continue
+                name, args = decoded
+                if name in WEDDING_EVENTS:
+                    if not self._is_wedding(log["address"]):
+                        continue  # some other contract with an event of the same signature
+                elif log["address"] != self.registry_address:
+                    continue
+                block = log["blockNumber"]
+                if block not in timestamps:
+                    timestamps[block] = self.web3.eth.get_block(block)["timestamp"]
+                self._apply(name, args, log, timestamps[block])
+
+            self._set_progress("last_block", to_block)
+            self._set_progress("last_timestamp", self.web3.eth.get_block(to_block)["timestamp"])
+        return len(logs)
+
+    def _is_wedding(self, address):
+        return self.db.execute("SELECT 1 FROM weddings WHERE address = ?", (address,)).fetchone() is not None
+
+    def _update(self, sql, address, *params):
+        self.db.execute(f"UPDATE weddings SET {sql} WHERE address = ?", (*params, address))
+
+    def _apply(self, name, args, log, timestamp):
+        address = log["address"]
+        if name == "WeddingInitiated":
+            fiances = list(args["fiances"])
+            wedding_date = args["weddingDate"]
+            self.db.execute(
+                "INSERT OR IGNORE INTO weddings (address, fiances, fiance_count, wedding_date, wedding_day, "
+                "initiated_block, initiated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    args["weddingContractAddress"],
+                    ",".join(fiances),
+                    len(fiances),
+                    wedding_date,
+                    wedding_date - wedding_date % DAY_IN_SECONDS,
+                    log["blockNumber"],
+                    timestamp,
+                ),
+            )
+            self.db.executemany(
+                "INSERT OR IGNORE INTO fiances (fiance, wedding) VALUES (?, ?)",
+                [(fiance, args["weddingContractAddress"]) for fiance in fiances],
+            )
+        elif name == "Transfer":
+            if args["from"] == ZERO_ADDRESS:
+                self._update("token_id = ?, confirmed_at = ?", args["to"], args["tokenId"], timestamp)
+        elif name == "WeddingCertificateBurned":
+            self._update("divorced_at = ?", args["weddingContractAddress"], timestamp)
+        elif name == "inviteSent":
+            self._update("guests = guests + 1", address)
+            self.db.execute("INSERT OR IGNORE INTO guests (wedding, guest) VALUES (?, ?)", (address, args["invitee"]))
+        elif name == "voteAgainstWeddingOccured":
+            self._update("votes = votes + 1", address)
+        elif name == "weddingConfirmed":
+            self._update("confirmations = confirmations + 1", address)
+        elif name == "weddingCanceled":
+            self._update("canceled_at = ?", address, timestamp)
+        elif name == "divorceInitiated":
+            self._update("divorce_initiated_at = ?", address, timestamp)
+
+    def close(self):
+        self.db.close()
@@ -0,0 +1,127 @@
+from eth_utils import keccak, to_checksum_address
+
+from .artifacts import load_abi
+
+CONTRACT_NAMES = ["WeddingRegistry", "WeddingContract"]
+
+
+class EventLayout:
+    """Precomputed decoding plan of one event: which fields come from the topics and at which
+    word of the data the others (or, for address[], their offsets) are stored."""
+
+    __slots__ = ("name", "signature", "topic", "indexed", "data", "data_has_addresses")
+
+    def __init__(self, abi):
+        types = [field["type"] for field in abi["inputs"]]
+        self.name = abi["name"]
+        self.signature = f"{abi['name']}({','.join(types)})"
+        self.topic = keccak(text=self.signature)
+        self.indexed = []  # [(field name, kind)], in the order of topics[1:]
+        self.data = []  # [(field name, kind, head word)]
+        for field in abi["inputs"]:
+            kind = _kind(field["type"], field["indexed"])
+            if field["indexed"]:
+                self.indexed.append((field["name"], kind))
+            else:
+                self.data.append((field["name"], kind, len(self.data)))
+        self.data_has_addresses = any(kind.startswith("address") for _, kind, _ in self.data)
+
+
+def _kind(type_, indexed):
+    if type_ == "address" or type_ == "bool" or type_ == "bytes32":
+        return type_
+    if type_.startswith("uint"):
+        return "uint"
+    if type_ == "address[]" and not indexed:
+        return type_
+    raise ValueError(f"Unsupported event field type {type_}")
+
+
+class LogDecoder:
+    """Decodes the raw logs of the registry and the wedding contracts.
+
+    The topic0 of every event is computed once from the ABIs. Integers are read straight from a
+    memoryview of the data, addresses (including the elements of address[] payloads) are sliced
+    out of one hex string of the whole data, so no intermediate bytes objects are created per field.
+    Checksummed addresses are cached, since the same accounts and weddings show up again and again.
+    Logs of unknown events decode to None.
+    """
+
+    def __init__(self, build_path=None, checksum=True):
+        self.checksum = checksum
+        self._checksummed = {}  # {lowercase hex: checksummed address}
+        self.layouts = {}  # {topic0: EventLayout}
+        self.contract_topics = {}  # {contract name: [topic0 as 0x-prefixed hex]}
+        for contract_name in CONTRACT_NAMES:
+            events = [item for item in load_abi(contract_name, build_path) if item["type"] == "event"]
+            layouts = [EventLayout(abi) for abi in events]
+            self.layouts.update((layout.topic, layout) for layout in layouts)
+            self.contract_topics[contract_name] = ["0x" + layout.topic.hex() for layout in layouts]
+
+    def topics(self, contract_name, event_names=None):
+        """The topic0 values of (a selection of) the events of `contract_name`, e.g. for log filters."""
+        return [
+            topic
+            for topic in self.contract_topics[contract_name]
+            if event_names is None or self.layouts[bytes.fromhex(topic[2:])].name in event_names
+        ]
+
+    def _address(self, hex_data, start):
+        # `start` is the offset of the 32 byte word in bytes, the address is stored in its last 20 bytes
+        address = hex_data[2 * start + 24 : 2 * start + 64]
+        if not self.checksum:
+            return "0x" + address
+        checksummed = self._checksummed.get(address)
+        if checksummed is None:
+            checksummed = self._checksummed[address] = to_checksum_address("0x" + address)
+        return checksummed
+
+    def decode(self, log):
+        """Returns (event name, {field name: value}) of a raw log, None for unknown events."""
+        topics = log["topics"]
+        if not topics:
+            return None
+        layout = self.layouts.get(_to_bytes(topics[0]))
+        if layout is None:
+            return None
+
+        args = {}
+        for (name, kind), topic in zip(layout.indexed, topics[1:]):
+            topic = _to_bytes(topic)
+            if kind == "address":
+                args[name] = self._address(topic.hex(), 0)
+            elif kind == "uint":
+                args[name] = int.from_bytes(topic, "big")
+            elif kind == "bool":
+                args[name] = topic[31] == 1
+            else:
+                args[name] = topic
+
+        if layout.data:
+            data = _to_bytes(log["data"])
+            view = memoryview(data)
+            hex_data = data.hex() if layout.data_has_addresses else ""
+            for name, kind, word in layout.data:
+                start = 32 * word
+                if kind == "address":
+                    args[name] = self._address(hex_data, start)
+                elif kind == "uint":
+                    args[name] = int.from_bytes(view[start : start + 32], "big")
+                elif kind == "bool":
+                    args[name] = view[start + 31] == 1
+                elif kind == "bytes32":
+                    args[name] = view[start : start + 32].tobytes()
+                else:
+                    # dynamic array: the head word holds the offset of the length word, the elements follow it
+                    offset = int.from_bytes(view[start : start + 32], "big")
+                    length = int.from_bytes(view[offset : offset + 32], "big")
+                    args[name] = [self._address(hex_data, offset + 32 * (i + 1)) for i in range(length)]
+        return layout.name, args
+
+
+def _to_bytes(value):
+    # logs from web3 carry HexBytes, raw JSON-RPC responses carry 0x-prefixed strings. HexBytes is
+    # normalised to bytes, since its hex() has a "0x" prefix in hexbytes 0.x (as used by brownie)
+    if isinstance(value, str):
+        return bytes.fromhex(value[2:] if value.startswith("0x") else value)
+    return bytes(value)
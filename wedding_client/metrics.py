@@ -0,0 +1,151 @@
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+GAS_BUCKETS = (25_000, 50_000, 100_000, 200_000, 400_000, 800_000, 1_600_000, 3_200_000)
+DEFAULT_PORT = 9464
+REVERT_PREFIX = "execution reverted: "
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds, like Prometheus histograms."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # the last bucket is +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+def revert_reason(error):
+    """The revert reason of a web3 ContractLogicError, "unknown" if there is none."""
+    message = getattr(error, "message", None) or str(error)
+    if message.startswith(REVERT_PREFIX):
+        return message[len(REVERT_PREFIX) :]
+    return "unknown"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class Metrics:
+    """Latency and gas histograms per function, revert counts per function and reason and RPC
+    request counts per method, rendered in the Prometheus text format.
+
+    Pass an instance as `metrics` to the WeddingClient to record all its transactions. Without
+    metrics the client skips all of this, so turning metrics off costs a single None check.
+    """
+
+    def __init__(self):
+        self.latency = {}  # {function name: Histogram}, submit to receipt in seconds
+        self.gas = {}  # {function name: Histogram}
+        self.reverts = {}  # {(function name, reason): count}
+        self.rpc_requests = {}  # {method: count}
+        self._lock = threading.Lock()
+
+    #### recording
+    def observe_receipt(self, function_name, submitted_at, receipt):
+        """Records a mined transaction, `submitted_at` is the time.perf_counter() before sending."""
+        with self._lock:
+            if submitted_at is not None:
+                latency = self.latency.setdefault(function_name, Histogram(LATENCY_BUCKETS))
+                latency.observe(time.perf_counter() - submitted_at)
+            self.gas.setdefault(function_name, Histogram(GAS_BUCKETS)).observe(receipt["gasUsed"])
+        if receipt["status"] != 1:
+            # the reason of a mined revert is not part of the receipt
+            self.count_revert(function_name, "unknown")
+
+    def count_revert(self, function_name, reason):
+        key = (function_name, reason)
+        with self._lock:
+            self.reverts[key] = self.reverts.get(key, 0) + 1
+
+    def count_rpc(self, method):
+        with self._lock:
+            self.rpc_requests[method] = self.rpc_requests.get(method, 0) + 1
+
+    def instrument(self, web3):
+        """Counts every RPC request of `web3`'s provider. Providers are shared between clients (see
+        provider.connect), their requests are counted by the metrics which instrumented them last."""
+        provider = web3.provider
+        already_instrumented = hasattr(provider, "_wedding_metrics")
+        provider._wedding_metrics = self
+        if already_instrumented:
+            return
+        make_request = provider.make_request
+
+        def counting_make_request(method, params):
+            provider._wedding_metrics.count_rpc(method)
+            return make_request(method, params)
+
+        provider.make_request = counting_make_request
+        if hasattr(provider, "_request_func_cache"):
+            # web3 caches the request function built around make_request
+            provider._request_func_cache = (None, None)
+
+    #### exposition
+    def render(self):
+        lines = []
+        with self._lock:
+            for name, help_text, histograms in [
+                ("wedding_tx_latency_seconds", "Submit to receipt latency of transactions", self.latency),
+                ("wedding_tx_gas_used", "Gas used by mined transactions", self.gas),
+            ]:
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+                for function_name, histogram in sorted(histograms.items()):
+                    cumulative = 0
+                    for bound, count in zip(list(histogram.bounds) + ["+Inf"], histogram.counts):
+                        cumulative += count
+                        labels = _labels(function=function_name, le=bound)
+                        lines.append(f"{name}_bucket{{{labels}}} {cumulative}")
+                    labels = _labels(function=function_name)
+                    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+            lines += ["# HELP wedding_tx_reverts_total Reverted transactions", "# TYPE wedding_tx_reverts_total counter"]
+            for (function_name, reason), count in sorted(self.reverts.items()):
+                labels = _labels(function=function_name, reason=reason)
+                lines.append(f"wedding_tx_reverts_total{{{labels}}} {count}")
+
+            lines += ["# HELP wedding_rpc_requests_total RPC requests", "# TYPE wedding_rpc_requests_total counter"]
+            for method, count in sorted(self.rpc_requests.items()):
+                lines.append(f"wedding_rpc_requests_total{{{_labels(method=method)}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port=DEFAULT_PORT, host="127.0.0.1"):
+        """Serves the metrics on http://<host>:<port>/metrics from a daemon thread.
+        Returns the server, call its shutdown() to stop it."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -0,0 +1,255 @@
+"""Pure-Python model of the WeddingRegistry and WeddingContract semantics.
+
+The model mirrors the checks of the contracts in the same order and raises ModelRevert with the
+same revert reasons, so "what if" questions (e.g. what happens if 3 of 5 guests vote at time T) can
+be answered without a chain. A revert leaves the model unchanged, like on chain. Accounts and
+wedding addresses can be any hashable values, every call takes the block timestamp `now`.
+"""
+
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+MAX_UINT16 = 2**16 - 1
+
+
+class ModelRevert(Exception):
+    """A call reverted. `reason` is the revert string, None for reverts without one (custom errors, panics)."""
+
+    def __init__(self, reason=None):
+        super().__init__(reason or "reverted without a reason")
+        self.reason = reason
+
+
+def _require(condition, reason):
+    if not condition:
+        raise ModelRevert(reason)
+
+
+class RegistryModel:
+    __slots__ = ("authorities", "weddings", "wedding_of", "token_of", "wedding_counter", "reservations")
+
+    def __init__(self, authorities):
+        _require(len(authorities) > 0, "Authorities cannot be empty")
+        self.authorities = list(authorities)
+        self.weddings = {}  # {address: WeddingModel}, the deployed wedding contracts
+        self.wedding_of = {}  # {fiance: address of the wedding of the last issued certificate}
+        self.token_of = {}  # {wedding address: token id}, the certificates which are not burned
+        self.wedding_counter = 0
+        self.reservations = {}  # {fiance: (address of the pending wedding, end of its wedding day)}
+
+    #### views
+    def is_authority(self, account):
+        return account in self.authorities
+
+    def balance_of(self, wedding_address):
+        return 1 if wedding_address in self.token_of else 0
+
+    def total_supply(self):
+        return len(self.token_of)
+
+    def is_married(self, account):
+        wedding_address = self.wedding_of.get(account)
+        return wedding_address is not None and wedding_address in self.token_of
+
+    def no_one_married(self, fiances):
+        return not any(self.is_married(fiance) for fiance in fiances)
+
+    def no_one_reserved(self, fiances, now):
+        return not any(self.reservations.get(fiance, (None, 0))[1] > now for fiance in fiances)
+
+    def get_my_wedding_contract_address(self, sender):
+        _require(self.is_married(sender), "Only married accounts can call this function")
+        return self.wedding_of[sender]
+
+    def get_my_wedding_token_id(self, sender):
+        _require(self.is_married(sender), "Only married accounts can call this function")
+        return self.token_of[self.wedding_of[sender]]
+
+    #### transactions
+    def update_authorities(self, sender, authorities):
+        _require(self.is_authority(sender), "Only authorized accounts can call this function")
+        _require(len(authorities) > 0, "Authorities cannot be empty")
+        self.authorities = list(authorities)
+
+    def initiate_wedding(self, sender, fiances, wedding_date, now, address=None):
+        """Returns the address of the new wedding, `address` or the number of the wedding if not given."""
+        _require(self.no_one_married(fiances), "One of the fiances is already married")
+        _require(self.no_one_reserved(fiances, now), "One of the fiances has a pending wedding")
+        address = len(self.weddings) if address is None else address
+        wedding = WeddingModel(self, address, fiances, wedding_date, now)
+        self.weddings[address] = wedding
+        for fiance in fiances:
+            self.reservations[fiance] = (address, wedding.start_of_day + DAY_IN_SECONDS)
+        return address
+
+    def _check_issue(self, wedding):
+        _require(wedding.address in self.weddings, "Only deployed wedding contracts can call this function")
+        # the reservations are gone once the certificate is issued, e.g. on a second confirmation
+        _require(
+            all(self.reservations.get(fiance, (None,))[0] == wedding.address for fiance in wedding.fiances),
+            "One of the fiances is already married",
+        )
+
+    def _issue(self, wedding):
+        for fiance in wedding.fiances:
+            del self.reservations[fiance]
+            self.wedding_of[fiance] = wedding.address
+        self.token_of[wedding.address] = self.wedding_counter
+        self.wedding_counter += 1
+
+    def _check_burn(self, wedding):
+        _require(wedding.address in self.weddings, "Only deployed wedding contracts can call this function")
+        # tokenOfOwnerByIndex reverts with a custom error if the wedding owns no token
+        _require(wedding.address in self.token_of, None)
+
+    def _burn(self, wedding):
+        del self.token_of[wedding.address]
+
+    def _release(self, wedding):
+        for fiance in wedding.fiances:
+            if self.reservations.get(fiance, (None,))[0] == wedding.address:
+                del self.reservations[fiance]
+
+
+class WeddingModel:
+    __slots__ = (
+        "registry",
+        "address",
+        "fiances",
+        "wedding_date",
+        "start_of_day",
+        "potential_guests",
+        "approved_guests",
+        "voted",
+        "confirmations",
+        "divorce_initiator",
+        "is_canceled",
+    )
+
+    def __init__(self, registry, address, fiances, wedding_date, now):
+        _require(len(fiances) < 256, "Array too long")
+        _require(len(set(fiances)) == len(fiances), "Duplicate fiance addresses")
+        _require(len(fiances) > 1, "At least two fiances are required")
+        start_of_day = wedding_date - wedding_date % DAY_IN_SECONDS
+        _require(start_of_day > now, "Wedding date must be at least on the next day")
+
+        self.registry = registry
+        self.address = address
+        self.fiances = list(fiances)
+        self.wedding_date = wedding_date
+        self.start_of_day = start_of_day
+        self.potential_guests = {}  # {guest: set of fiances who approved}
+        self.approved_guests = set()
+        self.voted = set()
+        self.confirmations = set()
+        self.divorce_initiator = None
+        self.is_canceled = False
+
+    #### modifiers
+    def _only_fiances(self, sender):
+        _require(sender in self.fiances, "Only fiances can call this function")
+
+    def _only_before_wedding_day(self, now):
+        _require(now < self.start_of_day, "Action can only be performed before the wedding day")
+
+    def _only_on_wedding_day_before_voting_end(self, now):
+        _require(
+            self.start_of_day <= now < self.start_of_day + START_TO_VOTE_SECONDS,
+            "Action can only be performed within the first 10 hours of the wedding day",
+        )
+
+    def _only_on_wedding_day_after_voting(self, now):
+        _require(
+            self.start_of_day + START_TO_VOTE_SECONDS <= now < self.start_of_day + DAY_IN_SECONDS,
+            "Action can only be performed during the wedding day after the voting happened",
+        )
+
+    def _only_after_wedding_day(self, now):
+        _require(now >= self.start_of_day + DAY_IN_SECONDS, "Action can only be performed after the wedding day")
+
+    def _only_guests_with_voting_right(self, sender):
+        _require(
+            sender in self.approved_guests and sender not in self.voted,
+            "Only guests with voting right can call this function",
+        )
+
+    def _only_not_canceled(self):
+        _require(not self.is_canceled, "The wedding has been canceled")
+
+    #### transactions
+    def approve_guest(self, sender, guest, now):
+        self._only_fiances(sender)
+        self._only_before_wedding_day(now)
+        self._only_not_canceled()
+        _require(guest not in self.approved_guests, "Guest is already approved")
+
+        approvals = self.potential_guests.get(guest, set()) | {sender}
+        if len(approvals) == len(self.fiances):
+            _require(MAX_UINT16 > len(self.approved_guests), "Maximum number of guests reached")
+            self.approved_guests.add(guest)
+        self.potential_guests[guest] = approvals
+
+    def revoke_engagement(self, sender, now):
+        self._only_fiances(sender)
+        self._only_before_wedding_day(now)
+        self._only_not_canceled()
+        self.is_canceled = True
+        self.registry._release(self)
+
+    def vote_against_wedding(self, sender, now):
+        self._only_on_wedding_day_before_voting_end(now)
+        self._only_guests_with_voting_right(sender)
+        self._only_not_canceled()
+
+        votes = len(self.voted) + 1
+        # the uint16 multiplication panics on overflow
+        _require(votes * 2 <= MAX_UINT16, None)
+        self.voted.add(sender)
+        if votes * 2 > len(self.approved_guests):
+            self.is_canceled = True
+            self.registry._release(self)
+
+    def confirm_wedding(self, sender, now):
+        self._only_fiances(sender)
+        self._only_on_wedding_day_after_voting(now)
+        self._only_not_canceled()
+
+        all_confirmed = len(self.confirmations | {sender}) == len(self.fiances)
+        if all_confirmed:
+            self.registry._check_issue(self)
+        self.confirmations.add(sender)
+        if all_confirmed:
+            self.registry._issue(self)
+
+    def divorce(self, sender, now):
+        self._only_after_wedding_day(now)
+        self._only_not_canceled()
+        is_fiance = sender in self.fiances
+        # a fiance who is an authority as well counts as fiance, the registry is only asked for the others
+        is_authority = not is_fiance and self.registry.is_authority(sender)
+        _require(is_fiance or is_authority, "Only fiances or authorities can call this function")
+        _require(sender != self.divorce_initiator, "You already initiated or approved divorce")
+
+        if self.divorce_initiator is None:
+            self.divorce_initiator = sender
+            return
+        if is_authority:
+            _require(self.divorce_initiator in self.fiances, "Authority already initiated divorce")
+        self.registry._check_burn(self)
+        self.registry._burn(self)
+        self.is_canceled = True
+
+    #### views
+    def get_my_partners_addresses(self, sender):
+        self._only_fiances(sender)
+        self._only_not_canceled()
+        return list(self.fiances)
+
+    def get_phase(self, now):
+        """The value of the WeddingPhase enum at `now`, canceled weddings move through the phases as well."""
+        if now < self.start_of_day:
+            return 0
+        if now < self.start_of_day + START_TO_VOTE_SECONDS:
+            return 1
+        if now < self.start_of_day + DAY_IN_SECONDS:
+            return 2
+        return 3
@@ -0,0 +1,28 @@
+import threading
+
+
+class NonceTracker:
+    """Hands out the nonces of accounts locally, so their transactions can be sent back-to-back
+    without waiting for the previous ones to be mined. Thread-safe."""
+
+    def __init__(self, web3):
+        self.web3 = web3
+        self._nonces = {}  # {address: next unused nonce}
+        self._lock = threading.Lock()
+
+    def next(self, address):
+        """Reserves and returns the next nonce of `address`."""
+        with self._lock:
+            if address not in self._nonces:
+                # "pending" also counts transactions of this account which are not mined yet
+                self._nonces[address] = self.web3.eth.get_transaction_count(address, "pending")
+            nonce = self._nonces[address]
+            self._nonces[address] = nonce + 1
+            return nonce
+
+    def reset(self, address):
+        """Forgets the nonce of `address` after a transaction with a reserved nonce was not sent, the
+        next nonce is read from the node again. The node might also disagree with the local nonce,
+        e.g. if another process sent from the same account."""
+        with self._lock:
+            self._nonces.pop(address, None)
@@ -0,0 +1,147 @@
+import datetime
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+
+DAY_IN_SECONDS = 86400
+DEFAULT_CHUNK_SIZE = 100_000
+
+COLUMNS = [
+    "address",
+    "fiance_count",
+    "wedding_date",
+    "wedding_day",
+    "initiated_block",
+    "initiated_at",
+    "guests",
+    "votes",
+    "confirmations",
+    "canceled_at",
+    "token_id",
+    "confirmed_at",
+    "divorce_initiated_at",
+    "divorced_at",
+]
+
+
+def _schema():
+    import pyarrow as pa
+
+    timestamp = pa.timestamp("s", tz="UTC")
+    return pa.schema(
+        [
+            ("address", pa.string()),
+            ("fiance_count", pa.int32()),
+            ("wedding_date", timestamp),
+            ("initiated_block", pa.int64()),
+            ("initiated_at", timestamp),
+            ("guests", pa.int32()),
+            ("votes", pa.int32()),
+            ("confirmations", pa.int32()),
+            ("outcome", pa.string()),
+            ("token_id", pa.int64()),
+            ("confirmed_at", timestamp),
+            ("seconds_to_confirmation", pa.int64()),
+            ("divorce_initiated_at", timestamp),
+            ("divorced_at", timestamp),
+            ("seconds_married", pa.int64()),
+            ("wedding_day", pa.string()),  # partition column
+        ]
+    )
+
+
+def outcome(row, as_of):
+    """The state of a wedding at timestamp `as_of`:
+    divorced, married, voted_down, revoked, pending (wedding day not over yet) or unconfirmed."""
+    if row["divorced_at"] is not None:
+        return "divorced"
+    if row["confirmed_at"] is not None:
+        return "married"
+    if row["canceled_at"] is not None:
+        # a cancelation on the wedding day can only come from the guests' vote
+        return "voted_down" if row["canceled_at"] >= row["wedding_day"] else "revoked"
+    if as_of is None or as_of < row["wedding_day"] + DAY_IN_SECONDS:
+        return "pending"
+    return "unconfirmed"
+
+
+def _difference(end, start):
+    return end - start if end is not None and start is not None else None
+
+
+def to_record(row, as_of):
+    return {
+        "address": row["address"],
+        "fiance_count": row["fiance_count"],
+        "wedding_date": row["wedding_date"],
+        "initiated_block": row["initiated_block"],
+        "initiated_at": row["initiated_at"],
+        "guests": row["guests"],
+        "votes": row["votes"],
+        "confirmations": row["confirmations"],
+        "outcome": outcome(row, as_of),
+        "token_id": row["token_id"],
+        "confirmed_at": row["confirmed_at"],
+        "seconds_to_confirmation": _difference(row["confirmed_at"], row["initiated_at"]),
+        "divorce_initiated_at": row["divorce_initiated_at"],
+        "divorced_at": row["divorced_at"],
+        "seconds_married": _difference(row["divorced_at"], row["confirmed_at"]),
+        "wedding_day": datetime.datetime.fromtimestamp(row["wedding_day"], datetime.timezone.utc).date().isoformat(),
+    }
+
+
+def iter_chunks(database, chunk_size=DEFAULT_CHUNK_SIZE, as_of=None):
+    """Yields the weddings of an indexer database as lists of at most `chunk_size` records.
+    Only one chunk is held in memory at a time. The rows are ordered by wedding day, so every chunk
+    touches only a few partitions. `as_of` defaults to the timestamp of the last indexed block."""
+    db = sqlite3.connect(str(database))
+    db.row_factory = sqlite3.Row
+    try:
+        if as_of is None:
+            row = db.execute("SELECT value FROM progress WHERE name = 'last_timestamp'").fetchone()
+            as_of = row[0] if row else None
+        cursor = db.execute(f"SELECT {', '.join(COLUMNS)} FROM weddings ORDER BY wedding_day, initiated_block")
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield [to_record(row, as_of) for row in rows]
+    finally:
+        db.close()
+
+
+def export_parquet(database, output_path, chunk_size=DEFAULT_CHUNK_SIZE, as_of=None):
+    """Writes the weddings of an indexer database as a Parquet dataset partitioned by wedding day
+    (`<output_path>/wedding_day=YYYY-MM-DD/part-<chunk>-<n>.parquet`). Returns the number of rows.
+    The dataset is written into a temporary directory next to `output_path` which then replaces an
+    earlier export as a whole, so no part files of it are left behind. Needs pyarrow."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(prefix=f".{output_path.name}.", dir=output_path.parent))
+    schema = _schema()
+    rows = 0
+    try:
+        for chunk_index, records in enumerate(iter_chunks(database, chunk_size, as_of)):
+            table = pa.Table.from_pylist(records, schema=schema)
+            pq.write_to_dataset(
+                table,
+                root_path=str(staging),
+                partition_cols=["wedding_day"],
+                basename_template=f"part-{chunk_index}-{{i}}.parquet",
+                existing_data_behavior="overwrite_or_ignore",  # the earlier chunks of this export
+            )
+            rows += len(records)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    # readers see either the old or the new export, apart from the moment between both renames
+    previous = output_path.with_name(staging.name + ".old")
+    if output_path.exists():
+        output_path.rename(previous)
+    staging.rename(output_path)
+    shutil.rmtree(previous, ignore_errors=True)
+    return rows
@@ -0,0 +1,46 @@
+import numpy as np
+
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+MAX_UINT32 = 2**32 - 1
+
+# the values of the WeddingPhase enum in Interfaces.sol
+BEFORE_WEDDING_DAY, VOTING, CEREMONY, AFTER_WEDDING_DAY = range(4)
+PHASE_NAMES = ["before", "voting", "ceremony", "after"]  # the names used by the scenario scheduler
+NO_TRANSITION = -1
+
+
+def phase_of(wedding_date, timestamp):
+    """The phase of one wedding at `timestamp`, what getPhase() returns in a block with this timestamp."""
+    start_of_day = wedding_date - wedding_date % DAY_IN_SECONDS
+    if timestamp < start_of_day:
+        return BEFORE_WEDDING_DAY
+    if timestamp < start_of_day + START_TO_VOTE_SECONDS:
+        return VOTING
+    if timestamp < start_of_day + DAY_IN_SECONDS:
+        return CEREMONY
+    return AFTER_WEDDING_DAY
+
+
+def classify_phases(wedding_dates, timestamp):
+    """Classifies many weddings at once.
+
+    Takes the wedding dates as stored by the contracts (uint32 unix timestamps) and a block timestamp.
+    Returns two arrays of the same length: the phases (uint8, the values of the WeddingPhase enum)
+    and the timestamps at which the weddings enter their next phase (int64, NO_TRANSITION for weddings
+    after their wedding day). The arithmetic is the one of getPhase() and the modifiers, just without
+    the uint32 overflow of the contract for wedding dates on the very last day of the uint32 range.
+    """
+    dates = np.asarray(wedding_dates, dtype=np.int64)
+    if dates.size and (dates.min() < 0 or dates.max() > MAX_UINT32):
+        raise ValueError("Wedding dates must be uint32 timestamps")
+
+    start_of_day = dates - dates % DAY_IN_SECONDS
+    end_of_voting = start_of_day + START_TO_VOTE_SECONDS
+    end_of_day = start_of_day + DAY_IN_SECONDS
+
+    phases = (timestamp >= start_of_day).astype(np.uint8)
+    phases += timestamp >= end_of_voting
+    phases += timestamp >= end_of_day
+    next_transitions = np.choose(phases, [start_of_day, end_of_voting, end_of_day, NO_TRANSITION])
+    return phases, next_transitions
@@ -0,0 +1,272 @@
+"""Pre-baked chain states ("pools") for tests and benchmarks.
+
+A pool is the database of a local ganache node after a scenario (married couples, pending weddings,
+divorces) was run against a fresh registry. It is stored under `pools/<key>/` together with a
+manifest, where the key combines the source hash of the contracts with the scenario parameters.
+Loading a pool copies its database and starts a node on the copy at the final timestamp of the
+scenario, which takes seconds instead of the minutes needed to build the state transaction by
+transaction. Only the building node derives an account per fiance and guest from the mnemonic, a
+loaded node derives the authority and unlocks just the addresses it is asked for. Needs the ganache command line tool (ganache-cli as installed for brownie, or ganache v7,
+which accepts the same legacy options).
+"""
+import datetime
+import json
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from .artifacts import PROJECT_PATH, source_hash
+
+DEFAULT_POOLS_PATH = PROJECT_PATH / "pools"
+DEFAULT_MNEMONIC = "brownie"  # the mnemonic brownie uses for its development network
+DEFAULT_PORT = 8545
+DEFAULT_GANACHE_CMD = "ganache-cli"
+DEFAULT_GAS_LIMIT = 12_000_000
+DAY_IN_SECONDS = 86400
+START_TO_VOTE_SECONDS = 36000
+PENDING_WEDDING_DAYS = 30  # pending weddings take place this many days after the pool was built
+BATCH_SIZE = 500  # transactions sent before waiting for their receipts
+
+
+class PoolScenario:
+    """The parameters of a pool: `married` couples of which `divorced` got divorced again and
+    `pending` initiated weddings. Every wedding approves the same `guests` guests."""
+
+    def __init__(self, married=10_000, pending=1_000, divorced=100, guests=0):
+        if divorced > married:
+            raise ValueError("Only married couples can be divorced")
+        self.married = married
+        self.pending = pending
+        self.divorced = divorced
+        self.guests = guests
+
+    @property
+    def key(self):
+        return f"{source_hash()}-m{self.married}-p{self.pending}-d{self.divorced}-g{self.guests}"
+
+    @property
+    def total_accounts(self):
+        # the authority, two fiances per wedding and the guests
+        return 1 + 2 * (self.married + self.pending) + self.guests
+
+    def as_dict(self):
+        return {"married": self.married, "pending": self.pending, "divorced": self.divorced, "guests": self.guests}
+
+
+class GanacheNode:
+    """A ganache process with a persistent database, used as a context manager."""
+
+    def __init__(
+        self,
+        db_path,
+        total_accounts,
+        port=DEFAULT_PORT,
+        mnemonic=DEFAULT_MNEMONIC,
+        start_timestamp=None,
+        ganache_cmd=DEFAULT_GANACHE_CMD,
+        startup_timeout=60,
+        unlock=(),
+    ):
+        """Derives `total_accounts` funded accounts from `mnemonic` and unlocks the addresses in
+        `unlock` without their keys, e.g. accounts that hold a balance in the database already."""
+        self.db_path = Path(db_path)
+        self.rpc_url = f"http://127.0.0.1:{port}"
+        self.command = [
+            ganache_cmd,
+            "--port", str(port),
+            "--mnemonic", mnemonic,
+            "--accounts", str(total_accounts),
+            "--gasLimit", str(DEFAULT_GAS_LIMIT),
+            "--db", str(self.db_path),
+            "--quiet",
+        ]
+        for address in unlock:
+            self.command += ["--unlock", address]
+        if start_timestamp is not None:
+            start = datetime.datetime.fromtimestamp(start_timestamp, datetime.timezone.utc)
+            self.command += ["--time", start.isoformat()]
+        self.startup_timeout = startup_timeout
+        self.process = None
+        self.web3 = None
+
+    def __enter__(self):
+        from .provider import connect
+
+        self.db_path.mkdir(parents=True, exist_ok=True)
+        self.process = subprocess.Popen(self.command, stdout=subprocess.DEVNULL)
+        self.web3 = connect(self.rpc_url)
+        deadline = time.monotonic() + self.startup_timeout
+        while not self.web3.is_connected():
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                self.__exit__()
+                raise RuntimeError(f"ganache did not start: {' '.join(self.command)}")
+            time.sleep(0.2)
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.process is None:
+            return
+        # ganache flushes its database when interrupted
+        self.process.send_signal(signal.SIGINT)
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self.process = None
+
+
+def _send_batched(client, calls, function_name):
+    """Sends (contract function call, sender) pairs in batches and returns all receipts in order."""
+    receipts = []
+    for start in range(0, len(calls), BATCH_SIZE):
+        tx_hashes = [client.send(fn_call, sender) for fn_call, sender in calls[start : start + BATCH_SIZE]]
+        receipts += [client.wait(tx_hash, function_name) for tx_hash in tx_hashes]
+    return receipts
+
+
+def _initiate_all(client, decoder, couples, wedding_date):
+    calls = [(client.registry.functions.initiateWedding(couple, wedding_date), couple[0]) for couple in couples]
+    addresses = []
+    for receipt in _send_batched(client, calls, "initiateWedding"):
+        for log in receipt["logs"]:
+            decoded = decoder.decode(log)
+            if decoded is not None and decoded[0] == "WeddingInitiated":
+                addresses.append(decoded[1]["weddingContractAddress"])
+    return addresses
+
+
+def build_pool(
+    scenario, pools_path=DEFAULT_POOLS_PATH, port=DEFAULT_PORT, ganache_cmd=DEFAULT_GANACHE_CMD, rebuild=False
+):
+    """Runs `scenario` on a fresh node and stores its database and manifest. Returns the pool path.
+
+    Like the scenario scheduler, every phase of all weddings is done with a single time jump:
+    all weddings are initiated and their guests approved, the chain jumps to the ceremony, all
+    couples confirm, the chain jumps past the wedding day and the first couples divorce.
+    """
+    from .chain import RpcChain
+    from .client import WeddingClient
+    from .deploy import deploy_registry
+    from .logs import LogDecoder
+
+    pool_path = Path(pools_path) / scenario.key
+    if (pool_path / "manifest.json").exists() and not rebuild:
+        return pool_path
+    if pool_path.exists():
+        shutil.rmtree(pool_path)
+
+    with GanacheNode(pool_path / "db", scenario.total_accounts, port, ganache_cmd=ganache_cmd) as node:
+        web3, chain = node.web3, RpcChain(node.web3)
+        accounts = web3.eth.accounts
+        authority = accounts[0]
+        fiances = accounts[1 : 1 + 2 * (scenario.married + scenario.pending)]
+        guests = accounts[len(accounts) - scenario.guests :] if scenario.guests else []
+        couples = [fiances[i : i + 2] for i in range(0, len(fiances), 2)]
+        married_couples, pending_couples = couples[: scenario.married], couples[scenario.married :]
+
+        client = WeddingClient(web3=web3, registry_address=deploy_registry(web3, [authority]))
+        decoder = LogDecoder()
+        now = chain.time()
+        wedding_date = now + DAY_IN_SECONDS
+        start_of_wedding_day = wedding_date - wedding_date % DAY_IN_SECONDS
+
+        married = _initiate_all(client, decoder, married_couples, wedding_date)
+        pending = _initiate_all(client, decoder, pending_couples, now + PENDING_WEDDING_DAYS * DAY_IN_SECONDS)
+        approvals = [
+            (client.wedding(address).functions.approveGuest(guest), fiance)
+            for address, couple in zip(married + pending, married_couples + pending_couples)
+            for fiance in couple
+            for guest in guests
+        ]
+        _send_batched(client, approvals, "approveGuest")
+
+        chain.mine(timestamp=start_of_wedding_day + START_TO_VOTE_SECONDS)
+        confirmations = [
+            (client.wedding(address).functions.confirmWedding(), fiance)
+            for address, couple in zip(married, married_couples)
+            for fiance in couple
+        ]
+        _send_batched(client, confirmations, "confirmWedding")
+
+        chain.mine(timestamp=start_of_wedding_day + DAY_IN_SECONDS)
+        divorced = married[: scenario.divorced]
+        for fiance_index in range(2):
+            # the second divorce of a wedding has to follow its first one, so the couples divorce in two waves
+            divorces = [
+                (client.wedding(address).functions.divorce(), couple[fiance_index])
+                for address, couple in zip(divorced, married_couples)
+            ]
+            _send_batched(client, divorces, "divorce")
+
+        latest = web3.eth.get_block("latest")
+        manifest = {
+            "key": scenario.key,
+            "source_hash": source_hash(),
+            "scenario": scenario.as_dict(),
+            "mnemonic": DEFAULT_MNEMONIC,
+            "registry": client.registry.address,
+            "authority": authority,
+            "guests": list(guests),
+            "fiances": {address: list(couple) for address, couple in zip(married + pending, couples)},
+            "married": married[scenario.divorced :],
+            "divorced": divorced,
+            "pending": pending,
+            "final_block": latest["number"],
+            "final_timestamp": latest["timestamp"],
+        }
+
+    with (pool_path / "manifest.json").open("w") as fp:
+        json.dump(manifest, fp)
+    return pool_path
+
+
+def read_manifest(scenario, pools_path=DEFAULT_POOLS_PATH):
+    path = Path(pools_path) / scenario.key / "manifest.json"
+    if not path.exists():
+        raise FileNotFoundError(f"No pool for {scenario.key}, build it first")
+    with path.open() as fp:
+        return json.load(fp)
+
+
+def pool_accounts(manifest):
+    """The addresses a loaded pool unlocks by default: the authority, the guests and the fiances of
+    the pending weddings, i.e. the accounts which can still act in the scenario's weddings."""
+    return [manifest["authority"]] + manifest["guests"] + [
+        fiance for address in manifest["pending"] for fiance in manifest["fiances"][address]
+    ]
+
+
+@contextmanager
+def load_pool(
+    scenario, pools_path=DEFAULT_POOLS_PATH, port=DEFAULT_PORT, ganache_cmd=DEFAULT_GANACHE_CMD, unlock=None
+):
+    """Starts a node on a copy of the pool's database, so the pool itself is never modified.
+    Only the authority is derived from the mnemonic, the addresses in `unlock` (pool_accounts() of
+    the manifest by default) are unlocked, e.g. add the fiances of `manifest["married"]` to divorce.
+    Yields the running GanacheNode and the manifest of the pool."""
+    from .chain import RpcChain
+
+    manifest = read_manifest(scenario, pools_path)
+    unlock = pool_accounts(manifest) if unlock is None else unlock
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "db"
+        shutil.copytree(Path(pools_path) / scenario.key / "db", db_path)
+        node = GanacheNode(
+            db_path,
+            1,  # the authority is the first account of the mnemonic
+            port,
+            manifest["mnemonic"],
+            start_timestamp=manifest["final_timestamp"],
+            ganache_cmd=ganache_cmd,
+            unlock=[address for address in unlock if address != manifest["authority"]],
+        )
+        with node:
+            chain = RpcChain(node.web3)
+            if chain.time() < manifest["final_timestamp"]:
+                # the wall clock is behind the time travel of the scenario
+                chain.mine(timestamp=manifest["final_timestamp"] + 1)
+            yield node, manifest
@@ -0,0 +1,119 @@
+from typing import List, NamedTuple
+
+from web3.exceptions import ContractLogicError
+
+from .client import to_address
+from .metrics import revert_reason
+from .phase import AFTER_WEDDING_DAY, BEFORE_WEDDING_DAY, CEREMONY, PHASE_NAMES, VOTING, phase_of
+
+TX_BASE_GAS = 21000
+ZERO_BYTE_GAS = 4
+NONZERO_BYTE_GAS = 16
+
+# the phase in which the time modifier of a wedding function lets a call through
+REQUIRED_PHASE = {
+    "approveGuest": BEFORE_WEDDING_DAY,
+    "revokeEngagement": BEFORE_WEDDING_DAY,
+    "voteAgainstWedding": VOTING,
+    "confirmWedding": CEREMONY,
+    "divorce": AFTER_WEDDING_DAY,
+}
+
+
+def _calldata(fn_call):
+    return bytes.fromhex(fn_call._encode_transaction_data()[2:])
+
+
+def intrinsic_gas(fn_call):
+    """The gas every transaction of `fn_call` costs even if it reverts immediately: the base fee
+    of a transaction and its calldata. A lower bound of what a reverting transaction costs."""
+    data = _calldata(fn_call)
+    zero_bytes = data.count(0)
+    return TX_BASE_GAS + ZERO_BYTE_GAS * zero_bytes + NONZERO_BYTE_GAS * (len(data) - zero_bytes)
+
+
+class DoomedCall(NamedTuple):
+    fn_call: object
+    sender: str
+    reason: str
+
+
+class PreflightReport:
+    """The calls of a batch that will succeed (`sendable`) and the ones that would revert (`doomed`)."""
+
+    def __init__(self):
+        self.sendable = []  # [(contract function call, sender)]
+        self.doomed: List[DoomedCall] = []
+
+    @property
+    def saved_gas(self):
+        """Lower bound of the gas the doomed calls would have burned, see intrinsic_gas."""
+        return sum(intrinsic_gas(doomed.fn_call) for doomed in self.doomed)
+
+    def summary(self):
+        reasons = {}
+        for doomed in self.doomed:
+            reasons[doomed.reason] = reasons.get(doomed.reason, 0) + 1
+        lines = [f"{len(self.sendable)} sendable, {len(self.doomed)} dropped, at least {self.saved_gas} gas saved"]
+        lines += [f"  {count:>6}  {reason}" for reason, count in sorted(reasons.items(), key=lambda item: -item[1])]
+        return "\n".join(lines)
+
+
+def preflight(client, calls, wedding_dates=None):
+    """Sorts a batch of (contract function call, sender) pairs into calls that will succeed and
+    calls that would revert, without sending anything.
+
+    Calls of wedding functions outside of their time window are dropped by the phase model first,
+    which needs a single getPhase call per wedding, or none if its date is in `wedding_dates`
+    ({wedding address: wedding date}, e.g. from the indexer). The remaining calls are simulated with
+    eth_call against the latest block. Every call is simulated on its own, so a call repeating an
+    earlier call of the batch (same contract, function, arguments and sender) is dropped as well.
+
+    Other effects of earlier calls of the batch are not seen: a vote after the one that reaches the
+    cancelling majority, or an approval that relies on an earlier approval of the batch, passes the
+    preflight but can still revert on chain. Batches of independent calls, e.g. the approvals of
+    distinct guests by one fiance, are not affected.
+    """
+    wedding_dates = {to_address(address): date for address, date in (wedding_dates or {}).items()}
+    timestamp = None
+    phases = {}  # {wedding address: phase in the latest block}
+    seen = set()
+    report = PreflightReport()
+    for fn_call, sender in calls:
+        sender = to_address(sender)
+        key = (fn_call.address, fn_call.fn_name, repr(fn_call.args), sender)
+        if key in seen:
+            report.doomed.append(DoomedCall(fn_call, sender, "Duplicate of an earlier call in the batch"))
+            continue
+        seen.add(key)
+
+        required_phase = REQUIRED_PHASE.get(fn_call.fn_name) if fn_call.address != client.registry.address else None
+        if required_phase is not None:
+            if fn_call.address not in phases:
+                if fn_call.address in wedding_dates:
+                    if timestamp is None:
+                        timestamp = client.web3.eth.get_block("latest")["timestamp"]
+                    phases[fn_call.address] = phase_of(wedding_dates[fn_call.address], timestamp)
+                else:
+                    phases[fn_call.address] = client.phase(fn_call.address)
+            phase = phases[fn_call.address]
+            if phase != required_phase:
+                reason = f"Not possible in phase {PHASE_NAMES[phase]} (needs {PHASE_NAMES[required_phase]})"
+                report.doomed.append(DoomedCall(fn_call, sender, reason))
+                continue
+
+        try:
+            fn_call.call({"from": sender})
+        except ContractLogicError as e:
+            report.doomed.append(DoomedCall(fn_call, sender, revert_reason(e)))
+            continue
+        report.sendable.append((fn_call, sender))
+    return report
+
+
+def send_preflighted(client, calls, wedding_dates=None):
+    """Preflights the batch and sends only the calls that will succeed, back-to-back.
+    Returns the receipts of the sent calls in order and the PreflightReport."""
+    report = preflight(client, calls, wedding_dates)
+    tx_hashes = [(client.send(fn_call, sender), fn_call.fn_name) for fn_call, sender in report.sendable]
+    return [client.wait(tx_hash, function_name) for tx_hash, function_name in tx_hashes], report
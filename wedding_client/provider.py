@@ -0,0 +1,26 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+from web3.providers import HTTPProvider
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_TIMEOUT = 30
+
+_connections = {}  # {rpc url: Web3}, shared by all clients of this process
+_connections_lock = threading.Lock()
+
+
+def connect(rpc_url, pool_size=DEFAULT_POOL_SIZE, timeout=DEFAULT_TIMEOUT):
+    """Returns a Web3 instance for `rpc_url` whose HTTP connections are kept alive and pooled.
+    All callers asking for the same url share the same instance and therefore the same pool."""
+    with _connections_lock:
+        if rpc_url not in _connections:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            provider = HTTPProvider(rpc_url, request_kwargs={"timeout": timeout}, session=session)
+            _connections[rpc_url] = Web3(provider)
+        return _connections[rpc_url]
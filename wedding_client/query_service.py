@@ -0,0 +1,246 @@
+"""Read-only HTTP queries answered from the sqlite index of a WeddingIndexer.
+
+    GET /married/<address>                                  is the address married, and in which wedding
+    GET /weddings/<address>/guests?after=<guest>&limit=<n>  the approved guests of a wedding
+    GET /days/<YYYY-MM-DD>/weddings?after=<wedding>&limit=<n>  the weddings on a day
+
+Every response is a JSON object with the `block` it reflects (the last indexed block). Lists are
+paginated by key: `next` is the `after` value of the next page, null on the last page. The queries
+run on read-only connections in a single read transaction each, while `serve` keeps the index in
+sync in a background thread, so the node only sees the log requests of the indexer.
+"""
+import datetime
+import json
+import re
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from web3 import Web3
+
+from .client import to_address
+from .parquet_export import outcome
+
+DEFAULT_PORT = 8600
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+class QueryError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _address(value):
+    if not Web3.is_address(value):
+        raise QueryError(400, f"Invalid address {value!r}")
+    return to_address(value)
+
+
+def _day(value):
+    try:
+        day = datetime.date.fromisoformat(value)
+    except ValueError:
+        raise QueryError(400, f"Invalid day {value!r}, expected YYYY-MM-DD") from None
+    return int(datetime.datetime(day.year, day.month, day.day, tzinfo=datetime.timezone.utc).timestamp())
+
+
+def _limit(value):
+    if value is None:
+        return DEFAULT_LIMIT
+    if not value.isdigit() or not 0 < int(value) <= MAX_LIMIT:
+        raise QueryError(400, f"limit must be between 1 and {MAX_LIMIT}")
+    return int(value)
+
+
+def _page(rows, limit, key):
+    """Splits the `limit` + 1 rows of a keyset query into a page and the cursor of the next page."""
+    if len(rows) > limit:
+        return rows[:limit], key(rows[limit - 1])
+    return rows, None
+
+
+class WeddingQueries:
+    """The queries of the service. Every thread uses its own read-only connection."""
+
+    def __init__(self, database):
+        self.database = str(database)
+        self._local = threading.local()
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(f"file:{self.database}?mode=ro", uri=True, isolation_level=None)
+            db.row_factory = sqlite3.Row
+            self._local.db = db
+        return db
+
+    def _snapshot(self, query):
+        """Runs `query(db, last_timestamp)` and reads the indexed block in the same read transaction,
+        so the result always matches the block number of the response."""
+        db = self._db()
+        db.execute("BEGIN")
+        try:
+            progress = dict(db.execute("SELECT name, value FROM progress").fetchall())
+            result = query(db, progress.get("last_timestamp"))
+        finally:
+            db.execute("COMMIT")
+        return {"block": progress.get("last_block", -1), **result}
+
+    def married(self, address):
+        address = _address(address)
+
+        def query(db, as_of):
+            row = db.execute(
+                "SELECT w.address, w.token_id, w.confirmed_at FROM fiances f JOIN weddings w ON w.address = f.wedding "
+                "WHERE f.fiance = ? AND w.confirmed_at IS NOT NULL AND w.divorced_at IS NULL",
+                (address,),
+            ).fetchone()
+            if row is None:
+                return {"address": address, "married": False, "wedding": None, "token_id": None, "married_at": None}
+            return {
+                "address": address,
+                "married": True,
+                "wedding": row["address"],
+                "token_id": row["token_id"],
+                "married_at": row["confirmed_at"],
+            }
+
+        return self._snapshot(query)
+
+    def guests(self, wedding, after=None, limit=None):
+        wedding, limit = _address(wedding), _limit(limit)
+        after = _address(after) if after else ""
+
+        def query(db, as_of):
+            row = db.execute("SELECT * FROM weddings WHERE address = ?", (wedding,)).fetchone()
+            if row is None:
+                raise QueryError(404, f"Unknown wedding {wedding}")
+            guests = [
+                guest
+                for (guest,) in db.execute(
+                    "SELECT guest FROM guests WHERE wedding = ? AND guest > ? ORDER BY guest LIMIT ?",
+                    (wedding, after, limit + 1),
+                )
+            ]
+            guests, next_after = _page(guests, limit, lambda guest: guest)
+            return {"wedding": wedding, "outcome": outcome(row, as_of), "guests": guests, "next": next_after}
+
+        return self._snapshot(query)
+
+    def weddings_on_day(self, day, after=None, limit=None):
+        wedding_day, limit = _day(day), _limit(limit)
+        after = _address(after) if after else ""
+
+        def query(db, as_of):
+            rows = db.execute(
+                "SELECT * FROM weddings WHERE wedding_day = ? AND address > ? ORDER BY address LIMIT ?",
+                (wedding_day, after, limit + 1),
+            ).fetchall()
+            rows, next_after = _page(rows, limit, lambda row: row["address"])
+            weddings = [
+                {
+                    "address": row["address"],
+                    "fiances": row["fiances"].split(","),
+                    "wedding_date": row["wedding_date"],
+                    "guests": row["guests"],
+                    "outcome": outcome(row, as_of),
+                }
+                for row in rows
+            ]
+            return {"day": day, "weddings": weddings, "next": next_after}
+
+        return self._snapshot(query)
+
+
+ROUTES = [
+    (re.compile(r"/married/([^/]+)"), lambda queries, match, params: queries.married(match[1])),
+    (
+        re.compile(r"/weddings/([^/]+)/guests"),
+        lambda queries, match, params: queries.guests(match[1], params.get("after"), params.get("limit")),
+    ),
+    (
+        re.compile(r"/days/([^/]+)/weddings"),
+        lambda queries, match, params: queries.weddings_on_day(match[1], params.get("after"), params.get("limit")),
+    ),
+]
+
+
+def make_server(database, host="127.0.0.1", port=DEFAULT_PORT):
+    """Creates the HTTP server for an indexer database, call its serve_forever() to answer queries."""
+    queries = WeddingQueries(database)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            status, body = 404, {"error": f"Unknown path {url.path}"}
+            for pattern, handle in ROUTES:
+                match = pattern.fullmatch(url.path)
+                if match:
+                    try:
+                        status, body = 200, handle(queries, match, params)
+                    except QueryError as e:
+                        status, body = e.status, {"error": str(e)}
+                    break
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def _sync_forever(web3, registry_address, database, poll_interval, stop):
+    from .indexer import WeddingIndexer
+
+    # sqlite connections belong to the thread that created them
+    indexer = WeddingIndexer(web3, registry_address, database)
+    try:
+        while not stop.is_set():
+            try:
+                indexer.sync()
+            except Exception as e:  # e.g. the node is restarting, try again later
+                print(f"sync failed: {e!r}")
+            stop.wait(poll_interval)
+    finally:
+        indexer.close()
+
+
+def serve(web3, registry_address, database, host="127.0.0.1", port=DEFAULT_PORT, poll_interval=DEFAULT_POLL_INTERVAL):
+    """Indexes the registry every `poll_interval` seconds in a background thread and answers queries
+    until interrupted. The first sync finishes before the server starts."""
+    from .indexer import WeddingIndexer
+
+    started = time.perf_counter()
+    indexer = WeddingIndexer(web3, registry_address, database)
+    indexer.sync()
+    print(f"indexed up to block {indexer.last_block} in {time.perf_counter() - started:.1f} s")
+    indexer.close()
+
+    stop = threading.Event()
+    syncer = threading.Thread(
+        target=_sync_forever, args=(web3, registry_address, database, poll_interval, stop), daemon=True
+    )
+    syncer.start()
+    server = make_server(database, host, port)
+    print(f"serving queries on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        stop.set()
+        syncer.join()
@@ -0,0 +1,318 @@
+"""Recording and replaying the registry and wedding calls of a chain.
+
+A trace is a gzip compressed JSON lines file. The first line is a header, every further line a call:
+
+    {"format": "wedding-trace", "version": 1, "start": <timestamp>, "authorities": ["a0"], "calls": n}
+    {"t": 3600, "to": "registry", "fn": "initiateWedding", "from": "a1", "args": [["a1", "a2"], 90000],
+     "ok": true, "gas": 312345}
+
+Accounts are replaced by symbolic roles ("a<n>", numbered by first appearance) and wedding contracts by
+"w<n>" (numbered by successful initiation), times and wedding dates are seconds since `start`. A replay
+maps the roles to the unlocked accounts of a local node, deploys a fresh registry and sends the calls
+with time travel, shifted by whole days so the wedding day windows stay aligned.
+"""
+import gzip
+import json
+import statistics
+import time
+from collections import defaultdict
+
+from web3.exceptions import ContractLogicError, Web3Exception
+
+from .client import TransactionFailed, WeddingClient, to_address
+
+FORMAT = "wedding-trace"
+VERSION = 1
+DAY_IN_SECONDS = 86400
+REGISTRY = "registry"
+# the implementation is what a replay compares, its address is no account that could be replayed
+NOT_RECORDED = {"changeWeddingContractImplementationAddress"}
+DEFAULT_MAX_WAIT = 60.0
+
+
+def percentile(sorted_samples, p):
+    # nearest-rank percentile, also well defined for a single sample
+    rank = max(1, -(-len(sorted_samples) * p // 100))
+    return sorted_samples[rank - 1]
+
+
+class _Symbols:
+    """Assigns roles to accounts and numbers to weddings in the order they appear."""
+
+    def __init__(self):
+        self.accounts = {}  # {address: "a<n>"}
+        self.weddings = {}  # {address: "w<n>"}
+
+    def account(self, address):
+        return self.accounts.setdefault(address, f"a{len(self.accounts)}")
+
+    def __call__(self, address):
+        return self.weddings.get(address) or self.account(address)
+
+
+def _encode_args(abi_inputs, args, symbol, start):
+    encoded = []
+    for item, value in zip(abi_inputs, args):
+        if item["type"] == "address":
+            value = symbol(value)
+        elif item["type"] == "address[]":
+            value = [symbol(address) for address in value]
+        elif item["name"] == "_weddingDate":
+            value -= start
+        encoded.append(value)
+    return encoded
+
+
+def _decode_args(abi_inputs, args, resolve, shifted_start):
+    decoded = []
+    for item, value in zip(abi_inputs, args):
+        if item["type"] == "address":
+            value = resolve(value)
+        elif item["type"] == "address[]":
+            value = [resolve(symbol) for symbol in value]
+        elif item["name"] == "_weddingDate":
+            value += shifted_start
+        decoded.append(value)
+    return decoded
+
+
+def record_trace(web3, registry_address, output_path, from_block=0, to_block=None, build_path=None):
+    """Records all calls to the registry and its weddings in the blocks [from_block, to_block] into a
+    trace file. Scans the blocks with their transactions, so keep the range to the traffic of interest.
+    Returns the number of recorded calls."""
+    client = WeddingClient(web3=web3, registry_address=registry_address, build_path=build_path)
+    registry_address = client.registry.address
+    to_block = web3.eth.block_number if to_block is None else to_block
+    start = web3.eth.get_block(from_block)["timestamp"]
+
+    symbols = _Symbols()
+    try:
+        authorities = _authorities(client, from_block)
+    except (ValueError, Web3Exception):
+        # the node has no state of that block, the current authorities are the best guess
+        authorities = _authorities(client, "latest")
+    header_authorities = [symbols.account(authority) for authority in authorities]
+
+    calls = []
+    for number in range(from_block, to_block + 1):
+        block = web3.eth.get_block(number, full_transactions=True)
+        for tx in block["transactions"]:
+            target = tx["to"]
+            if target != registry_address and target not in symbols.weddings:
+                continue
+            contract = client.registry if target == registry_address else client.wedding(target)
+            fn, params = contract.decode_function_input(tx["input"])
+            receipt = web3.eth.get_transaction_receipt(tx["hash"])
+            if fn.fn_name in NOT_RECORDED:
+                continue
+            ok = receipt["status"] == 1
+            calls.append(
+                {
+                    "t": block["timestamp"] - start,
+                    "to": REGISTRY if target == registry_address else symbols.weddings[target],
+                    "fn": fn.fn_name,
+                    "from": symbols.account(tx["from"]),
+                    "args": _encode_args(fn.abi["inputs"], list(params.values()), symbols, start),
+                    "ok": ok,
+                    "gas": receipt["gasUsed"],
+                }
+            )
+            if ok and fn.fn_name == "initiateWedding":
+                wedding = _initiated_wedding(client, receipt)
+                symbols.weddings[wedding] = f"w{len(symbols.weddings)}"
+
+    header = {"format": FORMAT, "version": VERSION, "start": start, "authorities": header_authorities}
+    header["calls"] = len(calls)
+    with gzip.open(output_path, "wt") as fp:
+        for line in [header] + calls:
+            fp.write(json.dumps(line, separators=(",", ":")) + "\n")
+    return len(calls)
+
+
+def _authorities(client, block_identifier):
+    # the public array getter reverts past the last authority
+    authorities = []
+    while True:
+        try:
+            authority = client.registry.functions.authorities(len(authorities)).call(block_identifier=block_identifier)
+        except ContractLogicError:
+            return authorities
+        authorities.append(authority)
+
+
+def _initiated_wedding(client, receipt):
+    return client.registry.events.WeddingInitiated().process_receipt(receipt)[0]["args"]["weddingContractAddress"]
+
+
+def read_trace(path):
+    """Returns the header of a trace and an iterator over its calls."""
+    fp = gzip.open(path, "rt")
+    header = json.loads(fp.readline())
+    if header.get("format") != FORMAT or header.get("version") != VERSION:
+        fp.close()
+        raise ValueError(f"{path} is not a version {VERSION} wedding trace")
+
+    def calls():
+        with fp:
+            for line in fp:
+                yield json.loads(line)
+
+    return header, calls()
+
+
+class MissingWedding(Exception):
+    """A replayed call refers to a wedding whose recorded initiation failed in the replay."""
+
+
+class ReplayReport:
+    """The outcome of every replayed call next to the recorded one."""
+
+    def __init__(self):
+        self.calls = []  # [{"fn", "ok", "expected_ok", "missing", "gas", "trace_gas", "latency"}]
+        self.duration = None
+
+    def by_function(self):
+        """{function name: {"calls", "mismatches", "gas", "trace_gas", "p50_ms", "p99_ms"}}, the gas as
+        the mean over the calls which succeeded both in the trace and in the replay."""
+        grouped = defaultdict(list)
+        for call in self.calls:
+            grouped[call["fn"]].append(call)
+        summary = {}
+        for fn, calls in grouped.items():
+            succeeded = [call for call in calls if call["ok"] and call["expected_ok"]]
+            latencies = sorted(call["latency"] for call in calls if call["latency"] is not None)
+            summary[fn] = {
+                "calls": len(calls),
+                # a call to a wedding missing in the replay never matches the recorded call
+                "mismatches": sum(call["ok"] != call["expected_ok"] or call["missing"] for call in calls),
+                "gas": round(statistics.mean(call["gas"] for call in succeeded)) if succeeded else None,
+                "trace_gas": round(statistics.mean(call["trace_gas"] for call in succeeded)) if succeeded else None,
+                "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+                "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+            }
+        return summary
+
+    def as_dict(self):
+        return {
+            "calls": len(self.calls),
+            "duration": self.duration,
+            "throughput": len(self.calls) / self.duration if self.duration else None,
+            "functions": self.by_function(),
+        }
+
+    def print(self, baseline=None):
+        """Prints the replay against the recorded gas, and against the functions of a `baseline`
+        report (as_dict() of an earlier replay, e.g. with the current implementation) if given."""
+        report = self.as_dict()
+        print(f"\n{report['calls']} calls in {report['duration']:.2f}s ({report['throughput'] or 0:.1f} calls/s)")
+        compared = "baseline" if baseline is not None else "trace"
+        print(
+            f"{'function':<28}{'calls':>7}{'mismatch':>9}{'gas':>10}{compared:>10}{'delta':>9}"
+            f"{'p50 ms':>9}{'p99 ms':>9}"
+        )
+        for fn, row in sorted(report["functions"].items()):
+            reference = row["trace_gas"] if baseline is None else baseline["functions"].get(fn, {}).get("gas")
+            delta = f"{(row['gas'] - reference) / reference:+.1%}" if row["gas"] and reference else "-"
+            print(
+                f"{fn:<28}{row['calls']:>7}{row['mismatches']:>9}{row['gas'] or '-':>10}{reference or '-':>10}"
+                f"{delta:>9}{row['p50_ms'] or '-':>9}{row['p99_ms'] or '-':>9}"
+            )
+        if baseline is not None and baseline.get("throughput") and report["throughput"]:
+            print(f"throughput {report['throughput'] / baseline['throughput'] - 1:+.1%} against the baseline")
+
+
+def replay_trace(
+    web3, trace_path, speed=None, max_wait=DEFAULT_MAX_WAIT, build_path=None, implementation_build_path=None
+):
+    """Replays a trace against a fresh registry on a local node and returns a ReplayReport.
+
+    With `speed` None the calls are sent as fast as possible and the chain jumps from one call time
+    to the next. Otherwise the replay waits `speed` times the recorded gaps in wall time (1.0 is the
+    original speed), at most `max_wait` seconds per gap, the rest is skipped by time travel. The
+    calls of one recorded timestamp are sent back-to-back. The wedding implementation is deployed
+    from `implementation_build_path` if given, e.g. a build of a new implementation to compare.
+    """
+    from .chain import RpcChain
+    from .deploy import deploy
+
+    header, calls = read_trace(trace_path)
+    chain = RpcChain(web3)
+    accounts = web3.eth.accounts
+    # wedding addresses by their number in the trace, None for recorded weddings whose initiation
+    # failed in the replay, so the numbers stay aligned when the replay diverges
+    weddings = []
+
+    def resolve(symbol):
+        if symbol.startswith("w"):
+            number = int(symbol[1:])
+            if number >= len(weddings) or weddings[number] is None:
+                raise MissingWedding(symbol)
+            return weddings[number]
+        if int(symbol[1:]) >= len(accounts):
+            raise ValueError(f"The trace needs more than the {len(accounts)} unlocked accounts of the node")
+        return to_address(accounts[int(symbol[1:])])
+
+    authorities = [resolve(symbol) for symbol in header["authorities"]]
+    implementation = deploy(web3, "WeddingContract", [], authorities[0], implementation_build_path or build_path)
+    registry_address = deploy(web3, "WeddingRegistry", [authorities, implementation], authorities[0], build_path)
+    client = WeddingClient(web3=web3, registry_address=registry_address, build_path=build_path)
+
+    # shift by whole days, the wedding day windows start at midnight
+    shift = -(-(chain.time() + 1 - header["start"]) // DAY_IN_SECONDS) * DAY_IN_SECONDS
+    shifted_start = header["start"] + shift
+
+    report = ReplayReport()
+    started = time.perf_counter()
+    previous_t = None
+    group = []
+
+    def run_group():
+        if previous_t is not None and chain.time() < shifted_start + previous_t:
+            chain.mine(timestamp=shifted_start + previous_t)
+        sent = []
+        for call in group:
+            result = {"fn": call["fn"], "ok": False, "expected_ok": call["ok"], "missing": False}
+            result.update({"gas": None, "trace_gas": call["gas"], "latency": None})
+            try:
+                contract = client.registry if call["to"] == REGISTRY else client.wedding(resolve(call["to"]))
+                fn = contract.get_function_by_name(call["fn"])
+                fn_call = fn(*_decode_args(fn.abi["inputs"], call["args"], resolve, shifted_start))
+            except MissingWedding:
+                # the call targets a wedding that was not initiated in the replay
+                result["missing"] = True
+                sent.append((call, result, None, None))
+                continue
+            sender = resolve(call["from"])
+            submitted_at = time.perf_counter()
+            try:
+                sent.append((call, result, client.send(fn_call, sender), submitted_at))
+            except (ValueError, Web3Exception):
+                # rejected when estimating the gas, the revert shape depends on the node and web3 version
+                sent.append((call, result, None, None))
+        for call, result, tx_hash, submitted_at in sent:
+            if tx_hash is not None:
+                try:
+                    receipt = client.wait(tx_hash, call["fn"])
+                    result["ok"] = True
+                except TransactionFailed as e:
+                    receipt = e.receipt
+                result["gas"] = receipt["gasUsed"]
+                result["latency"] = time.perf_counter() - submitted_at
+            if call["fn"] == "initiateWedding" and call["ok"]:
+                # only recorded successful initiations have a number in the trace
+                weddings.append(_initiated_wedding(client, receipt) if result["ok"] else None)
+            report.calls.append(result)
+
+    for call in calls:
+        if group and call["t"] != previous_t:
+            run_group()
+            group = []
+            if speed is not None:
+                time.sleep(min((call["t"] - previous_t) / speed, max_wait))
+        previous_t = call["t"]
+        group.append(call)
+    if group:
+        run_group()
+
+    report.duration = time.perf_counter() - started
+    return report
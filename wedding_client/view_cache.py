@@ -0,0 +1,148 @@
+import threading
+import time
+
+from web3.exceptions import ContractLogicError
+
+from .cache import LRUCache
+
+
+class BlockTracker:
+    """Keeps track of the latest block number without asking the node on every read.
+    The node is polled at most once per `poll_interval` seconds (ideally the block time)."""
+
+    def __init__(self, web3, poll_interval=1.0):
+        self.web3 = web3
+        self.poll_interval = poll_interval
+        self.block_number = None
+        self._polled_at = float("-inf")
+
+    def current(self):
+        now = time.monotonic()
+        if now - self._polled_at >= self.poll_interval:
+            self.block_number = self.web3.eth.block_number
+            self._polled_at = now
+        return self.block_number
+
+
+class ViewCache:
+    """Read-through cache for view calls of the registry and the wedding contracts.
+
+    An entry is keyed by the contract address, the caller (the registry views depend on msg.sender),
+    the called function with its arguments and the block it was read at. When the chain moves on,
+    the logs of all new blocks are fetched once for all contracts with cached entries. Only the
+    entries of contracts that emitted an event, or that are referenced by an event (e.g. the wedding
+    in the registry's Transfer and WeddingCertificateBurned events), are invalidated. All other
+    entries are carried over to the new block, since every state change of the registry and the
+    wedding contracts that is visible through a view emits an event.
+    Reads of time dependent views (`block_scoped`) are never carried over to another block.
+    """
+
+    def __init__(self, web3, max_entries=4096, poll_interval=1.0, block_scoped=()):
+        self.web3 = web3
+        self.tracker = BlockTracker(web3, poll_interval)
+        self.block_scoped = set(block_scoped)
+        self._entries = LRUCache(max_entries)  # {(address, caller, fn_name, args): (block, result, is_revert)}
+        self._keys_by_address = {}  # {address: set of keys}, entries might already be evicted
+        self._block_scoped_keys = set()
+        self._watched = set()  # addresses whose events are always fetched
+        self._block = None  # all entries are valid at this block
+        self._lock = threading.Lock()
+
+    @property
+    def hits(self):
+        return self._entries.hits
+
+    @property
+    def misses(self):
+        return self._entries.misses
+
+    def watch(self, address):
+        """Always fetches the events of `address`, even if nothing of it is cached. This is needed for
+        the registry, whose events also invalidate the entries of the referenced wedding contracts."""
+        with self._lock:
+            self._watched.add(address)
+            self._keys_by_address.setdefault(address, set())
+
+    def invalidate(self, address=None):
+        with self._lock:
+            self._invalidate(address)
+
+    def _invalidate(self, address=None):
+        if address is None:
+            self._entries.clear()
+            self._block_scoped_keys.clear()
+            for keys in self._keys_by_address.values():
+                keys.clear()
+            return
+        for key in self._keys_by_address.get(address, ()):
+            self._entries.pop(key)
+        self._keys_by_address.get(address, set()).clear()
+
+    def _advance(self, block):
+        """Brings all entries from self._block to `block`, invalidating what the new blocks changed."""
+        if self._block is None or block < self._block:
+            # first read or the chain got reverted (e.g. a test snapshot), nothing can be carried over
+            self._invalidate()
+            self._block = block
+            return
+        if block == self._block:
+            return
+
+        watched = self._watched.union(address for address, keys in self._keys_by_address.items() if keys)
+        if watched:
+            logs = self.web3.eth.get_logs(
+                {"fromBlock": self._block + 1, "toBlock": block, "address": sorted(watched)}
+            )
+            for address in _touched_addresses(logs, self._keys_by_address):
+                self._invalidate(address)
+        for key in self._block_scoped_keys:
+            self._entries.pop(key)
+        self._block_scoped_keys.clear()
+        self._block = block
+
+    def call(self, fn_call, caller=None):
+        """Returns the result of the view call `fn_call` (a web3 contract function) as `caller`.
+        Reverts are cached as well and re-raised."""
+        address = fn_call.address
+        key = (address, caller, fn_call.fn_name, _freeze(fn_call.args))
+        with self._lock:
+            block = self.tracker.current()
+            self._advance(block)
+            cached = self._entries.get(key)
+        if cached is None:
+            try:
+                result, is_revert = fn_call.call({"from": caller} if caller else {}, block_identifier=block), False
+            except ContractLogicError as e:
+                result, is_revert = e, True
+            with self._lock:
+                if self._block == block:
+                    self._entries.put(key, (block, result, is_revert))
+                    self._keys_by_address.setdefault(address, set()).add(key)
+                    if fn_call.fn_name in self.block_scoped:
+                        self._block_scoped_keys.add(key)
+            cached = (block, result, is_revert)
+
+        _, result, is_revert = cached
+        if is_revert:
+            raise result
+        return result
+
+
+def _touched_addresses(logs, watched):
+    # the emitter of every log and every watched address in its topics or data words
+    watched_words = {bytes.fromhex(address[2:]): address for address in watched}
+    touched = set()
+    for log in logs:
+        touched.add(log["address"])
+        data = bytes(log["data"])
+        words = [bytes(topic) for topic in log["topics"][1:]] + [data[i:i + 32] for i in range(0, len(data), 32)]
+        for word in words:
+            if len(word) == 32 and word[12:] in watched_words and not any(word[:12]):
+                touched.add(watched_words[word[12:]])
+    return touched
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value